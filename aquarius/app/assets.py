@@ -2,9 +2,10 @@
 # Copyright 2023 Ocean Protocol Foundation
 # SPDX-License-Identifier: Apache-2.0
 #
+from concurrent.futures import ThreadPoolExecutor
 import copy
 import elasticsearch
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from datetime import timedelta
 import json
 import logging
@@ -14,9 +15,12 @@ from aquarius.app.es_instance import ElasticsearchInstance
 from aquarius.app.util import (
     sanitize_record,
     sanitize_query_result,
+    get_batch_items,
     get_signature_vrs,
+    get_validate_batch_settings,
 )
 from aquarius.ddo_checker.shacl_checker import validate_dict
+from aquarius.ddo_checker.validation_pool import ValidationPoolBusy
 from aquarius.log import setup_logging
 from aquarius.myapp import app
 from aquarius.events.purgatory import Purgatory
@@ -367,18 +371,122 @@ def validate_remote():
             return (jsonify([{"message": "no version provided for DDO."}]), 400)
 
         valid, errors = validate_dict(
-            data, data.get("chainId", ""), data.get("nftAddress", "")
+            data, data.get("chainId", ""), data.get("nftAddress", ""), es_instance
         )
 
         if valid:
             return jsonify(get_signature_vrs(raw))
 
         return (jsonify(errors=errors), 400)
+    except ValidationPoolBusy as e:
+        logger.warning(f"validate_remote failed: {str(e)}.")
+        return jsonify(error="Too many pending validations, try again later."), 503
     except Exception as e:
         logger.error(f"validate_remote failed: {str(e)}.")
         return jsonify(error=f"Encountered error when validating asset: {str(e)}."), 500
 
 
+def validate_batch_item(raw):
+    """Validates one DDO of a batch, returns its result: valid, errors and the signature
+    fields of get_signature_vrs, empty if the DDO is not valid."""
+    result = {"valid": False, "errors": {}}
+    result.update({"hash": "", "publicKey": "", "r": "", "s": "", "v": ""})
+    try:
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except (json.decoder.JSONDecodeError, UnicodeDecodeError):
+            data = None
+        if not isinstance(data, dict):
+            result["errors"] = {
+                "error": "Invalid payload. The item could not be converted into a dict."
+            }
+            return result
+
+        if os.getenv("RBAC_SERVER_URL") and not RBAC.validate_ddo_rbac(data):
+            result["errors"] = {"error": "DDO marked invalid by the RBAC server."}
+            return result
+
+        if not data.get("version", None):
+            result["errors"] = {"version": "no version provided for DDO."}
+            return result
+
+        valid, errors = validate_dict(
+            data, data.get("chainId", ""), data.get("nftAddress", ""), es_instance
+        )
+        if not valid:
+            result["errors"] = errors
+            return result
+
+        result.update(get_signature_vrs(raw))
+        result["valid"] = True
+    except ValidationPoolBusy:
+        result["errors"] = {"error": "Too many pending validations, try again later."}
+    except Exception as e:
+        logger.error(f"validate_batch failed: {str(e)}.")
+        result["errors"] = {
+            "error": f"Encountered error when validating asset: {str(e)}."
+        }
+
+    return result
+
+
+@assets.route("/ddo/validate/batch", methods=["POST"])
+def validate_batch():
+    """Validate several DDOs.
+    ---
+    tags:
+      - ddo
+    consumes:
+      - application/x-ndjson
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        description: DDOs, one per line (application/x-ndjson) or as a json array (application/json).
+        schema:
+          type: array
+    responses:
+      200:
+        description: one result per DDO, in order, one per line (application/x-ndjson), with valid, errors and the hash, publicKey, v, r, s signature of valid DDOs.
+      400:
+        description: Invalid payload
+      413:
+        description: Too many DDOs or payload too large
+    """
+    if request.mimetype not in ["application/x-ndjson", "application/json"]:
+        return (
+            jsonify(
+                error="Invalid request content type: should be application/x-ndjson or application/json"
+            ),
+            400,
+        )
+
+    max_items, max_bytes, concurrency = get_validate_batch_settings()
+    if (request.content_length or 0) > max_bytes:
+        return jsonify(error=f"Payload is larger than {max_bytes} bytes."), 413
+
+    raw = request.get_data()
+    if len(raw) > max_bytes:
+        return jsonify(error=f"Payload is larger than {max_bytes} bytes."), 413
+
+    try:
+        items = get_batch_items(raw, request.mimetype)
+    except ValueError as e:
+        return jsonify(error=f"Invalid payload: {str(e)}"), 400
+
+    if len(items) > max_items:
+        return jsonify(error=f"Payload has more than {max_items} DDOs."), 413
+
+    def generate():
+        # validate_dict uses the validation pool if it is enabled
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(items) or 1)) as pool:
+            for result in pool.map(validate_batch_item, items):
+                yield json.dumps(result) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
 @assets.route("/triggerCaching", methods=["POST"])
 def trigger_caching():
     """Triggers manual caching of a specific transaction (MetadataCreated or MetadataUpdated event)
@@ -7,7 +7,8 @@ import os
 import time
 
 from elasticsearch import Elasticsearch
-from elasticsearch.exceptions import NotFoundError
+from elasticsearch.exceptions import ConflictError, NotFoundError
+from aquarius.events.bulk_writer import get_bulk_writer
 from aquarius.events.util import make_did
 
 _DB_INSTANCE = None
@@ -19,6 +20,84 @@ logging.getLogger("elastic_transport.node").setLevel(logging.ERROR)
 logging.getLogger("elastic_transport.node_pool").setLevel(logging.ERROR)
 logging.getLogger("elastic_transport.transport").setLevel(logging.ERROR)
 
+# sets params.fields (by dotted path, eg: stats.orders) in the document, creating the
+# missing objects. Nothing is written if all the fields already have these values.
+UPDATE_FIELDS_SCRIPT = """
+boolean changed = false;
+boolean stale = false;
+if (params.block_field != null) {
+    String[] path = params.block_field.splitOnToken('.');
+    def node = ctx._source;
+    for (int i = 0; i < path.length - 1 && node != null; i++) {
+        node = node[path[i]] instanceof Map ? node[path[i]] : null;
+    }
+    def stored = node == null ? null : node[path[path.length - 1]];
+    stale = stored != null && stored > params.block;
+}
+for (entry in (stale ? new HashMap() : params.fields).entrySet()) {
+    String[] path = entry.getKey().splitOnToken('.');
+    def node = ctx._source;
+    for (int i = 0; i < path.length - 1; i++) {
+        if (!(node[path[i]] instanceof Map)) {
+            node[path[i]] = new HashMap();
+        }
+        node = node[path[i]];
+    }
+    String key = path[path.length - 1];
+    if (!node.containsKey(key) || node[key] != entry.getValue()) {
+        node[key] = entry.getValue();
+        changed = true;
+    }
+}
+if (!changed) {
+    ctx.op = 'noop';
+}
+"""
+
+
+class Document(dict):
+    """Source of a document read from elasticsearch, with the seq_no and primary_term of
+    the read version. Pass `get_write_conditions(document)` to a write, so that it fails
+    with a ConflictError if the document changed since it was read.
+    """
+
+    def __init__(self, source, seq_no=None, primary_term=None):
+        super().__init__(source)
+        self.seq_no = seq_no
+        self.primary_term = primary_term
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(
+            response["_source"],
+            response.get("_seq_no"),
+            response.get("_primary_term"),
+        )
+
+
+def get_write_conditions(document):
+    """Returns the if_seq_no and if_primary_term arguments of a write of document, empty if
+    it was not read from elasticsearch (eg: a new document).
+    """
+    seq_no = getattr(document, "seq_no", None)
+    if seq_no is None:
+        return {}
+
+    return {"if_seq_no": seq_no, "if_primary_term": document.primary_term}
+
+
+def retry_on_conflict(fn, *args, retries=3, **kwargs):
+    """Calls fn(*args, **kwargs), and again while it raises a ConflictError, up to retries
+    times. fn must read the documents it writes again, eg: read, modify and write one.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except ConflictError as e:
+            if attempt == retries:
+                raise
+            logger.info(f"Conflicting write, retrying ({attempt + 1}/{retries}): {e}")
+
 
 class ElasticsearchInstance(object):
     def __init__(self):
@@ -70,35 +149,61 @@ class ElasticsearchInstance(object):
         else:
             raise ValueError
 
+    def get_bulk_writer(self, index=None, resource_id=None):
+        """Returns the BulkWriter of the events processed by the current thread, None if
+        writes are not buffered. Its pending operations on resource_id are sent first, so
+        that the resource can be read.
+        """
+        writer = get_bulk_writer(self.es)
+        if writer and resource_id is not None:
+            writer.flush_doc(index, resource_id)
+
+        return writer
+
     def write(self, obj, resource_id=None):
         """Write obj in elasticsearch.
+        When processing events, the write is buffered until the end of the chunk.
         :param obj: value to be written in elasticsearch.
         :param resource_id: id for the resource.
         :return: id of the transaction.
         """
         logger.debug("elasticsearch::write::{}".format(resource_id))
-        if resource_id is not None:
-            if self.es.exists(index=self.db_index, id=resource_id):
-                raise ValueError(
-                    'Resource "{}" already exists, use update instead'.format(
-                        resource_id
-                    )
-                )
+        writer = self.get_bulk_writer(self.db_index, resource_id)
+        if resource_id is None:
+            return self.es.index(index=self.db_index, body=obj, refresh="wait_for")[
+                "_id"
+            ]
 
-        return self.es.index(
-            index=self.db_index,
-            id=resource_id,
-            body=obj,
-            refresh="wait_for",
-        )["_id"]
+        already_exists = ValueError(
+            'Resource "{}" already exists, use update instead'.format(resource_id)
+        )
+        if self.es.exists(index=self.db_index, id=resource_id):
+            raise already_exists
+        # created only if it does not exist, even if another writer created it since
+        if writer:
+            return writer.create(self.db_index, resource_id, obj)
+        try:
+            return self.es.index(
+                index=self.db_index,
+                id=resource_id,
+                body=obj,
+                op_type="create",
+                refresh="wait_for",
+            )["_id"]
+        except ConflictError:
+            raise already_exists
 
-    def read(self, resource_id):
+    def read(self, resource_id, fields=None):
         """Read object in elasticsearch using the resource_id.
         :param resource_id: id of the object to be read.
-        :return: object value from elasticsearch.
+        :param fields: list of the fields to read (eg: ["stats"]), defaults to all of them.
+        :return: object value from elasticsearch, as a Document with its seq_no.
         """
         # logger.debug("elasticsearch::read::{}".format(resource_id))
-        return self.es.get(index=self.db_index, id=resource_id)["_source"]
+        self.get_bulk_writer(self.db_index, resource_id)
+        return Document.from_response(
+            self.es.get(index=self.db_index, id=resource_id, _source_includes=fields)
+        )
 
     def exists(self, resource_id):
         """Check if document exists.
@@ -106,19 +211,80 @@ class ElasticsearchInstance(object):
         :return: true if object exists
         """
         # logger.debug("elasticsearch::read::{}".format(resource_id))
+        self.get_bulk_writer(self.db_index, resource_id)
         return self.es.exists(index=self.db_index, id=resource_id)
 
-    def update(self, obj, resource_id):
+    def update(self, obj, resource_id, if_seq_no=None, if_primary_term=None):
         """Update object in elasticsearch using the resource_id.
+        When processing events, the write is buffered until the end of the chunk.
         :param obj: new value
         :param resource_id: id of the object to be updated.
+        :param if_seq_no, if_primary_term: fails with a ConflictError if the object
+            changed since it was read with these values.
         :return: id of the object.
         """
         logger.debug("elasticsearch::update::{}".format(resource_id))
+        writer = self.get_bulk_writer()
+        if writer:
+            return writer.index(
+                self.db_index, resource_id, obj, if_seq_no, if_primary_term
+            )
+
         return self.es.index(
             index=self.db_index,
             id=resource_id,
             body=obj,
+            if_seq_no=if_seq_no,
+            if_primary_term=if_primary_term,
+            refresh="wait_for",
+        )["_id"]
+
+    def update_fields(
+        self,
+        resource_id,
+        fields,
+        if_seq_no=None,
+        if_primary_term=None,
+        block_field=None,
+        block=None,
+    ):
+        """Sets some fields of an object in elasticsearch, without sending the whole object.
+        When processing events, the write is buffered until the end of the chunk.
+        :param resource_id: id of the object to be updated.
+        :param fields: dict of the new values by dotted path, eg: {"nft.owner": owner}
+        :param if_seq_no, if_primary_term: fails with a ConflictError if the object
+            changed since it was read with these values.
+        :param block_field, block: dotted path of the block the fields were read at, and
+            that block. The fields are only set if the stored block is not newer, eg: when
+            the events of a backfill are processed out of block order.
+        :return: id of the object.
+        """
+        logger.debug("elasticsearch::update_fields::{}".format(resource_id))
+        params = {"fields": fields}
+        if block_field:
+            params["fields"] = dict(fields, **{block_field: block})
+            params.update(block_field=block_field, block=block)
+        script = {
+            "source": UPDATE_FIELDS_SCRIPT,
+            "lang": "painless",
+            "params": params,
+        }
+        writer = self.get_bulk_writer()
+        if writer:
+            return writer.update(
+                self.db_index,
+                resource_id,
+                script=script,
+                if_seq_no=if_seq_no,
+                if_primary_term=if_primary_term,
+            )
+
+        return self.es.update(
+            index=self.db_index,
+            id=resource_id,
+            script=script,
+            if_seq_no=if_seq_no,
+            if_primary_term=if_primary_term,
             refresh="wait_for",
         )["_id"]
 
@@ -130,16 +296,26 @@ class ElasticsearchInstance(object):
         }"""
         self.es.delete_by_query("_all", q)
 
-    def delete(self, resource_id):
+    def delete(self, resource_id, if_seq_no=None, if_primary_term=None):
         """Delete an object from elasticsearch.
         :param resource_id: id of the object to be deleted.
+        :param if_seq_no, if_primary_term: fails with a ConflictError if the object
+            changed since it was read with these values.
         :return:
         """
         logger.debug("elasticsearch::delete::{}".format(resource_id))
+        writer = self.get_bulk_writer(self.db_index, resource_id)
         if not self.es.exists(index=self.db_index, id=resource_id):
             raise ValueError(f"Resource {resource_id} does not exists")
+        if writer:
+            return writer.delete(self.db_index, resource_id, if_seq_no, if_primary_term)
 
-        return self.es.delete(index=self.db_index, id=resource_id)
+        return self.es.delete(
+            index=self.db_index,
+            id=resource_id,
+            if_seq_no=if_seq_no,
+            if_primary_term=if_primary_term,
+        )
 
     def count(self):
         count_result = self.es.count(index=self.db_index)
@@ -175,8 +351,20 @@ class ElasticsearchInstance(object):
 
         return True
 
-    def update_did_state(self, nft_address, chain_id, txid, valid, error):
-        """Updates did state."""
+    def update_did_state(
+        self,
+        nft_address,
+        chain_id,
+        txid,
+        valid,
+        error,
+        if_seq_no=None,
+        if_primary_term=None,
+    ):
+        """Updates did state.
+        :param if_seq_no, if_primary_term: fails with a ConflictError if the did state
+            changed since it was read with these values.
+        """
         did = make_did(nft_address, chain_id)
         obj = {
             "nft": nft_address,
@@ -187,16 +375,25 @@ class ElasticsearchInstance(object):
             "error": error,
         }
         logger.info(f"Set did state {obj} for {did}")
+        writer = self.get_bulk_writer()
+        if writer:
+            return writer.index(
+                self._did_states_index, did, obj, if_seq_no, if_primary_term
+            )
+
         return self.es.index(
             index=self._did_states_index,
             id=did,
             body=obj,
+            if_seq_no=if_seq_no,
+            if_primary_term=if_primary_term,
             refresh="wait_for",
         )["_id"]
 
     def read_did_state(self, did):
         """Read did index state.
         :param did
-        :return: object value from elasticsearch.
+        :return: object value from elasticsearch, as a Document with its seq_no.
         """
-        return self.es.get(index=self._did_states_index, id=did)["_source"]
+        self.get_bulk_writer(self._did_states_index, did)
+        return Document.from_response(self.es.get(index=self._did_states_index, id=did))
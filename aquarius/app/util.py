@@ -5,8 +5,10 @@
 import json
 import logging
 import os
+import re
 
 from datetime import datetime
+from functools import lru_cache
 from hashlib import sha256
 from json import JSONDecodeError
 
@@ -56,20 +58,31 @@ class AquariusPrivateKeyException(Exception):
     pass
 
 
-def get_aquarius_wallet():
+@lru_cache(maxsize=4)
+def load_aquarius_keys(pk):
+    """Returns the wallet and signing key of a private key. Deriving the public key is
+    costly, so both are loaded once per private key."""
+    wallet = Account.from_key(private_key=pk)
+
+    return wallet, keys.PrivateKey(wallet.key)
+
+
+def get_aquarius_keys():
     pk = os.environ.get("PRIVATE_KEY", None)
     if pk is None:
         raise AquariusPrivateKeyException("Missing Aquarius PRIVATE_KEY")
 
-    return Account.from_key(private_key=pk)
+    return load_aquarius_keys(pk)
+
+
+def get_aquarius_wallet():
+    return get_aquarius_keys()[0]
 
 
 def get_signature_vrs(raw):
     try:
         hashed_raw = sha256(raw)
-        wallet = get_aquarius_wallet()
-
-        keys_pk = keys.PrivateKey(wallet.key)
+        wallet, keys_pk = get_aquarius_keys()
 
         prefix = "\x19Ethereum Signed Message:\n32"
         signable_hash = Web3.solidity_keccak(
@@ -91,9 +104,7 @@ def get_signature_vrs(raw):
 
 def get_signature_bytes(raw):
     try:
-        wallet = get_aquarius_wallet()
-
-        keys_pk = keys.PrivateKey(wallet.key)
+        _, keys_pk = get_aquarius_keys()
         message_hash = Web3.solidity_keccak(
             ["bytes"],
             [Web3.to_bytes(text=raw)],
@@ -114,6 +125,61 @@ def get_signature_bytes(raw):
     return signature
 
 
+def get_validate_batch_settings():
+    """Returns (max_items, max_bytes, concurrency) of /ddo/validate/batch requests, from
+    VALIDATE_BATCH_MAX_ITEMS (default 1000), VALIDATE_BATCH_MAX_BYTES (default 16MB) and
+    VALIDATE_BATCH_CONCURRENCY (default 8)."""
+    settings = []
+    for env_name, default in [
+        ("VALIDATE_BATCH_MAX_ITEMS", 1000),
+        ("VALIDATE_BATCH_MAX_BYTES", 16 * 1024 * 1024),
+        ("VALIDATE_BATCH_CONCURRENCY", 8),
+    ]:
+        try:
+            settings.append(max(1, int(os.getenv(env_name, default))))
+        except ValueError:
+            settings.append(default)
+
+    return tuple(settings)
+
+
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def get_batch_items(raw, mimetype):
+    """Splits the body of a batch request into the raw bytes of each item, so that each
+    DDO is hashed as it was sent. Raises ValueError if the body can not be split.
+
+    Args:
+        raw: request body
+        mimetype: application/x-ndjson, one DDO per line, or application/json, an array of DDOs
+    """
+    if mimetype == "application/x-ndjson":
+        return [line.rstrip(b"\r") for line in raw.split(b"\n") if line.strip()]
+
+    text = raw.decode("utf-8")
+    decoder = json.JSONDecoder()
+    index = JSON_WHITESPACE.match(text, 0).end()
+    if text[index : index + 1] != "[":
+        raise ValueError("Payload is not a json array.")
+
+    items = []
+    index = JSON_WHITESPACE.match(text, index + 1).end()
+    while text[index : index + 1] != "]":
+        if items:
+            if text[index : index + 1] != ",":
+                raise ValueError(f"Expected ',' at position {index}.")
+            index = JSON_WHITESPACE.match(text, index + 1).end()
+        _, end = decoder.raw_decode(text, index)
+        items.append(text[index:end].encode("utf-8"))
+        index = JSON_WHITESPACE.match(text, end).end()
+
+    if text[index + 1 :].strip(" \t\n\r"):
+        raise ValueError("Unexpected data after the json array.")
+
+    return items
+
+
 def get_allowed_publishers():
     allowed_publishers = set()
     try:
@@ -0,0 +1,280 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import math
+import re
+
+import rdflib
+from rdflib.collection import Collection
+from rdflib.namespace import SH, XSD
+
+SCHEMA = rdflib.Namespace("http://schema.org/")
+
+# constraints of a property shape understood by the native validator
+SUPPORTED_PREDICATES = {
+    SH.path,
+    SH.datatype,
+    SH.pattern,
+    SH.flags,
+    SH.minCount,
+    SH.maxCount,
+    SH.minLength,
+    SH.maxLength,
+    SH["in"],
+    SH.node,
+}
+
+
+class UnsupportedShape(Exception):
+    """Raised when compiling shapes that use constraints the native validator does not know."""
+
+
+class UnsupportedDdo(Exception):
+    """Raised when a DDO can not be validated natively, eg: it uses JSON-LD keywords."""
+
+
+def compile_shapes(shapes_graph, target_class=SCHEMA.DDO):
+    """Compiles a SHACL shapes graph into NodeShapes validating dicts directly.
+    Returns the NodeShape of target_class.
+
+    Args:
+        shapes_graph: rdflib.Graph of the shapes, eg: remote_4.5.0.ttl
+        target_class: class of the validated root node
+    """
+    shapes = {}
+    for shape_id in shapes_graph.subjects(SH.property, None):
+        if shape_id not in shapes:
+            shapes[shape_id] = NodeShape(shape_id)
+
+    for shape_id, shape in shapes.items():
+        for property_id in shapes_graph.objects(shape_id, SH.property):
+            shape.properties.append(
+                compile_property_shape(shapes_graph, property_id, shapes)
+            )
+
+    root = shapes_graph.value(predicate=SH.targetClass, object=target_class)
+    if root not in shapes:
+        raise UnsupportedShape(f"No shape targets {target_class}.")
+
+    return shapes[root]
+
+
+def compile_property_shape(shapes_graph, property_id, shapes):
+    unsupported = set(shapes_graph.predicates(property_id, None)) - (
+        SUPPORTED_PREDICATES
+    )
+    if unsupported:
+        raise UnsupportedShape(f"Unsupported constraints {sorted(unsupported)}.")
+
+    def get_value(predicate):
+        return shapes_graph.value(property_id, predicate)
+
+    path = get_value(SH.path)
+    if not isinstance(path, rdflib.URIRef) or not path.startswith(SCHEMA):
+        raise UnsupportedShape(f"Unsupported path {path}.")
+
+    node = get_value(SH.node)
+    if node is not None and node not in shapes:
+        raise UnsupportedShape(f"Unknown node shape {node}.")
+
+    pattern = get_value(SH.pattern)
+    if pattern is not None:
+        flags = str(get_value(SH.flags) or "").lower()
+        pattern = re.compile(
+            str(pattern),
+            (re.I if "i" in flags else 0) | (re.M if "m" in flags else 0),
+        )
+
+    allowed = get_value(SH["in"])
+    if allowed is not None:
+        allowed = {
+            (literal.datatype or XSD.string, str(literal))
+            for literal in Collection(shapes_graph, allowed)
+            if isinstance(literal, rdflib.Literal)
+        }
+
+    return PropertyShape(
+        path=path[len(SCHEMA) :],
+        datatype=get_value(SH.datatype),
+        pattern=pattern,
+        min_count=get_int(get_value(SH.minCount)),
+        max_count=get_int(get_value(SH.maxCount)),
+        min_length=get_int(get_value(SH.minLength)),
+        max_length=get_int(get_value(SH.maxLength)),
+        allowed=allowed,
+        node=shapes[node] if node is not None else None,
+    )
+
+
+def get_int(literal):
+    return int(literal) if literal is not None else None
+
+
+def get_value_nodes(value):
+    """Returns the distinct value nodes of a json value, as in its JSON-LD graph.
+
+    Literals are (datatype, lexical form) tuples, so that equal literals are counted once,
+    dicts are blank nodes, lists are flattened and None values are dropped.
+    """
+    literals = {}
+    nodes = []
+    items = [(value, 0)]
+    while items:
+        item, depth = items.pop()
+        if item is None:
+            continue
+        if isinstance(item, list):
+            if depth > 1:
+                # rdflib only flattens lists of lists, deeper ones become literals
+                raise UnsupportedDdo("Unsupported list nesting.")
+            items.extend((list_item, depth + 1) for list_item in reversed(item))
+        elif isinstance(item, dict):
+            nodes.append(item)
+        else:
+            literal = to_literal(item)
+            literals[literal] = literal
+
+    return list(literals) + nodes
+
+
+def to_literal(value):
+    if isinstance(value, str):
+        return XSD.string, value
+    if isinstance(value, bool):
+        return XSD.boolean, "true" if value else "false"
+    if isinstance(value, int):
+        return XSD.integer, str(value)
+    if isinstance(value, float) and math.isfinite(value):
+        return XSD.double, str(value)
+
+    raise UnsupportedDdo(f"Unsupported value {value!r}.")
+
+
+def check_keys(value):
+    """Raises UnsupportedDdo if a nested dict has keys with a meaning in JSON-LD
+    (eg: @type, which would make other shapes target the node, or IRIs).
+    """
+    items = [value]
+    while items:
+        item = items.pop()
+        if isinstance(item, list):
+            items.extend(item)
+        elif isinstance(item, dict):
+            for key, key_value in item.items():
+                if not isinstance(key, str) or key.startswith("@") or ":" in key:
+                    raise UnsupportedDdo(f"Unsupported key {key!r}.")
+                items.append(key_value)
+
+
+class PropertyShape:
+    def __init__(
+        self,
+        path,
+        datatype=None,
+        pattern=None,
+        min_count=None,
+        max_count=None,
+        min_length=None,
+        max_length=None,
+        allowed=None,
+        node=None,
+    ):
+        self.path = path
+        self.datatype = datatype
+        self.pattern = pattern
+        self.min_count = min_count
+        self.max_count = max_count
+        self.min_length = min_length
+        self.max_length = max_length
+        self.allowed = allowed
+        self.node = node
+
+    def get_error(self, value):
+        """Returns the error message of the property value, None if it conforms."""
+        value_nodes = get_value_nodes(value)
+
+        if self.min_count is not None and len(value_nodes) < self.min_count:
+            if self.min_count == 1:
+                return f"Less than 1 value on schema1:{self.path}"
+            return f"Less than {self.min_count} values on schema1:{self.path}"
+        if self.max_count is not None and len(value_nodes) > self.max_count:
+            return f"More than {self.max_count} values on schema1:{self.path}"
+
+        for value_node in value_nodes:
+            error = self.get_value_node_error(value_node)
+            if error:
+                return error
+
+        return None
+
+    def get_value_node_error(self, value_node):
+        is_literal = isinstance(value_node, tuple)
+        lexical = value_node[1] if is_literal else None
+
+        if self.datatype is not None and (
+            not is_literal or value_node[0] != self.datatype
+        ):
+            return (
+                f"Value is not Literal with datatype xsd:{self.datatype.split('#')[-1]}"
+            )
+
+        if self.node is not None and not self.node.conforms(
+            value_node if not is_literal else {}
+        ):
+            return f"Value does not conform to Shape schema1:{self.node.name}"
+
+        if self.allowed is not None and (
+            not is_literal or value_node not in self.allowed
+        ):
+            return f"Value {lexical} not in list {sorted(v[1] for v in self.allowed)}"
+
+        # blank nodes fail string based constraints
+        if self.pattern is not None and not (
+            is_literal and self.pattern.search(lexical)
+        ):
+            return f"Value does not match pattern '{self.pattern.pattern}'"
+        if self.min_length and not (is_literal and len(lexical) >= self.min_length):
+            return f'String length not >= Literal("{self.min_length}", datatype=xsd:integer)'
+        if self.max_length is not None and not (
+            is_literal and len(lexical) <= self.max_length
+        ):
+            return f'String length not <= Literal("{self.max_length}", datatype=xsd:integer)'
+
+        return None
+
+
+class NodeShape:
+    """Validates a dict as the SHACL node shape it was compiled from.
+
+    A dict is validated as the node of its JSON-LD graph with @vocab http://schema.org/:
+    its keys are schema.org properties, nested dicts are blank nodes. Values which are not
+    dicts are validated as nodes without properties, like literals are by SHACL.
+    """
+
+    def __init__(self, shape_id):
+        self.name = shape_id[len(SCHEMA) :] if shape_id.startswith(SCHEMA) else shape_id
+        self.properties = []
+
+    def conforms(self, node):
+        return all(
+            shape.get_error(node.get(shape.path)) is None for shape in self.properties
+        )
+
+    def validate(self, node):
+        """Returns (conforms, errors) like parse_report_to_errors, by property of the
+        node which does not conform. Raises UnsupportedDdo if the node can not be
+        validated natively.
+
+        Args:
+            node: dict, eg: DDO. @context and @type are ignored.
+        """
+        check_keys({k: v for k, v in node.items() if k not in ["@context", "@type"]})
+
+        errors = {}
+        for shape in self.properties:
+            error = shape.get_error(node.get(shape.path))
+            if error:
+                errors[shape.path] = error
+
+        return not errors, errors
@@ -6,12 +6,25 @@ import copy
 from datetime import datetime
 import json
 import logging
+import os
 import rdflib
 from pathlib import Path
 import pkg_resources
 from pyshacl import validate
+from threading import Lock
 from eth_utils.address import is_address
 
+from aquarius.ddo_checker.native_checker import (
+    UnsupportedDdo,
+    UnsupportedShape,
+    compile_shapes,
+)
+from aquarius.ddo_checker.validation_cache import (
+    get_shared_validation_cache,
+    get_validation_cache,
+    get_validation_cache_key,
+)
+from aquarius.ddo_checker.validation_pool import get_validation_pool
 from aquarius.events.util import make_did
 
 logger = logging.getLogger("aquarius")
@@ -19,6 +32,10 @@ logger = logging.getLogger("aquarius")
 CURRENT_VERSION = "4.5.0"
 ALLOWED_VERSIONS = ["4.0.0", "4.1.0", "4.3.0", "4.5.0"]
 
+_shapes_graphs = {}
+_native_validators = {}
+_shapes_graphs_lock = Lock()
+
 
 def get_schema(version=CURRENT_VERSION):
     """Gets the schema file corresponding to the version."""
@@ -32,6 +49,58 @@ def get_schema(version=CURRENT_VERSION):
     return schema_file.read_text()
 
 
+def get_shapes_graph(version=CURRENT_VERSION):
+    """Returns the parsed shapes graph of the version. Each schema is parsed once per process."""
+    assert version in ALLOWED_VERSIONS, "Can't find schema {}".format(version)
+    if version in _shapes_graphs:
+        return _shapes_graphs[version]
+
+    with _shapes_graphs_lock:
+        if version not in _shapes_graphs:
+            _shapes_graphs[version] = rdflib.Graph().parse(
+                data=get_schema(version), format="turtle"
+            )
+        return _shapes_graphs[version]
+
+
+def get_native_validator(version=CURRENT_VERSION):
+    """Returns the NodeShape compiled from the shapes of the version, None if they can not
+    be validated natively."""
+    shapes_graph = get_shapes_graph(version)
+    if version in _native_validators:
+        return _native_validators[version]
+
+    with _shapes_graphs_lock:
+        if version not in _native_validators:
+            try:
+                _native_validators[version] = compile_shapes(shapes_graph)
+            except UnsupportedShape as e:
+                logger.warning(f"Schema {version} is validated by pyshacl only: {e}")
+                _native_validators[version] = None
+        return _native_validators[version]
+
+
+def preload_shapes_graphs():
+    """Parses and compiles the shapes of all allowed versions, eg: when a worker starts."""
+    for version in ALLOWED_VERSIONS:
+        get_native_validator(version)
+
+
+def get_ddo_validator():
+    """Returns the DDO_VALIDATOR setting: shacl (default), native or differential.
+
+    native validates DDOs with the validators compiled from the shapes, falling back to
+    pyshacl for DDOs they do not support. shacl only uses pyshacl. differential runs both,
+    logs an error if they disagree and returns the pyshacl result.
+    """
+    validator = os.getenv("DDO_VALIDATOR", "shacl").lower()
+    if validator not in ["native", "shacl", "differential"]:
+        logger.error(f"Unknown DDO_VALIDATOR {validator}, using shacl.")
+        return "shacl"
+
+    return validator
+
+
 def parse_report_to_errors(results_graph):
     """Iterates throgh results graph to create a dictionary of key: validation message."""
     paths = [
@@ -70,10 +139,83 @@ def is_iso_format(date_string):
     return True
 
 
-def validate_dict(dict_orig, chain_id, nft_address):
-    """Performs shacl validation on a dict. Returns a tuple of conforms, error messages."""
+def validate_shacl(dict_orig, version):
+    """Validates a dict with pyshacl. Returns a tuple of conforms, error messages."""
     dictionary = copy.deepcopy(dict_orig)
     dictionary["@type"] = "DDO"
+    # @context key is reserved in JSON-LD format
+    dictionary["@context"] = {"@vocab": "http://schema.org/"}
+    dictionary_as_string = json.dumps(dictionary)
+
+    shapes_graph = get_shapes_graph(version)
+    dataGraph = rdflib.Graph().parse(data=dictionary_as_string, format="json-ld")
+
+    conforms, results_graph, _ = validate(dataGraph, shacl_graph=shapes_graph)
+
+    return conforms, parse_report_to_errors(results_graph)
+
+
+def validate_native(dict_orig, version):
+    """Validates a dict with the validator compiled from the shapes. Returns a tuple of
+    conforms, error messages, None if the dict must be validated by pyshacl."""
+    native_validator = get_native_validator(version)
+    if not native_validator:
+        return None
+
+    try:
+        return native_validator.validate(dict_orig)
+    except UnsupportedDdo as e:
+        logger.debug(f"Validating {dict_orig.get('id')} with pyshacl: {e}")
+        return None
+
+
+def get_ddo_validation_pool():
+    """Returns the pool validating DDOs in worker processes which hold the parsed shapes,
+    None if DDOs are validated inline (VALIDATION_POOL_SIZE=0)."""
+    return get_validation_pool(initializer=preload_shapes_graphs)
+
+
+def validate_dict(dict_orig, chain_id, nft_address, es_instance=None):
+    """Performs shacl validation on a dict, in the validation pool if it is enabled.
+    Results are cached by DDO content, see get_validation_cache_key, in this process and,
+    if es_instance is given, in ES for the other processes.
+    Returns a tuple of conforms, error messages."""
+    validation_cache = get_validation_cache()
+    shared_cache = get_shared_validation_cache(es_instance)
+    cache_key = (
+        get_validation_cache_key(dict_orig, chain_id, nft_address)
+        if validation_cache or shared_cache
+        else None
+    )
+    if cache_key and validation_cache:
+        result = validation_cache.get(cache_key)
+        if result:
+            return result
+    if cache_key and shared_cache:
+        result = shared_cache.get(cache_key)
+        if result:
+            if validation_cache:
+                validation_cache.put(cache_key, result)
+            return result
+
+    validation_pool = get_ddo_validation_pool()
+    if validation_pool:
+        result = validation_pool.run(
+            validate_dict_inline, dict_orig, chain_id, nft_address
+        )
+    else:
+        result = validate_dict_inline(dict_orig, chain_id, nft_address)
+
+    if cache_key:
+        for cache in [validation_cache, shared_cache]:
+            if cache:
+                cache.put(cache_key, result)
+
+    return result
+
+
+def validate_dict_inline(dict_orig, chain_id, nft_address):
+    """Performs shacl validation on a dict in this process. Returns a tuple of conforms, error messages."""
     extra_errors = {}
 
     if "@context" not in dict_orig or not isinstance(
@@ -98,17 +240,25 @@ def validate_dict(dict_orig, chain_id, nft_address):
 
     if not make_did(nft_address, str(chain_id)) == dict_orig.get("id"):
         extra_errors["id"] = "did is not valid for chain Id and nft address"
-    # @context key is reserved in JSON-LD format
-    dictionary["@context"] = {"@vocab": "http://schema.org/"}
-    dictionary_as_string = json.dumps(dictionary)
-
-    version = dictionary.get("version", CURRENT_VERSION)
-    schema_file = get_schema(version)
-    dataGraph = rdflib.Graph().parse(data=dictionary_as_string, format="json-ld")
 
-    conforms, results_graph, _ = validate(dataGraph, shacl_graph=schema_file)
-    errors = parse_report_to_errors(results_graph)
+    version = dict_orig.get("version", CURRENT_VERSION)
+    validator = get_ddo_validator()
+    result = None
+    if validator != "shacl":
+        result = validate_native(dict_orig, version)
+    if result is None or validator == "differential":
+        shacl_result = validate_shacl(dict_orig, version)
+        if result is not None and (result[0], set(result[1])) != (
+            shacl_result[0],
+            set(shacl_result[1]),
+        ):
+            logger.error(
+                f"Native and SHACL validation differ for {dict_orig.get('id')}: "
+                f"native {result}, SHACL {shacl_result}."
+            )
+        result = shacl_result
 
+    conforms, errors = result
     if extra_errors:
         conforms = False
 
@@ -0,0 +1,234 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+
+import elasticsearch
+
+from aquarius.app.util import get_bool_env_value
+from aquarius.events.constants import AquariusCustomDDOFields
+
+logger = logging.getLogger(__name__)
+
+_cache = None
+_cache_lock = Lock()
+_shared_caches = {}
+
+
+def get_validation_cache_ttl():
+    try:
+        return float(os.getenv("VALIDATION_CACHE_TTL", 3600))
+    except ValueError:
+        return 3600
+
+
+def get_validation_cache():
+    """Returns the ValidationCache of this process, None if it is disabled
+    (VALIDATION_CACHE_SIZE=0)."""
+    global _cache
+    try:
+        max_size = int(os.getenv("VALIDATION_CACHE_SIZE", 1024))
+    except ValueError:
+        max_size = 1024
+    ttl = get_validation_cache_ttl()
+    if max_size <= 0 or ttl <= 0:
+        return None
+
+    with _cache_lock:
+        if not _cache or (_cache.max_size, _cache.ttl) != (max_size, ttl):
+            _cache = ValidationCache(max_size, ttl)
+        return _cache
+
+
+def get_validation_cache_key(dict_orig, chain_id, nft_address):
+    """Returns the cache key of a validation, None if the DDO can not be serialized.
+
+    The DDO is hashed as canonical json, without the keys Aquarius adds to it (eg: nft,
+    event), which are not validated: a DDO validated by /ddo/validate has the key of the
+    same DDO validated by the events monitor.
+    """
+    custom_fields = AquariusCustomDDOFields.get_all_values()
+    ddo = {k: v for k, v in dict_orig.items() if k not in custom_fields}
+    try:
+        canonical = json.dumps(
+            ddo, sort_keys=True, separators=(",", ":"), allow_nan=False
+        )
+    except (TypeError, ValueError):
+        return None
+
+    return (
+        sha256(canonical.encode("utf-8")).hexdigest(),
+        str(dict_orig.get("version")),
+        str(chain_id),
+        str(nft_address),
+    )
+
+
+def get_shared_validation_cache(es_instance):
+    """Returns the SharedValidationCache of an ElasticsearchInstance, None if it is disabled
+    (VALIDATION_CACHE_SHARED=0 or VALIDATION_CACHE_TTL=0) or there is no ES instance.
+    """
+    ttl = get_validation_cache_ttl()
+    if (
+        not es_instance
+        or ttl <= 0
+        or not get_bool_env_value("VALIDATION_CACHE_SHARED", 1)
+    ):
+        return None
+
+    with _cache_lock:
+        cache = _shared_caches.get(id(es_instance))
+        if not cache or cache.ttl != ttl:
+            cache = _shared_caches[id(es_instance)] = SharedValidationCache(
+                es_instance, ttl
+            )
+        return cache
+
+
+class ValidationCache:
+    """Results of validate_dict in this process, by DDO content, version, chainId and
+    nftAddress.
+
+    Holds at most max_size results, the least recently used are evicted, and results
+    expire ttl seconds after the validation.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._results = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the (conforms, errors) result of key, None if it is not cached."""
+        with self._lock:
+            entry = self._results.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._results.move_to_end(key)
+                self.hits += 1
+                conforms, errors = entry[1]
+                return conforms, dict(errors)
+
+            if entry:
+                del self._results[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        conforms, errors = result
+        with self._lock:
+            self._results[key] = (time.monotonic() + self.ttl, (conforms, dict(errors)))
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._results),
+            }
+
+
+class SharedValidationCache:
+    """Results of validate_dict, stored in the `_validations` ES index by cache key, so that
+    they are shared by all Aquarius processes: eg: a DDO validated by /ddo/validate in the API
+    is not validated again when the events monitor indexes it.
+
+    Results expire ttl seconds after the validation, expired ones are deleted every
+    EVICTION_INTERVAL writes.
+    """
+
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, es_instance, ttl):
+        self._es_instance = es_instance
+        self._index = f"{es_instance.db_index}_validations"
+        self.ttl = ttl
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._es_instance.es.indices.create(
+            index=self._index,
+            mappings={
+                "properties": {
+                    "conforms": {"type": "boolean"},
+                    "errors": {"type": "object", "enabled": False},
+                    "expires": {"type": "double"},
+                }
+            },
+            ignore=400,
+        )
+
+    @staticmethod
+    def get_doc_id(key):
+        return sha256("|".join(key).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns the (conforms, errors) result of key, None if it is not cached."""
+        try:
+            result = self._es_instance.es.get(
+                index=self._index, id=self.get_doc_id(key)
+            )["_source"]
+            if result["expires"] <= time.time():
+                result = None
+        except elasticsearch.NotFoundError:
+            result = None
+        except Exception as e:
+            logger.error(f"Failed to read validation result {key}: {e}")
+            result = None
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return result["conforms"], dict(result["errors"])
+
+    def put(self, key, result):
+        conforms, errors = result
+        try:
+            self._es_instance.es.index(
+                index=self._index,
+                id=self.get_doc_id(key),
+                body={
+                    "conforms": conforms,
+                    "errors": errors,
+                    "expires": time.time() + self.ttl,
+                },
+            )
+        except Exception as e:
+            logger.error(f"Failed to store validation result {key}: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.EVICTION_INTERVAL:
+                return
+        self.evict()
+
+    def evict(self):
+        """Deletes the expired results."""
+        try:
+            self._es_instance.es.delete_by_query(
+                index=self._index,
+                query={"range": {"expires": {"lte": time.time()}}},
+            )
+        except Exception as e:
+            logger.error(f"Failed to evict validation results: {e}")
+
+    def get_stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
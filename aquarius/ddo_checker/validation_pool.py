@@ -0,0 +1,138 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from threading import BoundedSemaphore, Lock
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = Lock()
+
+
+class ValidationPoolBusy(Exception):
+    """Raised when the validation queue stays full for the whole timeout."""
+
+
+def get_validation_pool_settings():
+    """Returns (size, queue_size, timeout) from VALIDATION_POOL_SIZE (default 0: validate
+    inline), VALIDATION_QUEUE_SIZE (default 64) and VALIDATION_TIMEOUT (seconds, default 30).
+    """
+    settings = []
+    for env_name, default, cast in [
+        ("VALIDATION_POOL_SIZE", 0, int),
+        ("VALIDATION_QUEUE_SIZE", 64, int),
+        ("VALIDATION_TIMEOUT", 30, float),
+    ]:
+        try:
+            settings.append(max(0, cast(os.getenv(env_name, default))))
+        except ValueError:
+            settings.append(default)
+
+    return tuple(settings)
+
+
+def get_validation_pool(initializer=None):
+    """Returns the ValidationPool of this process, None if VALIDATION_POOL_SIZE is 0.
+
+    Args:
+        initializer: called when a worker process starts, eg: to parse the shapes
+    """
+    global _pool
+    size, queue_size, timeout = get_validation_pool_settings()
+    if not size:
+        return None
+
+    with _pool_lock:
+        # a forked process can not use the workers of its parent
+        if not _pool or _pool.pid != os.getpid():
+            _pool = ValidationPool(size, queue_size, timeout, initializer)
+        return _pool
+
+
+def _noop():
+    return None
+
+
+class ValidationPool:
+    """Runs validations in worker processes, so that they use all cores and do not hold
+    the GIL of the API workers (gevent) or of the events monitor threads.
+
+    Workers are started with the spawn method, as the calling process runs threads,
+    and are warmed up when the pool is created: the initializer runs in each of them.
+    At most size validations run at once, and queue_size more wait for a worker.
+    """
+
+    def __init__(self, size, queue_size, timeout, initializer=None):
+        self.size = size
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._initializer = initializer
+        self._slots = BoundedSemaphore(size + queue_size)
+        self._lock = Lock()
+        self._executor = self._start_executor()
+
+    def _start_executor(self):
+        executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self._initializer,
+        )
+        # starts all the workers now, instead of on the first validations
+        for _ in range(self.size):
+            executor.submit(_noop)
+        logger.info(f"Started {self.size} validation workers.")
+
+        return executor
+
+    def run(self, fn, *args):
+        """Runs fn(*args) in a worker and returns its result. Raises ValidationPoolBusy if
+        the queue is full for timeout seconds and TimeoutError if fn does not return in
+        timeout seconds.
+
+        Args:
+            fn: module level function, so that it can be sent to the workers
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ValidationPoolBusy(
+                f"More than {self.size + self.queue_size} validations are pending."
+            )
+
+        try:
+            with self._lock:
+                executor = self._executor
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._restart(executor)
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # frees the queue slot, unless a worker is already running it
+            future.cancel()
+            raise
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+    def _restart(self, executor):
+        """Replaces a broken executor, eg: after a worker was killed."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            logger.error("A validation worker died, restarting the validation pool.")
+            executor.shutdown(wait=False)
+            self._executor = self._start_executor()
+
+    def shutdown(self):
+        with self._lock:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,91 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+class AddressBook:
+    """Contract addresses of an address.json file, indexed by network name and chain id.
+
+    The file is parsed on first use and again only when its mtime changes, so lookups
+    made for every processed event do not touch the disk beyond a stat call.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = Lock()
+        self._mtime = None
+        self._networks = {}
+        self._chain_networks = {}
+
+    def _refresh(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+
+            with open(self.path) as f:
+                networks = json.load(f)
+
+            chain_networks = {}
+            for name, values in networks.items():
+                if "chainId" in values:
+                    chain_networks.setdefault(values["chainId"], []).append(name)
+
+            self._networks = networks
+            self._chain_networks = chain_networks
+            self._mtime = mtime
+            logger.debug(f"Loaded {len(networks)} networks from {self.path}")
+
+    def get_network(self, network_name: str) -> dict:
+        """Returns the addresses of a network, by name (eg: "polygon")."""
+        self._refresh()
+        return self._networks[network_name]
+
+    def get_chain_networks(self, chain_id: int) -> list:
+        """Returns the addresses of all networks with chain_id, in file order."""
+        self._refresh()
+        networks = self._networks
+        return [networks[name] for name in self._chain_networks.get(chain_id, [])]
+
+    def get_address(self, chain_id: int, address_type: str):
+        """Returns the address of a contract type on chain_id, or None if not configured.
+        If several networks share chain_id, the last one defining address_type wins.
+        """
+        for network in reversed(self.get_chain_networks(chain_id)):
+            if address_type in network:
+                return network[address_type]
+
+        return None
+
+    def get_start_block(self, chain_id: int) -> int:
+        """Returns the startBlock of the first network with chain_id."""
+        networks = self.get_chain_networks(chain_id)
+        if not networks:
+            raise KeyError(f"No network configured for chain id {chain_id}.")
+
+        return networks[0]["startBlock"]
+
+
+_ADDRESS_BOOKS = {}
+_ADDRESS_BOOKS_LOCK = Lock()
+
+
+def get_address_book(path) -> AddressBook:
+    """Returns the process wide address book of an address file."""
+    path = Path(path)
+    with _ADDRESS_BOOKS_LOCK:
+        if path not in _ADDRESS_BOOKS:
+            _ADDRESS_BOOKS[path] = AddressBook(path)
+
+        return _ADDRESS_BOOKS[path]
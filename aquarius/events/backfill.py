@@ -0,0 +1,202 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+from threading import Lock, Thread
+
+import elasticsearch
+
+from aquarius.config import get_version
+from aquarius.events.checkpoint import Checkpoint
+
+logger = logging.getLogger(__name__)
+
+
+def split_block_range(from_block, to_block, shards):
+    """Splits [from_block, to_block] in at most `shards` consecutive ranges of (almost) equal size."""
+    blocks = to_block - from_block + 1
+    if blocks <= 0:
+        return []
+
+    shards = max(1, min(shards, blocks))
+    size, remainder = divmod(blocks, shards)
+    ranges = []
+    start = from_block
+    for i in range(shards):
+        end = start + size - 1 + (1 if i < remainder else 0)
+        ranges.append((start, end))
+        start = end + 1
+
+    return ranges
+
+
+class BackfillShard:
+    """A block range of a backfill, with its own cursor document in the `_plus` index."""
+
+    def __init__(self, es_instance, index, doc_id, from_block, to_block):
+        self.doc_id = doc_id
+        self.from_block = from_block
+        self.to_block = to_block
+        self.cursor = Checkpoint(es_instance, index, doc_id)
+        try:
+            self.cursor.load()
+        except elasticsearch.NotFoundError:
+            pass
+        if not isinstance(self.cursor.block, int):
+            self.cursor.block = from_block - 1
+
+    @property
+    def last_block(self):
+        return self.cursor.block
+
+    @property
+    def done(self):
+        return self.cursor.block >= self.to_block
+
+    def store_last_processed_block(self, block):
+        if block <= self.cursor.block:
+            return
+        self.cursor.update(
+            block,
+            {
+                "last_block": block,
+                "from_block": self.from_block,
+                "to_block": self.to_block,
+                "version": get_version(),
+            },
+        )
+
+
+class Backfill:
+    """Replays the blocks between the last processed block and the chain head with several workers.
+
+    The range is split in shards, each processed by its own thread, with its own cursor
+    document in the `_plus` index, so that an interrupted backfill resumes where every shard
+    stopped. The shards are merged into the events monitor checkpoint as they meet: it is moved
+    to the last processed block of the first shard, and past every following shard that is done.
+
+    Each shard adapts its own chunk size, starting from the one of the events monitor, which
+    only follows (and stores) the chunk size of the blocks processed at the chain head.
+
+    Shards run concurrently, so the events of a DID are not processed in block order across
+    shards; the event processors only apply events that are newer than the stored DDO.
+    """
+
+    def __init__(self, events_monitor, shards, to_block=None):
+        """
+        Args:
+            events_monitor: EventsMonitor of the chain, processing the events
+            shards: number of shards, ie: concurrent workers
+            to_block: last block to backfill, defaults to the current block
+        """
+        self._monitor = events_monitor
+        self._es_instance = events_monitor._es_instance
+        self._index = events_monitor._other_db_index
+        self._chain_id = events_monitor._chain_id
+        self._manifest_id = f"events_backfill_{self._chain_id}"
+        self._lock = Lock()
+        self.shards = self.get_or_create_shards(shards, to_block)
+
+    def get_or_create_shards(self, shards, to_block):
+        """Returns the shards of the unfinished backfill of this chain, or splits a new one."""
+        try:
+            ranges = self._es_instance.es.get(index=self._index, id=self._manifest_id)[
+                "_source"
+            ]["shards"]
+            logger.info(f"Resuming backfill of chain {self._chain_id}: {ranges}")
+        except elasticsearch.NotFoundError:
+            from_block = self._monitor.get_cached_last_block() + 1
+            if to_block is None:
+                to_block = self._monitor._web3.eth.block_number
+            ranges = split_block_range(from_block, to_block, shards)
+            if not ranges:
+                return []
+            self._es_instance.es.index(
+                index=self._index,
+                id=self._manifest_id,
+                body={"shards": ranges, "version": get_version()},
+            )
+
+        return [
+            BackfillShard(
+                self._es_instance,
+                self._index,
+                f"{self._manifest_id}_{i}",
+                from_block,
+                to_block,
+            )
+            for i, (from_block, to_block) in enumerate(ranges)
+        ]
+
+    def run(self):
+        """Processes all shards, returns once they are done and merged into the checkpoint."""
+        if not self.shards:
+            return
+
+        logger.info(
+            f"Backfilling chain {self._chain_id} from {self.shards[0].from_block} "
+            f"to {self.shards[-1].to_block} with {len(self.shards)} shards."
+        )
+        threads = [
+            Thread(target=self.process_shard, args=(shard,), daemon=True)
+            for shard in self.shards
+            if not shard.done
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.merge()
+        if all(shard.done for shard in self.shards):
+            self.clean()
+        else:
+            logger.error(
+                f"Backfill of chain {self._chain_id} is incomplete, it will be resumed on the next run."
+            )
+
+    def process_shard(self, shard):
+        def store_last_processed_block(block):
+            shard.store_last_processed_block(block)
+            self.merge()
+
+        try:
+            self._monitor.process_block_range(
+                shard.last_block + 1,
+                shard.to_block,
+                store_last_processed_block,
+                chunk_sizer=self._monitor._chunk_sizer.copy(),
+            )
+            # blocks that failed were added to the retry queue, like the monitor does
+            store_last_processed_block(shard.to_block)
+        except Exception as e:
+            logger.error(
+                f"Backfill shard {shard.from_block}-{shard.to_block} failed: {e}"
+            )
+        shard.cursor.flush()
+
+    def merge(self):
+        """Moves the events monitor checkpoint over the shards that met."""
+        with self._lock:
+            block = self._monitor.get_cached_last_block()
+            for shard in self.shards:
+                if shard.from_block > block + 1:
+                    break
+                block = max(block, shard.last_block)
+                if not shard.done:
+                    break
+
+            self._monitor.store_last_processed_block(block)
+
+            return block
+
+    def clean(self):
+        """Deletes the cursors and manifest of a finished backfill."""
+        self._monitor._checkpoint.flush()
+        for doc_id in [shard.doc_id for shard in self.shards] + [self._manifest_id]:
+            try:
+                self._es_instance.es.delete(index=self._index, id=doc_id)
+            except elasticsearch.NotFoundError:
+                pass
+        logger.info(f"Backfill of chain {self._chain_id} done.")
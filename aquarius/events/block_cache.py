@@ -0,0 +1,133 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+import os
+from threading import Lock
+
+import lru
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from aquarius.events.http_provider import batch_request, is_batching_enabled
+
+logger = logging.getLogger(__name__)
+
+HEADER_FIELDS = ["number", "hash", "parentHash", "timestamp"]
+
+
+def get_env_int(env_name, default_value):
+    try:
+        return max(0, int(os.getenv(env_name, default_value)))
+    except ValueError:
+        return default_value
+
+
+class BlockHeaderCache:
+    """Bounded cache of block headers, keyed by (chain_id, block_number).
+
+    Headers of blocks more than `confirmations` blocks behind the chain head are
+    considered final and served as they are. More recent headers can still be reorged,
+    so they are only served if their hash matches the block hash of the requesting event.
+
+    Headers are prefilled with JSON-RPC batches of up to prefill_batch_size calls, even if
+    EVENTS_RPC_BATCH_SIZE is 0: fetching them one by one costs a round trip each.
+    """
+
+    def __init__(self, size=4096, confirmations=64, prefill_batch_size=100):
+        self._headers = lru.LRU(max(1, size))
+        self._heads = {}
+        self._lock = Lock()
+        self.confirmations = confirmations
+        self.prefill_batch_size = prefill_batch_size
+        self.hits = 0
+        self.misses = 0
+
+    def set_head(self, chain_id, block_number):
+        """Records the latest block number seen on a chain."""
+        with self._lock:
+            self._heads[chain_id] = max(block_number, self._heads.get(chain_id, 0))
+
+    def is_final(self, chain_id, block_number):
+        head = self._heads.get(chain_id)
+        return head is not None and block_number <= head - self.confirmations
+
+    def _put(self, chain_id, block):
+        header = AttributeDict({field: block[field] for field in HEADER_FIELDS})
+        with self._lock:
+            self._headers[(chain_id, header.number)] = header
+
+        return header
+
+    def _get_cached(self, chain_id, block_number, block_hash=None):
+        with self._lock:
+            header = self._headers.get((chain_id, block_number))
+            if header is None:
+                return None
+            if self.is_final(chain_id, block_number):
+                return header
+            if block_hash is not None and HexBytes(header.hash) == HexBytes(block_hash):
+                return header
+
+        return None
+
+    def get(self, web3, chain_id, block_number, block_hash=None):
+        """Returns the header of a block, fetching it if not cached.
+
+        Args:
+            web3: Web3 instance of chain_id
+            chain_id: chain id of the block
+            block_number: block number
+            block_hash: expected block hash, used to validate headers that are not final yet
+        """
+        header = self._get_cached(chain_id, block_number, block_hash)
+        if header is not None:
+            with self._lock:
+                self.hits += 1
+            return header
+
+        with self._lock:
+            self.misses += 1
+
+        return self._put(chain_id, web3.eth.get_block(block_number))
+
+    def prefill(self, web3, chain_id, block_numbers):
+        """Fetches the headers of missing blocks with JSON-RPC batches of prefill_batch_size calls.
+        Does nothing if the provider does not batch calls, headers are then fetched on first use.
+        """
+        with self._lock:
+            missing = sorted(
+                {
+                    number
+                    for number in block_numbers
+                    if (chain_id, number) not in self._headers
+                }
+            )
+        if len(missing) < 2 or not is_batching_enabled(web3, self.prefill_batch_size):
+            return
+
+        results = batch_request(
+            web3,
+            [("eth_getBlockByNumber", [hex(number), False]) for number in missing],
+            self.prefill_batch_size,
+        )
+        for block in results:
+            if block is None or isinstance(block, Exception):
+                # fetched again on first use
+                continue
+            self._put(chain_id, block)
+
+    def get_stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._headers)}
+
+
+_BLOCK_CACHE = BlockHeaderCache(
+    size=get_env_int("EVENTS_BLOCK_CACHE_SIZE", 4096),
+    confirmations=get_env_int("EVENTS_BLOCK_CONFIRMATIONS", 64),
+    prefill_batch_size=get_env_int("EVENTS_BLOCK_PREFILL_BATCH_SIZE", 100),
+)
+
+
+def get_block_cache():
+    return _BLOCK_CACHE
@@ -0,0 +1,265 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# writer and source event of the events processed by the current thread
+_context = threading.local()
+
+
+def get_bulk_writer_settings():
+    """Returns (max_actions, flush_interval) from EVENTS_BULK_MAX_ACTIONS (default 500, 0 to
+    write every document with its own request) and EVENTS_BULK_FLUSH_INTERVAL (seconds,
+    default 5).
+    """
+    settings = []
+    for env_name, default in [
+        ("EVENTS_BULK_MAX_ACTIONS", 500),
+        ("EVENTS_BULK_FLUSH_INTERVAL", 5),
+    ]:
+        try:
+            settings.append(max(0, int(os.getenv(env_name, default))))
+        except ValueError:
+            settings.append(default)
+
+    return tuple(settings)
+
+
+def get_bulk_writer(es=None):
+    """Returns the BulkWriter of the events processed by the current thread, None if writes
+    are not buffered.
+
+    Args:
+        es: Elasticsearch client, only a writer of this client is returned
+    """
+    writer = getattr(_context, "writer", None)
+    if writer is None or (es is not None and writer.es is not es):
+        return None
+
+    return writer
+
+
+def get_action_meta(index, doc_id, if_seq_no=None, if_primary_term=None):
+    meta = {"_index": index, "_id": doc_id}
+    if if_seq_no is not None:
+        meta.update(if_seq_no=if_seq_no, if_primary_term=if_primary_term)
+
+    return meta
+
+
+class BulkWriter:
+    """Buffers the index/update/delete operations of the events of a chunk, and sends them
+    to ES with bulk requests.
+
+    Operations are sent once max_actions are pending, or when one is added and the oldest
+    is pending for flush_interval seconds, without waiting for a refresh. `commit` sends
+    the pending operations and refreshes the written indices once, at the end of the chunk.
+
+    Each operation is tagged with the event being processed by the calling thread (see
+    `source`), and on_failure(event, nft_address, error) is called for the events whose
+    operations failed, eg: to add them to the retry queue.
+
+    Documents with pending operations are sent before being read (see `flush_doc`), so
+    that the processors of an event see the writes of the previous ones.
+    """
+
+    def __init__(self, es, max_actions=500, flush_interval=5, on_failure=None):
+        self.es = es
+        self.max_actions = max_actions
+        self.flush_interval = flush_interval
+        self._on_failure = on_failure
+        self._lock = threading.Lock()
+        # held while sending, so that flushes keep the order of the operations
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._pending_keys = set()
+        self._flushing_keys = set()
+        self._pending_since = None
+        self._written_indices = set()
+        self.stats = {"actions": 0, "requests": 0, "failed": 0}
+
+    @contextmanager
+    def source(self, event, nft_address=None):
+        """Buffers the writes of the current thread in this writer, as operations of event.
+
+        Args:
+            event: event being processed, reported to on_failure if an operation fails
+            nft_address: address of the NFT of the event, if it is not event.address
+        """
+        previous = (
+            getattr(_context, "writer", None),
+            getattr(_context, "source", None),
+        )
+        _context.writer = self
+        _context.source = (event, nft_address)
+        try:
+            yield self
+        finally:
+            _context.writer, _context.source = previous
+
+    def index(self, index, doc_id, document, if_seq_no=None, if_primary_term=None):
+        """Adds an index operation (write the whole document). Returns doc_id.
+
+        Args:
+            if_seq_no, if_primary_term: of the read document, the operation fails if it
+                changed since
+        """
+        return self._add(
+            {"index": get_action_meta(index, doc_id, if_seq_no, if_primary_term)},
+            document,
+        )
+
+    def create(self, index, doc_id, document):
+        """Adds a create operation: writes the document, the operation fails if it already
+        exists. Returns doc_id.
+        """
+        return self._add({"create": get_action_meta(index, doc_id)}, document)
+
+    def update(
+        self,
+        index,
+        doc_id,
+        doc=None,
+        script=None,
+        if_seq_no=None,
+        if_primary_term=None,
+    ):
+        """Adds an update operation: merges doc into the stored document, or runs script on
+        it. Returns doc_id.
+        """
+        if isinstance(doc, str):
+            doc = json.loads(doc)
+        return self._add(
+            {"update": get_action_meta(index, doc_id, if_seq_no, if_primary_term)},
+            {"script": script} if script else {"doc": doc},
+        )
+
+    def delete(self, index, doc_id, if_seq_no=None, if_primary_term=None):
+        """Adds a delete operation. Returns doc_id."""
+        return self._add(
+            {"delete": get_action_meta(index, doc_id, if_seq_no, if_primary_term)}
+        )
+
+    def _add(self, action, body=None):
+        ((_, meta),) = action.items()
+        source = getattr(_context, "source", None) if self.is_current() else None
+        with self._lock:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append((action, body, source))
+            self._pending_keys.add((meta["_index"], meta["_id"]))
+            due = len(self._pending) >= self.max_actions or (
+                time.monotonic() - self._pending_since >= self.flush_interval
+            )
+
+        if due:
+            self.flush()
+
+        return meta["_id"]
+
+    def is_current(self):
+        return getattr(_context, "writer", None) is self
+
+    def flush_doc(self, index, doc_id):
+        """Sends the pending operations if one of them is on the document, and waits for
+        those being sent, so that it can be read.
+        """
+        key = (index, doc_id)
+        with self._lock:
+            if key not in self._pending_keys and key not in self._flushing_keys:
+                return
+        self.flush()
+
+    def flush(self):
+        """Sends the pending operations. Returns the list of failed (event, error)."""
+        with self._flush_lock:
+            with self._lock:
+                pending = self._pending
+                self._flushing_keys = self._pending_keys
+                self._pending = []
+                self._pending_keys = set()
+                self._pending_since = None
+            try:
+                return self._send(pending)
+            finally:
+                with self._lock:
+                    self._flushing_keys = set()
+
+    def _send(self, pending):
+        if not pending:
+            return []
+
+        operations = []
+        for action, body, _ in pending:
+            operations.append(action)
+            if body is not None:
+                operations.append(body)
+
+        self.stats["requests"] += 1
+        self.stats["actions"] += len(pending)
+        try:
+            response = self.es.bulk(operations=operations)
+            errors = [self._get_item_error(item) for item in response["items"]]
+        except Exception as e:
+            logger.error(f"Bulk request of {len(pending)} operations failed: {e}")
+            errors = [f"Bulk request failed: {e}"] * len(pending)
+
+        failures = []
+        failed_events = set()
+        for (action, _, source), error in zip(pending, errors):
+            ((op_type, meta),) = action.items()
+            if not error:
+                self._written_indices.add(meta["_index"])
+                continue
+
+            self.stats["failed"] += 1
+            error = f"Failed to {op_type} {meta['_id']} in {meta['_index']}: {error}"
+            logger.error(error)
+            if source is None or id(source[0]) in failed_events:
+                continue
+
+            # one report by event, even if several of its operations failed
+            failed_events.add(id(source[0]))
+            failures.append((source[0], error))
+            if self._on_failure:
+                try:
+                    self._on_failure(source[0], source[1], error)
+                except Exception as e:
+                    logger.error(f"Failed to report a bulk failure: {e}")
+
+        return failures
+
+    @staticmethod
+    def _get_item_error(item):
+        (result,) = item.values()
+        if result.get("status", 500) < 300:
+            return None
+        # a delete of a missing document is not an error
+        if "delete" in item and result.get("status") == 404:
+            return None
+
+        return result.get("error") or f"status {result.get('status')}"
+
+    def commit(self):
+        """Sends the pending operations and refreshes the indices written since the last
+        commit. Returns the list of failed (event, error).
+        """
+        failures = self.flush()
+        with self._flush_lock:
+            indices = sorted(self._written_indices)
+            self._written_indices = set()
+        if indices:
+            try:
+                self.es.indices.refresh(index=",".join(indices))
+            except Exception as e:
+                logger.error(f"Failed to refresh {indices}: {e}")
+
+        return failures
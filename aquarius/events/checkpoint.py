@@ -0,0 +1,165 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+import os
+import time
+from threading import Lock
+
+import elasticsearch
+
+logger = logging.getLogger(__name__)
+
+
+def get_checkpoint_flush_settings():
+    """Returns (flush_interval, flush_blocks) from EVENTS_CHECKPOINT_INTERVAL and EVENTS_CHECKPOINT_BLOCKS.
+    Both default to 0, ie: every update is written.
+    """
+    settings = []
+    for env_name in ["EVENTS_CHECKPOINT_INTERVAL", "EVENTS_CHECKPOINT_BLOCKS"]:
+        try:
+            settings.append(max(0, int(os.getenv(env_name, 0))))
+        except ValueError:
+            settings.append(0)
+
+    return tuple(settings)
+
+
+class Checkpoint:
+    """Last processed block of a block processing loop, stored as a document in ES.
+
+    The block is kept in memory, and ES is only read when loading (at startup) or after a
+    conflicting write. Writes do not wait for an index refresh, and can be coalesced: the
+    document is written once flush_interval seconds passed or the block advanced by
+    flush_blocks since the last write. Call `flush` before shutting down.
+
+    Writes are conditional on the seq_no/primary_term of the last read or written version. If
+    someone else wrote the document in between (eg: the force_set_block command), the stored
+    document wins and the in-memory block is replaced by its last_block.
+    """
+
+    def __init__(
+        self, es_instance, index, doc_id, flush_interval=None, flush_blocks=None
+    ):
+        env_interval, env_blocks = get_checkpoint_flush_settings()
+        self._es_instance = es_instance
+        self._index = index
+        self._doc_id = doc_id
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else env_interval
+        )
+        self.flush_blocks = flush_blocks if flush_blocks is not None else env_blocks
+        self._lock = Lock()
+        self.block = None
+        self.record = None
+        self._seq_no = None
+        self._primary_term = None
+        self._pending = False
+        self._flushed_block = None
+        self._flushed_at = 0
+
+    def load(self):
+        """Reads the document from ES and returns its source.
+        Raises elasticsearch.NotFoundError if there is no document yet.
+        """
+        with self._lock:
+            return self._load()
+
+    def _load(self):
+        try:
+            result = self._es_instance.es.get(index=self._index, id=self._doc_id)
+        except elasticsearch.NotFoundError:
+            self.block = None
+            self.record = None
+            self._seq_no = None
+            self._primary_term = None
+            self._pending = False
+            raise
+
+        self.record = result["_source"]
+        self.block = self.record.get("last_block")
+        self._seq_no = result.get("_seq_no")
+        self._primary_term = result.get("_primary_term")
+        self._pending = False
+        self._flushed_block = self.block
+
+        return self.record
+
+    def update(self, block, record):
+        """Sets the last processed block in memory, and writes it to ES if a flush is due.
+
+        Args:
+            block: last processed block
+            record: document to store, containing last_block
+        """
+        with self._lock:
+            self.block = block
+            self.record = record
+            self._pending = True
+            if self._is_flush_due():
+                self._flush()
+
+    def _is_flush_due(self):
+        if not self.flush_interval and not self.flush_blocks:
+            return True
+        if (
+            self.flush_interval
+            and time.time() - self._flushed_at >= self.flush_interval
+        ):
+            return True
+
+        return bool(
+            self.flush_blocks
+            and (
+                self._flushed_block is None
+                or self.block - self._flushed_block >= self.flush_blocks
+            )
+        )
+
+    def flush(self):
+        """Writes the in-memory block to ES, if it was not written yet."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        kwargs = (
+            {"if_seq_no": self._seq_no, "if_primary_term": self._primary_term}
+            if self._seq_no is not None and self._primary_term is not None
+            else {"op_type": "create"}
+        )
+        try:
+            result = self._es_instance.es.index(
+                index=self._index, id=self._doc_id, body=self.record, **kwargs
+            )
+        except elasticsearch.ConflictError:
+            block = self.block
+            try:
+                self._load()
+                logger.warning(
+                    f"Checkpoint {self._doc_id} was changed by someone else, using its "
+                    f"last_block {self.block} instead of {block}."
+                )
+            except elasticsearch.NotFoundError:
+                logger.warning(f"Checkpoint {self._doc_id} was deleted.")
+            return
+        except elasticsearch.exceptions.RequestError:
+            logger.error(
+                f"Checkpoint {self._doc_id}: block={self.block} type={type(self.block)}, ES RequestError"
+            )
+            return
+        except Exception as e:
+            # kept pending, written with the next update or flush
+            logger.error(
+                f"Checkpoint {self._doc_id}: failed to store {self.block}: {e}"
+            )
+            return
+
+        self._seq_no = result.get("_seq_no")
+        self._primary_term = result.get("_primary_term")
+        self._pending = False
+        self._flushed_block = self.block
+        self._flushed_at = time.time()
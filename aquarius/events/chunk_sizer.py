@@ -0,0 +1,65 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveChunkSizer:
+    """Number of blocks to request in one get_logs call, adapted to the RPC (AIMD).
+
+    The size is halved when a request fails (eg: the RPC caps the number of results or times out)
+    and grows by a small step after each successful full size request. It also follows the log
+    density of the last chunk, so that a chunk is expected to return at most max_logs logs.
+    """
+
+    def __init__(self, initial_size, max_size=None, max_logs=5000, min_size=1):
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size if max_size else initial_size)
+        self.max_logs = max_logs
+        self.step = max(1, self.max_size // 20)
+        self._size = self._bounded(initial_size)
+
+    def copy(self):
+        """Returns a new sizer with the same settings, starting at the current size."""
+        return AdaptiveChunkSizer(
+            self._size,
+            max_size=self.max_size,
+            max_logs=self.max_logs,
+            min_size=self.min_size,
+        )
+
+    @property
+    def size(self):
+        return self._size
+
+    def _bounded(self, size):
+        return int(min(self.max_size, max(self.min_size, size)))
+
+    def on_success(self, blocks, logs_count):
+        """Updates the size after a get_logs call returned logs_count logs for blocks blocks."""
+        size = self._size
+        density_size = (
+            blocks * self.max_logs // logs_count
+            if self.max_logs and logs_count
+            else self.max_size
+        )
+        if density_size < size:
+            size = density_size
+        elif blocks >= size:
+            # only a full size chunk tells us that the RPC can handle more
+            size = min(size + self.step, density_size)
+
+        self._set_size(size)
+
+    def on_failure(self, blocks):
+        """Updates the size after a get_logs call failed for blocks blocks."""
+        self._set_size(min(self._size, blocks) // 2)
+
+    def _set_size(self, size):
+        size = self._bounded(size)
+        if size != self._size:
+            logger.debug(f"Block chunk size changed from {self._size} to {size}.")
+        self._size = size
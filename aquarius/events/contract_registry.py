@@ -0,0 +1,111 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import logging
+import os
+import weakref
+from pathlib import Path
+from threading import Lock
+
+import artifacts
+import lru
+from eth_utils.address import to_checksum_address
+from hexbytes import HexBytes
+from web3._utils.events import event_abi_to_log_topic
+
+logger = logging.getLogger(__name__)
+
+
+class ContractRegistry:
+    """Parsed contract artifacts, contract factories and event decoders.
+
+    Each artifact JSON is read and parsed once per process, and each contract factory is built
+    once per web3 instance. Binding a factory to an address is cheap, and the most recently
+    used bound contracts are kept as well.
+    """
+
+    def __init__(self, bound_contracts_size=1024):
+        self._lock = Lock()
+        self._definitions = {}
+        # per web3 instance: {contract_name: factory}, {contract_name: {topic: event}}
+        self._factories = weakref.WeakKeyDictionary()
+        self._event_decoders = weakref.WeakKeyDictionary()
+        self._bound_contracts = weakref.WeakKeyDictionary()
+        self._bound_contracts_size = bound_contracts_size
+
+    def get_definition(self, contract_name):
+        """Returns the parsed artifact JSON for a contract name."""
+        with self._lock:
+            if contract_name not in self._definitions:
+                path = os.path.join(artifacts.__file__, "..", f"{contract_name}.json")
+                path = Path(path).expanduser().resolve()
+
+                if not path.exists():
+                    raise TypeError("Contract name does not exist in artifacts.")
+
+                with open(path) as f:
+                    self._definitions[contract_name] = json.load(f)
+
+            return self._definitions[contract_name]
+
+    def get_factory(self, web3, contract_name):
+        """Returns the contract factory (without address) for a contract name."""
+        abi = self.get_definition(contract_name)["abi"]
+        with self._lock:
+            factories = self._factories.setdefault(web3, {})
+            if contract_name not in factories:
+                factories[contract_name] = web3.eth.contract(abi=abi)
+
+            return factories[contract_name]
+
+    def get_contract(self, web3, contract_name, address):
+        """Returns the contract bound to address."""
+        address = to_checksum_address(address)
+        with self._lock:
+            bound_contracts = self._bound_contracts.setdefault(
+                web3, lru.LRU(self._bound_contracts_size)
+            )
+            contract = bound_contracts.get((contract_name, address))
+        if contract:
+            return contract
+
+        contract = self.get_factory(web3, contract_name)(address=address)
+        with self._lock:
+            bound_contracts[(contract_name, address)] = contract
+
+        return contract
+
+    def get_event_decoders(self, web3, contract_name):
+        """Returns a mapping of event topic -> event, for all events in the contract ABI.
+        The events can decode logs emitted by any contract with the same ABI, eg: with process_receipt.
+        """
+        factory = self.get_factory(web3, contract_name)
+        with self._lock:
+            decoders = self._event_decoders.setdefault(web3, {})
+            if contract_name not in decoders:
+                decoders[contract_name] = {
+                    HexBytes(event_abi_to_log_topic(abi)).hex(): factory.events[
+                        abi["name"]
+                    ]()
+                    for abi in factory.abi
+                    if abi.get("type") == "event"
+                }
+
+            return decoders[contract_name]
+
+    def get_event(self, web3, contract_name, event_name):
+        """Returns the event decoder for an event name."""
+        for event in self.get_event_decoders(web3, contract_name).values():
+            if event.event_name == event_name:
+                return event
+
+        raise KeyError(f"Event {event_name} does not exist in {contract_name}.")
+
+
+_REGISTRY = ContractRegistry()
+
+
+def get_contract_registry():
+    return _REGISTRY
@@ -0,0 +1,165 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+import os
+import time
+from hashlib import sha256
+from threading import Lock
+
+import elasticsearch
+
+logger = logging.getLogger(__name__)
+
+_caches = {}
+_caches_lock = Lock()
+
+
+def get_decrypted_ddo_cache(es_instance):
+    """Returns the DecryptedDdoCache of an ElasticsearchInstance, None if it is disabled
+    (DECRYPTED_DDO_CACHE_SIZE=0) or there is no ES instance.
+    """
+    if not es_instance:
+        return None
+
+    try:
+        max_size = int(os.getenv("DECRYPTED_DDO_CACHE_SIZE", 10000))
+    except ValueError:
+        max_size = 10000
+    if max_size <= 0:
+        return None
+
+    with _caches_lock:
+        if id(es_instance) not in _caches:
+            _caches[id(es_instance)] = DecryptedDdoCache(es_instance, max_size)
+        return _caches[id(es_instance)]
+
+
+class DecryptedDdoCache:
+    """Decrypted DDOs, stored in the `_decrypted_ddos` ES index by metaDataHash.
+
+    MetadataCreated/Updated events carry the sha256 hash of the decrypted DDO, so a DDO stored
+    under that hash is the one the provider would return: the cache is consulted before
+    calling the provider, eg: when events are reprocessed from the retry queue, after
+    EVENTS_CLEAN_START or when a soft deleted DDO is restored. The hash is checked again when
+    reading, entries that do not match are dropped.
+
+    The index holds at most max_size DDOs, the least recently used are evicted.
+    """
+
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, es_instance, max_size):
+        self._es_instance = es_instance
+        self._index = f"{es_instance.db_index}_decrypted_ddos"
+        self.max_size = max_size
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._es_instance.es.indices.create(
+            index=self._index,
+            mappings={
+                "properties": {
+                    "content": {"type": "text", "index": False},
+                    "last_used": {"type": "long"},
+                }
+            },
+            ignore=400,
+        )
+
+    def get(self, metadata_hash):
+        """Returns the decrypted DDO (json string) with sha256 hash metadata_hash, None if it is not cached.
+
+        Args:
+            metadata_hash: hex sha256 hash of the decrypted DDO, without 0x prefix
+        """
+        try:
+            content = self._es_instance.es.get(index=self._index, id=metadata_hash)[
+                "_source"
+            ]["content"]
+        except elasticsearch.NotFoundError:
+            content = None
+        except Exception as e:
+            logger.error(f"Failed to read decrypted DDO {metadata_hash}: {e}")
+            content = None
+
+        if content is not None and (
+            sha256(content.encode("utf-8")).hexdigest() != metadata_hash
+        ):
+            logger.error(f"Cached DDO {metadata_hash} does not match its hash.")
+            self.delete(metadata_hash)
+            content = None
+
+        with self._lock:
+            if content is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        try:
+            self._es_instance.es.update(
+                index=self._index,
+                id=metadata_hash,
+                doc={"last_used": int(time.time())},
+            )
+        except Exception as e:
+            logger.debug(f"Failed to update last use of {metadata_hash}: {e}")
+
+        return content
+
+    def put(self, metadata_hash, content):
+        """Stores a decrypted DDO, and evicts the least recently used ones if the cache is full.
+
+        Args:
+            metadata_hash: hex sha256 hash of content, without 0x prefix
+            content: decrypted DDO, json string
+        """
+        try:
+            self._es_instance.es.index(
+                index=self._index,
+                id=metadata_hash,
+                body={"content": content, "last_used": int(time.time())},
+            )
+        except Exception as e:
+            logger.error(f"Failed to store decrypted DDO {metadata_hash}: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.EVICTION_INTERVAL:
+                return
+        self.evict()
+
+    def delete(self, metadata_hash):
+        try:
+            self._es_instance.es.delete(index=self._index, id=metadata_hash)
+        except Exception as e:
+            logger.debug(f"Failed to delete decrypted DDO {metadata_hash}: {e}")
+
+    def evict(self):
+        """Deletes the least recently used DDOs above max_size."""
+        try:
+            self._es_instance.es.indices.refresh(index=self._index)
+            count = self._es_instance.es.count(index=self._index)["count"]
+            if count <= self.max_size:
+                return
+
+            hits = self._es_instance.es.search(
+                index=self._index,
+                size=min(count - self.max_size, 10000),
+                sort=[{"last_used": "asc"}],
+                source=False,
+            )["hits"]["hits"]
+            self._es_instance.es.delete_by_query(
+                index=self._index,
+                query={"ids": {"values": [hit["_id"] for hit in hits]}},
+            )
+            logger.info(f"Evicted {len(hits)} decrypted DDOs.")
+        except Exception as e:
+            logger.error(f"Failed to evict decrypted DDOs: {e}")
+
+    def get_stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
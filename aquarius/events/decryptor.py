@@ -9,15 +9,24 @@ from _decimal import Decimal
 from datetime import datetime, timezone
 from hashlib import sha256
 
-import requests
-
 from aquarius.app.util import get_aquarius_wallet, get_signature_bytes
+from aquarius.events.decrypted_ddo_cache import get_decrypted_ddo_cache
+from aquarius.events.provider_client import ProviderUnavailable, get_provider_client
 from aquarius.events.util import update_did_state
 
 logger = logging.getLogger(__name__)
 
 
 def decrypt_ddo(w3, provider_url, contract_address, chain_id, txid, hash, es_instance):
+    # the DDO is identified by its hash, no need to ask the provider again
+    cache = get_decrypted_ddo_cache(es_instance)
+    if cache:
+        cached_ddo = cache.get(bytes(hash).hex())
+        logger.debug(f"Decrypted DDOs cache: {cache.get_stats()}")
+        if cached_ddo is not None:
+            logger.info("Decrypted DDO found in cache.")
+            return json.loads(cached_ddo)
+
     aquarius_account = get_aquarius_wallet()
     nonce = Decimal(time.time_ns())
 
@@ -33,13 +42,18 @@ def decrypt_ddo(w3, provider_url, contract_address, chain_id, txid, hash, es_ins
         "nonce": str(nonce),
     }
 
+    provider = get_provider_client(provider_url)
     try:
-        # do not spend more that 4 seconds.. if it fails, we will retry it
-        response = requests.post(
-            provider_url + "/api/services/decrypt", timeout=4, json=payload
-        )
+        # do not spend more than PROVIDER_MAX_TIMEOUT seconds.. if it fails, we will retry it
+        response = provider.post("/api/services/decrypt", json=payload)
+    except ProviderUnavailable as e:
+        # the provider keeps failing, retry once its circuit breaker lets requests through
+        update_did_state(es_instance, contract_address, chain_id, txid, False, str(e))
+        logger.error(str(e))
+        raise
     except Exception as e:
         response = None
+    logger.debug(f"Provider {provider.url}: {provider.get_stats()}")
 
     if not hasattr(response, "status_code"):
         msg = f"Failed to get a response for decrypt DDO with provider={provider_url}, payload={payload}, response={response}"
@@ -55,6 +69,8 @@ def decrypt_ddo(w3, provider_url, contract_address, chain_id, txid, hash, es_ins
             raise Exception(f"in decrypt_ddo: {msg}")
         logger.info("Decrypted DDO successfully.")
         response_content = response.content.decode("utf-8")
+        if cache:
+            cache.put(bytes(hash).hex(), response_content)
         return json.loads(response_content)
 
     if response.status_code == 403:
@@ -6,6 +6,7 @@ import json
 import logging
 import os
 import time
+from contextlib import nullcontext
 from distutils.util import strtobool
 from threading import Thread
 
@@ -16,7 +17,20 @@ from aquarius.app.util import get_bool_env_value, get_allowed_publishers
 from aquarius.block_utils import BlockProcessingClass
 from aquarius.config import get_version
 from aquarius.retry_mechanism import RetryMechanism
+from aquarius.events.backfill import Backfill
+from aquarius.events.bulk_writer import (
+    BulkWriter,
+    get_bulk_writer,
+    get_bulk_writer_settings,
+)
+from aquarius.events.block_cache import get_block_cache
+from aquarius.events.checkpoint import Checkpoint
+from aquarius.events.chunk_sizer import AdaptiveChunkSizer
 from aquarius.events.constants import EventTypes
+from aquarius.events.head_follower import HeadFollower
+from aquarius.events.contract_registry import get_contract_registry
+from aquarius.events.log_archive import get_log_archive
+from aquarius.events.log_prefetcher import LogPrefetcher
 from aquarius.events.processors import (
     MetadataCreatedProcessor,
     MetadataStateProcessor,
@@ -24,14 +38,20 @@ from aquarius.events.processors import (
     OrderStartedProcessor,
     TokenURIUpdatedProcessor,
 )
+from aquarius.events.provider_client import ProviderUnavailable
 from aquarius.events.purgatory import Purgatory
+from aquarius.events.receipts import ReceiptCache
 from aquarius.events.ve_allocate import VeAllocate
 from aquarius.events.nft_ownership import NftOwnership
+from aquarius.events.worker_pool import (
+    PartitionedWorkerPool,
+    get_event_key,
+    partition_events,
+)
 from aquarius.events.util import (
     get_metadata_start_block,
     get_defined_block,
     get_fre,
-    get_dispenser,
     get_erc20_contract,
     get_nft_contract,
     is_approved_fre,
@@ -64,8 +84,19 @@ class EventsMonitor(BlockProcessingClass):
 
     _instance = None
 
-    def __init__(self, web3):
-        self._es_instance = ElasticsearchInstance()
+    def __init__(
+        self, web3, es_instance=None, worker_pool=None, rpc=None, new_blocks=None
+    ):
+        """
+        Args:
+            web3: Web3 instance of the monitored chain
+            es_instance: ElasticsearchInstance, shared when monitoring multiple chains
+            worker_pool: PartitionedWorkerPool, shared when monitoring multiple chains
+            rpc: RPC of web3, when the chain is not configured with EVENTS_RPC (multiple chains)
+            new_blocks: threading.Event set by the head follower, shared when monitoring multiple chains
+        """
+        self._es_instance = es_instance if es_instance else ElasticsearchInstance()
+        self._rpc = rpc
 
         self._other_db_index = f"{self._es_instance.db_index}_plus"
         self._es_instance.es.indices.create(index=self._other_db_index, ignore=400)
@@ -81,12 +112,25 @@ class EventsMonitor(BlockProcessingClass):
         self._chain_id = self._web3.eth.chain_id
         self.add_chain_id_to_chains_list()
         self._index_name = "events_last_block_" + str(self._chain_id)
-        self._start_block = get_metadata_start_block()
+        self._checkpoint = Checkpoint(
+            self._es_instance, self._other_db_index, self._index_name
+        )
+        self._start_block = get_metadata_start_block(self._chain_id if rpc else None)
 
+        # not known before the last block is read, see store_last_processed_block
+        self._chunk_sizer = None
         if get_bool_env_value("EVENTS_CLEAN_START", 0):
             self.reset_chain()
 
         self.get_or_set_last_block()
+        # the chunk size learned before a restart is stored with the last block
+        self._chunk_sizer = AdaptiveChunkSizer(
+            self.get_stored_chunk_size() or self.blockchain_chunk_size,
+            max_size=self.get_timer_with_default(
+                "BLOCKS_CHUNK_SIZE_MAX", self.blockchain_chunk_size
+            ),
+            max_logs=self.get_timer_with_default("EVENTS_MAX_LOGS_PER_CHUNK", 5000),
+        )
         self._allowed_publishers = get_allowed_publishers()
         logger.info(f"allowed publishers: {self._allowed_publishers}")
 
@@ -107,6 +151,30 @@ class EventsMonitor(BlockProcessingClass):
         self._purgatory_sleep_time = self.get_timer_with_default(
             "EVENTS_PURGATORY_SLEEP_TIME", 300
         )
+        # how many chunks of logs can be fetched ahead of processing, 0 to disable
+        self._prefetch_chunks = self.get_timer_with_default("EVENTS_PREFETCH_CHUNKS", 0)
+        self._prefetcher = None
+        # how many threads process events concurrently, 1 to process them serially
+        self._processing_workers = self.get_timer_with_default(
+            "EVENTS_PROCESSING_WORKERS", 1
+        )
+        if worker_pool:
+            self._processing_workers = worker_pool.max_workers
+        self._worker_pool = (
+            worker_pool
+            if worker_pool
+            else PartitionedWorkerPool(self._processing_workers)
+            if self._processing_workers > 1
+            else None
+        )
+        self._receipt_stats = {"fetched": 0, "saved": 0}
+        # writes of the events of a chunk are sent in bulk requests, 0 to disable
+        self._bulk_max_actions, self._bulk_flush_interval = get_bulk_writer_settings()
+        # raw logs and receipts of processed chunks, to replay them without the RPC
+        self._log_archive = get_log_archive(self._chain_id)
+        # follow new blocks on a ws(s) RPC, instead of waiting for the next poll
+        self._head_follower = self.get_head_follower(new_blocks)
+        self._lag = {"head": None, "last_block": None, "lag": None, "updated": None}
         logger.info(
             " Timers set to:\n"
             + f"\tEVENTS_MONITOR_SLEEP_TIME:{self._monitor_sleep_time}\n"
@@ -114,6 +182,13 @@ class EventsMonitor(BlockProcessingClass):
             + f"\tEVENTS_VE_ALLOCATE_SLEEP_TIME:{self._ve_allocate_sleep_time}\n"
             + f"\tEVENTS_NFT_TRANSFER_SLEEP_TIME:{self._nft_transfer_sleep_time}\n"
             + f"\tEVENTS_PURGATORY_SLEEP_TIME:{self._purgatory_sleep_time}\n"
+            + f"\tEVENTS_PREFETCH_CHUNKS:{self._prefetch_chunks}\n"
+            + f"\tEVENTS_PROCESSING_WORKERS:{self._processing_workers}\n"
+            + f"\tEVENTS_BULK_MAX_ACTIONS:{self._bulk_max_actions}\n"
+            + f"\tEVENTS_BULK_FLUSH_INTERVAL:{self._bulk_flush_interval}\n"
+            + f"\tEVENTS_CHECKPOINT_INTERVAL:{self._checkpoint.flush_interval}\n"
+            + f"\tEVENTS_CHECKPOINT_BLOCKS:{self._checkpoint.flush_blocks}\n"
+            + f"\tBLOCKS_CHUNK_SIZE:{self._chunk_sizer.size} (max {self._chunk_sizer.max_size})\n"
         )
 
         self.purgatory = (
@@ -135,6 +210,7 @@ class EventsMonitor(BlockProcessingClass):
             self.purgatory,
             self._chain_id,
             self,
+            web3=self._web3 if rpc else None,
         )
         self.nft_ownership = NftOwnership(
             self._es_instance, self._nfts_db_index, self._chain_id, self
@@ -169,6 +245,10 @@ class EventsMonitor(BlockProcessingClass):
         self._thread_process_ve_allocate_is_on = False
         self._thread_process_purgatory_is_on = False
         self._thread_process_nfts_is_on = False
+        if self._head_follower:
+            self._head_follower.stop()
+        self._checkpoint.flush()
+        self.nft_ownership.flush_last_processed_block()
 
     def start_events_monitor(self):
         """Starts all needed threads, depending on config"""
@@ -176,6 +256,7 @@ class EventsMonitor(BlockProcessingClass):
         t = Thread(target=self.thread_process_blocks, daemon=True)
         self._thread_process_blocks_is_on = True
         t.start()
+        self.start_head_follower()
 
         t = Thread(target=self.thread_process_nft_ownership, daemon=True)
         self._thread_process_nfts_is_on = True
@@ -196,6 +277,12 @@ class EventsMonitor(BlockProcessingClass):
 
     # main threads below
     def thread_process_blocks(self):
+        backfill_shards = self.get_timer_with_default("EVENTS_BACKFILL_SHARDS", 0)
+        if backfill_shards > 1 and self._thread_process_blocks_is_on:
+            try:
+                self.backfill(backfill_shards)
+            except (KeyError, Exception) as e:
+                logger.error(f"Error backfilling blocks: {str(e)}.")
         while True:
             if self._thread_process_blocks_is_on:
                 try:
@@ -203,7 +290,60 @@ class EventsMonitor(BlockProcessingClass):
                     self.process_current_blocks()
                 except (KeyError, Exception) as e:
                     logger.error(f"Error processing event: {str(e)}.")
-            time.sleep(self._monitor_sleep_time)
+            self.wait_for_new_blocks()
+
+    def backfill(self, shards, to_block=None):
+        """Processes the blocks from the last processed block to to_block (defaults to the current block)
+        with `shards` concurrent workers, and moves the last processed block to to_block.
+        Resumes the unfinished backfill of the chain, if there is one.
+        """
+        Backfill(self, shards, to_block).run()
+
+    def get_head_follower(self, new_blocks=None):
+        """Returns a HeadFollower if EVENTS_WS_SUBSCRIPTION is set ("newHeads" or "logs"), None otherwise.
+        Follows the monitor rpc if it is a ws(s) RPC, or EVENTS_WS_RPC, or EVENTS_RPC if it is a ws(s) RPC.
+        """
+        subscription = os.getenv("EVENTS_WS_SUBSCRIPTION")
+        if not subscription:
+            return None
+
+        if self._rpc:
+            ws_url = self._rpc
+        else:
+            ws_url = os.getenv("EVENTS_WS_RPC") or os.getenv("EVENTS_RPC", "")
+        if not ws_url.startswith("ws"):
+            logger.error(
+                f"EVENTS_WS_SUBSCRIPTION needs a ws(s) RPC, polling chain {self._chain_id} instead."
+            )
+            return None
+
+        try:
+            return HeadFollower(
+                ws_url, subscription, list(EventTypes.hashes.keys()), new_blocks
+            )
+        except ValueError as e:
+            logger.error(f"{e} Polling instead.")
+            return None
+
+    def start_head_follower(self):
+        """Starts following new blocks, if a head follower is configured. Returns True if started."""
+        if not self._head_follower:
+            return False
+
+        self._head_follower.start()
+        return True
+
+    def is_following_head(self):
+        """Returns True if the head follower is connected, ie: new blocks are notified as they land."""
+        return bool(self._head_follower and self._head_follower.connected)
+
+    def wait_for_new_blocks(self):
+        """Waits EVENTS_MONITOR_SLEEP_TIME seconds, or less if the head follower is notified of new blocks."""
+        if self.is_following_head():
+            self._head_follower.wait(self._monitor_sleep_time)
+            return
+
+        time.sleep(self._monitor_sleep_time)
 
     def thread_process_queue(self):
         while True:
@@ -246,10 +386,15 @@ class EventsMonitor(BlockProcessingClass):
             time.sleep(self._purgatory_sleep_time)
 
     # various functions used by threads
-    def process_current_blocks(self):
-        """Process all blocks from the last processed block to the current block."""
+    def process_current_blocks(self, max_chunks=None):
+        """Process all blocks from the last processed block to the current block.
 
-        last_block = self.get_last_processed_block()
+        Args:
+            max_chunks: if set, process at most this number of chunks, and let the next call
+                continue from the stored last block (eg: to take turns with other chains)
+        """
+
+        last_block = self.get_cached_last_block()
         current_block = None
         try:
             current_block = self._web3.eth.block_number
@@ -261,65 +406,159 @@ class EventsMonitor(BlockProcessingClass):
             or not isinstance(current_block, int)
             or current_block <= last_block
         ):
+            self.update_lag(current_block, last_block)
             return
+        get_block_cache().set_head(self._chain_id, current_block)
 
         from_block = (
             last_block + 1
         )  # we don't need to process last block again, it's a waste of rpc
         logger.debug(
-            f"Web3 block:{current_block}, from:block {from_block}, chunk: {self.blockchain_chunk_size}"
+            f"Web3 block:{current_block}, from:block {from_block}, chunk: {self._chunk_sizer.size}"
         )
         if from_block > current_block:
             # nothing to do for now
             return
-        start_block_chunk = from_block
-        steps = range(from_block, current_block, self.blockchain_chunk_size)
-        # if we only have one step, it will be processed at line #228 anyway
-        if len(steps) > 1:
-            for end_block_chunk in steps:
-                self.process_block_range(start_block_chunk, end_block_chunk)
-                start_block_chunk = end_block_chunk
+        to_block = current_block
+        if max_chunks:
+            to_block = min(
+                current_block, from_block + max_chunks * self._chunk_sizer.size - 1
+            )
+
+        chunks = self.get_block_chunks(from_block, to_block)
+        # archived logs are read from disk, prefetching them does not help
+        replaying = self._log_archive and self._log_archive.replay
+        if self._prefetch_chunks > 0 and len(chunks) > 1 and not replaying:
+            self.process_chunks_pipelined(chunks)
         else:
-            end_block_chunk = start_block_chunk
-        self.process_block_range(end_block_chunk, current_block)
+            self.process_block_range(from_block, to_block)
+
+        self.update_lag(current_block, self.get_cached_last_block())
 
-    def process_block_range(self, from_block, to_block):
-        """Process a range of blocks.
-        If fails, and possible, try to split the chunk in two and try again
+    def update_lag(self, head, last_block):
+        """Updates the lag metrics of the chain.
+
+        Args:
+            head: current block of the chain
+            last_block: last processed block
         """
-        if from_block > to_block:
+        if not isinstance(head, int) or not isinstance(last_block, int):
             return
 
-        try:
-            self.get_and_process_logs(from_block, to_block)
+        self._lag = {
+            "head": head,
+            "last_block": last_block,
+            "lag": max(0, head - last_block),
+            "updated": int(time.time()),
+        }
 
-        except Exception as e:
-            logger.info(f"Failed to get events from {from_block} to {to_block}")
-            # if we can split it in two, just do it
-            if from_block < to_block:
-                middle = int((from_block + to_block) / 2)
-                middle_plus = middle + 1
+    def get_lag(self):
+        """Returns the head block, last processed block and lag (in blocks) of the chain,
+        as of the last process_current_blocks call.
+        """
+        return dict(self._lag, chain_id=self._chain_id)
+
+    def get_block_chunks(self, from_block, to_block):
+        """Splits [from_block, to_block] in consecutive, non overlapping chunks of the current chunk size."""
+        chunk_size = self._chunk_sizer.size
+        return [
+            (start, min(start + chunk_size - 1, to_block))
+            for start in range(from_block, to_block + 1, chunk_size)
+        ]
+
+    def process_chunks_pipelined(self, chunks):
+        """Process chunks in order, while logs for the next ones are fetched in background.
+        The last processed block is stored only after a chunk is fully processed.
+
+        Args:
+            chunks: list of (from_block, to_block) tuples
+        """
+        self._prefetcher = LogPrefetcher(self.get_logs, chunks, self._prefetch_chunks)
+        self._prefetcher.start()
+        try:
+            for from_block, to_block, logs, error in self._prefetcher:
                 logger.info(
-                    f"Splitting in two:  {from_block} -> {middle} and {middle_plus} to {to_block}"
+                    f"Prefetch queue on chain {self._chain_id}: "
+                    f"{self._prefetcher.queue_size()}/{self._prefetcher.depth} chunks ready."
                 )
-                self.process_block_range(from_block, middle)
-                self.process_block_range(middle_plus, to_block)
-            else:
+                if error is not None:
+                    # let the serial path shrink the chunks and retry
+                    logger.info(
+                        f"Prefetching events from {from_block} to {to_block} failed: {error}"
+                    )
+                    self._chunk_sizer.on_failure(to_block - from_block + 1)
+                    self.process_block_range(from_block, to_block)
+                    continue
+                self._chunk_sizer.on_success(to_block - from_block + 1, len(logs))
+                self.process_logs_and_store_block(logs, from_block, to_block)
+        finally:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+    def get_prefetch_status(self):
+        """Returns how full the prefetch queue is."""
+        if not self._prefetcher:
+            return {"size": 0, "depth": self._prefetch_chunks}
+        return {
+            "size": self._prefetcher.queue_size(),
+            "depth": self._prefetcher.depth,
+        }
+
+    def process_block_range(
+        self,
+        from_block,
+        to_block,
+        store_last_processed_block=None,
+        chunk_sizer=None,
+    ):
+        """Process a range of blocks, in chunks of the adaptive chunk size.
+        If getting the logs of a chunk fails, the chunk size shrinks and the same blocks are tried again.
+
+        Args:
+            from_block: first block of the range
+            to_block: last block of the range
+            store_last_processed_block: called with the last block of every processed chunk,
+                defaults to storing it in the checkpoint of the monitor
+            chunk_sizer: AdaptiveChunkSizer of the range, defaults to the one of the monitor,
+                which is stored with the checkpoint
+        """
+        chunk_sizer = chunk_sizer if chunk_sizer else self._chunk_sizer
+        while from_block <= to_block:
+            chunk_end = min(from_block + chunk_sizer.size - 1, to_block)
+            blocks = chunk_end - from_block + 1
+            try:
+                logs_count = self.get_and_process_logs(
+                    from_block, chunk_end, store_last_processed_block
+                )
+            except Exception as e:
+                logger.info(f"Failed to get events from {from_block} to {chunk_end}")
+                if from_block < chunk_end:
+                    chunk_sizer.on_failure(blocks)
+                    logger.info(
+                        f"Retrying from {from_block} with chunk size {chunk_sizer.size}"
+                    )
+                    continue
                 # so we failed to process a single block.
                 self.retry_mechanism.add_block_to_retry_queue(from_block)
                 logger.error(
                     f"Failed to get some events from block {from_block}. Error: {e}"
                 )
-            return
+            else:
+                if logs_count is not None:
+                    chunk_sizer.on_success(blocks, logs_count)
 
-    def handle_metadata_updates(self, event_name, processor_args, event):
+            from_block = chunk_end + 1
+
+    def handle_metadata_updates(self, event_name, processor_args, event, receipts=None):
         """Process one event of types EVENT_METADATA_CREATED, EVENT_METADATA_UPDATED, EVENT_METADATA_STATE
 
         Args:
             event_name (str): event uppercase constant name
             processor_args (List[any]): list of processors arguments
             event: event to be processed
+            receipts (ReceiptCache): receipts of the current chunk
         """
+        receipts = receipts if receipts else ReceiptCache(self._web3)
         processor = None
         if event_name == EventTypes.EVENT_METADATA_CREATED:
             processor = MetadataCreatedProcessor
@@ -332,39 +571,87 @@ class EventsMonitor(BlockProcessingClass):
             return
 
         dt_contract = get_nft_contract(self._web3, event.address)
-        receipt = self._web3.eth.get_transaction_receipt(event.transactionHash.hex())
-        event_object = dt_contract.events[event_name]().process_receipt(
-            receipt, errors=DISCARD
-        )[0]
+        receipt = receipts.get(event.transactionHash)
+        registry = get_contract_registry()
+        event_object = registry.get_event(
+            self._web3, "ERC721Template", event_name
+        ).process_receipt(receipt, errors=DISCARD)[0]
         try:
-            metadata_proofs = dt_contract.events.MetadataValidated().process_receipt(
-                receipt, errors=DISCARD
-            )
+            metadata_proofs = registry.get_event(
+                self._web3, "ERC721Template", "MetadataValidated"
+            ).process_receipt(receipt, errors=DISCARD)
             event_processor = processor(
                 *([event_object, dt_contract, receipt["from"]] + processor_args)
             )
             event_processor.metadata_proofs = metadata_proofs
+            event_processor.receipts = receipts
             event_processor.process()
+        except ProviderUnavailable as e:
+            # no need to retry before the provider circuit breaker lets requests through
+            logger.error(f"Error processing {event_name} event: {e}")
+            self.retry_mechanism.add_event_to_retry_queue(
+                event, event.address, str(e), next_retry=e.retry_at
+            )
         except Exception as e:
             error = f"Error processing {event_name} event: {e}\n" f"event={event}"
             logger.exception(error)
             self.retry_mechanism.add_event_to_retry_queue(event, event.address, error)
 
-    def handle_price_change(self, event_name, event, to_block):
+    def handle_price_change(
+        self, event_name, event, to_block, receipts=None, nft_addresses=None
+    ):
         """Process one event of types: EVENT_ORDER_STARTED, EVENT_EXCHANGE_CREATED, EVENT_EXCHANGE_RATE_CHANGED, EVENT_DISPENSER_CREATED
 
         Args:
             event_name (str): event uppercase constant name
             event: event to be processed
             to_block: last block in the current queue
+            receipts (ReceiptCache): receipts of the current chunk
+            nft_addresses (dict): NFT addresses of the price events already resolved,
+                by event key, see get_price_event_nft_address
+        """
+        if nft_addresses and get_event_key(event) in nft_addresses:
+            nft_address = nft_addresses[get_event_key(event)]
+        else:
+            nft_address = self.get_price_event_nft_address(event_name, event, receipts)
+        if nft_address is None:
+            return
+
+        logger.debug(f"{event_name} detected on ERC20 contract {event.address}.")
+
+        writer = get_bulk_writer()
+        try:
+            event_processor = OrderStartedProcessor(
+                nft_address,
+                self._es_instance,
+                to_block,
+                self._chain_id,
+            )
+            with writer.source(event, nft_address) if writer else nullcontext():
+                event_processor.process()
+        except Exception as e:
+            error = f"Error processing {event_name} event: {e}\n" f"event={event}"
+            logger.error(error)
+            self.retry_mechanism.add_event_to_retry_queue(event, nft_address, error)
+
+    def get_price_event_nft_address(self, event_name, event, receipts=None):
+        """Returns the address of the NFT whose datatoken a price event is about, None if
+        the event is ignored (eg: emitted by an unapproved FRE or dispenser).
+
+        Args:
+            event_name (str): event uppercase constant name
+            event: price event
+            receipts (ReceiptCache): receipts of the current chunk
         """
-        receipt = self._web3.eth.get_transaction_receipt(event.transactionHash.hex())
+        receipts = receipts if receipts else ReceiptCache(self._web3)
+        receipt = receipts.get(event.transactionHash)
         erc20_address = None
         if event_name == EventTypes.EVENT_EXCHANGE_CREATED:
             if is_approved_fre(self._web3, event.address, self._chain_id):
                 fre = get_fre(self._web3, self._chain_id, event.address)
                 exchange_id = (
-                    fre.events.ExchangeCreated()
+                    get_contract_registry()
+                    .get_event(self._web3, "FixedRateExchange", "ExchangeCreated")
                     .process_receipt(receipt, errors=DISCARD)[0]
                     .args.exchangeId
                 )
@@ -383,7 +670,8 @@ class EventsMonitor(BlockProcessingClass):
             if is_approved_fre(self._web3, event.address, self._chain_id):
                 fre = get_fre(self._web3, self._chain_id)
                 exchange_id = (
-                    fre.events.ExchangeRateChanged()
+                    get_contract_registry()
+                    .get_event(self._web3, "FixedRateExchange", "ExchangeRateChanged")
                     .process_receipt(receipt, errors=DISCARD)[0]
                     .args.exchangeId
                 )
@@ -399,9 +687,9 @@ class EventsMonitor(BlockProcessingClass):
                 )
         elif event_name == EventTypes.EVENT_DISPENSER_CREATED:
             if is_approved_dispenser(self._web3, event.address, self._chain_id):
-                dispenser = get_dispenser(self._web3, self._chain_id)
                 erc20_address = (
-                    dispenser.events.DispenserCreated()
+                    get_contract_registry()
+                    .get_event(self._web3, "Dispenser", "DispenserCreated")
                     .process_receipt(receipt, errors=DISCARD)[0]
                     .args.datatokenAddress
                 )
@@ -412,34 +700,21 @@ class EventsMonitor(BlockProcessingClass):
         else:
             erc20_address = event.address
         if erc20_address is None:
-            return
+            return None
 
         erc20_contract = get_erc20_contract(self._web3, erc20_address)
-        nft_address = erc20_contract.caller.getERC721Address()
-        logger.debug(f"{event_name} detected on ERC20 contract {event.address}.")
+        return erc20_contract.caller.getERC721Address()
 
-        try:
-            event_processor = OrderStartedProcessor(
-                nft_address,
-                self._es_instance,
-                to_block,
-                self._chain_id,
-            )
-            event_processor.process()
-        except Exception as e:
-            error = f"Error processing {event_name} event: {e}\n" f"event={event}"
-            logger.error(error)
-            self.retry_mechanism.add_event_to_retry_queue(event, nft_address, error)
-
-    def handle_token_uri_update(self, event):
+    def handle_token_uri_update(self, event, receipts=None):
         """Process one token uri update event
 
         Args:
             event: event to be processed
+            receipts (ReceiptCache): receipts of the current chunk
         """
         try:
             event_processor = TokenURIUpdatedProcessor(
-                event, self._web3, self._es_instance, self._chain_id
+                event, self._web3, self._es_instance, self._chain_id, receipts
             )
             event_processor.process()
         except Exception as e:
@@ -461,9 +736,7 @@ class EventsMonitor(BlockProcessingClass):
                 logging.error("Connection to ES failed. Trying to connect to back...")
                 time.sleep(5)
             # logging.info("Stable connection to ES.")
-            last_block_record = self._es_instance.es.get(
-                index=self._other_db_index, id=self._index_name
-            )["_source"]
+            last_block_record = self._checkpoint.load()
             block = (
                 last_block_record["last_block"]
                 if last_block_record["last_block"] >= 0
@@ -478,30 +751,38 @@ class EventsMonitor(BlockProcessingClass):
                 logging.error(f"Cannot get last_block error={e}")
         return block
 
+    def get_cached_last_block(self):
+        """Returns the last processed block kept in memory, reading ES only if it is not known yet."""
+        block = self._checkpoint.block
+        if not isinstance(block, int) or block < 0:
+            return self.get_last_processed_block()
+
+        return block
+
     def store_last_processed_block(self, block):
-        """Stores last processed block
+        """Stores last processed block.
+        The block is kept in memory, and written to ES without waiting for a refresh.
+        Writes can be coalesced, see EVENTS_CHECKPOINT_INTERVAL and EVENTS_CHECKPOINT_BLOCKS.
 
         Args:
             block: last block that was processed
         """
         # make sure that we don't write a block < then needed
-        stored_block = self.get_last_processed_block()
-        logger.info(f"Storing last_processed_block {block}  (In Es: {stored_block})")
+        stored_block = self.get_cached_last_block()
+        logger.info(f"Storing last_processed_block {block}  (Stored: {stored_block})")
         if block <= stored_block:
             return
         record = {"last_block": block, "version": get_version()}
-        try:
-            self._es_instance.es.index(
-                index=self._other_db_index,
-                id=self._index_name,
-                body=record,
-                refresh="wait_for",
-            )["_id"]
+        if self._chunk_sizer:
+            record["chunk_size"] = self._chunk_sizer.size
+        self._checkpoint.update(block, record)
 
-        except elasticsearch.exceptions.RequestError:
-            logger.error(
-                f"store_last_processed_block: block={block} type={type(block)}, ES RequestError"
-            )
+    def get_stored_chunk_size(self):
+        """Returns the chunk size stored with the last processed block, 0 if there is none."""
+        try:
+            return int((self._checkpoint.record or {}).get("chunk_size", 0))
+        except (TypeError, ValueError):
+            return 0
 
     def add_chain_id_to_chains_list(self):
         try:
@@ -573,7 +854,9 @@ class EventsMonitor(BlockProcessingClass):
                 )
         return
 
-    def get_and_process_logs(self, from_block, to_block):
+    def get_and_process_logs(
+        self, from_block, to_block, store_last_processed_block=None
+    ):
         """Get all events from -> to in a single call and process them.
         If that fails, and we tried with multiple blocks, let split handle it
         If that fails, and we tried on a single block, then try to get events one by one instead of all
@@ -581,44 +864,124 @@ class EventsMonitor(BlockProcessingClass):
         Args:
             from_block: first block in chunk
             to_block: last block in chunk
+            store_last_processed_block: called with to_block once processed, see process_block_range
+        Returns:
+            number of logs in the chunk, None if they had to be fetched one event type at a time
         """
         logger.info(
             f"Searching for events events on chain {self._chain_id} "
             f"in blocks {from_block} to {to_block}."
         )
 
-        filter_params = {
-            "topics": [list(EventTypes.hashes.keys())],
-            "fromBlock": from_block,
-            "toBlock": to_block,
-        }
+        archived = self.read_archived_logs(from_block, to_block)
+        if archived:
+            logs, receipts = archived
+            self.process_logs_and_store_block(
+                logs,
+                from_block,
+                to_block,
+                store_last_processed_block,
+                ReceiptCache(self._web3, logs, receipts),
+            )
+            return len(logs)
 
         try:
-            logs = self._web3.eth.get_logs(filter_params)
+            logs = self.get_logs(from_block, to_block)
         except Exception as e:
             if from_block < to_block:
-                # splitting in two might help, so rely on that
-                raise Exception("Failed to get events for multiple blocks. {e}")
+                # smaller chunks might help, so rely on that
+                raise Exception(f"Failed to get events for multiple blocks. {e}")
             else:
                 # Since there is only one block, and we failed to get all events, we need to try to take them one by one
                 # if any call fails, there is nothing more we can do  (ie:  failed to get only transfer events from block X)
                 self.get_and_process_event_logs_for_one_block(from_block)
-                return
+                return None
+        self.process_logs_and_store_block(
+            logs, from_block, to_block, store_last_processed_block
+        )
+
+        return len(logs)
+
+    def get_logs(self, from_block, to_block):
+        """Get all events from -> to in a single call
+
+        Args:
+            from_block: first block in chunk
+            to_block: last block in chunk
+        """
+        filter_params = {
+            "topics": [list(EventTypes.hashes.keys())],
+            "fromBlock": from_block,
+            "toBlock": to_block,
+        }
+
+        return self._web3.eth.get_logs(filter_params)
+
+    def read_archived_logs(self, from_block, to_block):
+        """Returns (logs, receipts) of a chunk from the log archive, if replaying it (EVENTS_ARCHIVE_REPLAY)
+        and it covers the chunk. Returns None otherwise, logs are then fetched from the RPC.
+        """
+        if not self._log_archive or not self._log_archive.replay:
+            return None
+
+        try:
+            return self._log_archive.read(from_block, to_block)
+        except Exception as e:
+            logger.error(
+                f"Failed to read archived logs {from_block} to {to_block}. Error: {e}"
+            )
+            return None
+
+    def process_logs_and_store_block(
+        self,
+        logs,
+        from_block,
+        to_block,
+        store_last_processed_block=None,
+        receipts=None,
+    ):
+        """Process the logs of a chunk, then store to_block as last processed block.
+        The logs and receipts are added to the log archive, if EVENTS_ARCHIVE_PATH is set.
+
+        Args:
+            logs: list of events in chunk
+            from_block: first block in chunk
+            to_block: last block in chunk
+            store_last_processed_block: called with to_block, defaults to storing it in the checkpoint
+            receipts (ReceiptCache): receipts of the chunk, if known
+        """
+        if not store_last_processed_block:
+            store_last_processed_block = self.store_last_processed_block
+        receipts = receipts if receipts else ReceiptCache(self._web3, logs)
         try:
-            self.process_logs(logs, to_block)
+            self.process_logs(logs, to_block, receipts)
         except Exception as e:
             logger.error(
                 f"Failed to process logs {from_block} to {to_block}. Error: {e}"
             )
+        if self._log_archive:
+            try:
+                self._log_archive.append(
+                    from_block, to_block, logs, receipts.get_receipts()
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to archive logs {from_block} to {to_block}. Error: {e}"
+                )
         # finally, stored last block in ES
-        self.store_last_processed_block(to_block)
+        store_last_processed_block(to_block)
 
-    def process_logs(self, logs, to_block):
+    def process_logs(self, logs, to_block, receipts=None):
         """Given a list of events, of different types, process them ..
+        If EVENTS_PROCESSING_WORKERS > 1, events are partitioned by NFT address and partitions
+        are processed concurrently. Events in one partition keep their block/log order.
+        Returns after all events are processed and their writes are committed to ES
+        (see EVENTS_BULK_MAX_ACTIONS).
 
         Args:
             logs: list of events to be processed
             to_block: last block in the queue
+            receipts (ReceiptCache): receipts of the logs, if known
         """
         processor_args = [
             self._es_instance,
@@ -629,34 +992,150 @@ class EventsMonitor(BlockProcessingClass):
         ]
 
         logger.info(f"Processing {len(logs)} events ...")
-        for event in logs:
-            match = EventTypes.hashes.get(event.topics[0].hex(), None)
-            if match is None:
-                logger.warning(f"Unknown event ")
-                logger.warning(event)
-                continue
-            if (
-                match["type"] == EventTypes.EVENT_METADATA_CREATED
-                or match["type"] == EventTypes.EVENT_METADATA_UPDATED
-                or match["type"] == EventTypes.EVENT_METADATA_STATE
-            ):
-                self.handle_metadata_updates(
-                    match["type"],
-                    processor_args,
-                    event,
+        receipts = receipts if receipts else ReceiptCache(self._web3, logs)
+        receipts.prefetch()
+        # MetadataCreated/Updated processors need the timestamp of their block
+        get_block_cache().prefill(
+            self._web3,
+            self._chain_id,
+            [event.blockNumber for event in logs if self.is_metadata_event(event)],
+        )
+
+        writer = self.new_bulk_writer()
+        # NFT addresses of the price events, resolved before they are partitioned
+        nft_addresses = {}
+
+        def handler(event):
+            with writer.source(event) if writer else nullcontext():
+                self.process_log(
+                    event, processor_args, to_block, receipts, nft_addresses
                 )
-            elif match["type"] in [
-                EventTypes.EVENT_ORDER_STARTED,
-                EventTypes.EVENT_EXCHANGE_CREATED,
-                EventTypes.EVENT_EXCHANGE_RATE_CHANGED,
-                EventTypes.EVENT_DISPENSER_CREATED,
-            ]:
-                self.handle_price_change(match["type"], event, to_block)
-            elif match["type"] == EventTypes.EVENT_TOKEN_URI_UPDATE:
-                self.handle_token_uri_update(event)
+
+        def resolve(event):
+            match = EventTypes.hashes.get(event.topics[0].hex())
+            try:
+                nft_addresses[get_event_key(event)] = self.get_price_event_nft_address(
+                    match["type"], event, receipts
+                )
+            except Exception as e:
+                logger.warning(f"Failed to get the NFT of event {event}: {e}")
+
+        def get_nft_partition(event):
+            # events that failed to resolve are resolved again by their handler
+            return (nft_addresses.get(get_event_key(event)) or event.address).lower()
+
+        try:
+            if not self._worker_pool or len(logs) < 2:
+                for event in logs:
+                    handler(event)
+            else:
+                # metadata events are emitted by the NFT contract itself, so partitioning by address keeps per-DID order.
+                # price events come from datatokens, FREs and dispensers: they are partitioned by the NFT
+                # they resolve to, and processed after all metadata changes of the chunk have been applied
+                price_events = [event for event in logs if self.is_price_event(event)]
+                nft_events = [event for event in logs if not self.is_price_event(event)]
+                # resolving only reads the chain, every event can be resolved concurrently
+                self._worker_pool.run(
+                    partition_events(price_events, key=get_event_key), resolve
+                )
+                self._worker_pool.run(partition_events(nft_events), handler)
+                self._worker_pool.run(
+                    partition_events(price_events, key=get_nft_partition), handler
+                )
+        finally:
+            if writer:
+                # one refresh for all the documents written by the chunk
+                writer.commit()
+        self.update_receipt_stats(receipts)
 
         return
 
+    def new_bulk_writer(self):
+        """Returns a BulkWriter for the writes of the events of one chunk, None if
+        EVENTS_BULK_MAX_ACTIONS is 0.
+        """
+        if not self._bulk_max_actions:
+            return None
+
+        return BulkWriter(
+            self._es_instance.es,
+            self._bulk_max_actions,
+            self._bulk_flush_interval,
+            on_failure=self.handle_bulk_failure,
+        )
+
+    def handle_bulk_failure(self, event, nft_address, error):
+        """Adds an event to the retry queue, when the bulk write of one of its documents failed."""
+        self.retry_mechanism.add_event_to_retry_queue(
+            event, nft_address if nft_address else event.address, error
+        )
+
+    def update_receipt_stats(self, receipts):
+        """Adds the receipt counters of a processed chunk to the monitor totals."""
+        for key, value in receipts.get_stats().items():
+            self._receipt_stats[key] += value
+        logger.debug(
+            f"Receipts on chain {self._chain_id}: {receipts.get_stats()} in chunk, "
+            f"{self._receipt_stats} in total."
+        )
+
+    def get_receipt_stats(self):
+        """Returns how many receipts were fetched, and how many fetches were saved by sharing them."""
+        return dict(self._receipt_stats)
+
+    @staticmethod
+    def is_metadata_event(event):
+        match = EventTypes.hashes.get(event.topics[0].hex(), None)
+        return match is not None and match["type"] in [
+            EventTypes.EVENT_METADATA_CREATED,
+            EventTypes.EVENT_METADATA_UPDATED,
+        ]
+
+    @staticmethod
+    def is_price_event(event):
+        match = EventTypes.hashes.get(event.topics[0].hex(), None)
+        return match is not None and match["type"] in [
+            EventTypes.EVENT_ORDER_STARTED,
+            EventTypes.EVENT_EXCHANGE_CREATED,
+            EventTypes.EVENT_EXCHANGE_RATE_CHANGED,
+            EventTypes.EVENT_DISPENSER_CREATED,
+        ]
+
+    def process_log(
+        self, event, processor_args, to_block, receipts=None, nft_addresses=None
+    ):
+        """Process one event, based on its type
+
+        Args:
+            event: event to be processed
+            processor_args (List[any]): list of processors arguments
+            to_block: last block in the queue
+            receipts (ReceiptCache): receipts of the current chunk
+            nft_addresses (dict): NFT addresses of the price events already resolved, by event key
+        """
+        match = EventTypes.hashes.get(event.topics[0].hex(), None)
+        if match is None:
+            logger.warning(f"Unknown event ")
+            logger.warning(event)
+            return
+        if (
+            match["type"] == EventTypes.EVENT_METADATA_CREATED
+            or match["type"] == EventTypes.EVENT_METADATA_UPDATED
+            or match["type"] == EventTypes.EVENT_METADATA_STATE
+        ):
+            self.handle_metadata_updates(
+                match["type"],
+                processor_args,
+                event,
+                receipts,
+            )
+        elif self.is_price_event(event):
+            self.handle_price_change(
+                match["type"], event, to_block, receipts, nft_addresses
+            )
+        elif match["type"] == EventTypes.EVENT_TOKEN_URI_UPDATE:
+            self.handle_token_uri_update(event, receipts)
+
 
 def merge_list_dictionary(dict_1, dict_2):
     dict_3 = {**dict_1, **dict_2}
@@ -0,0 +1,111 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import asyncio
+import json
+import logging
+from threading import Event, Thread
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTION_NEW_HEADS = "newHeads"
+SUBSCRIPTION_LOGS = "logs"
+
+
+class HeadFollower:
+    """Follows the chain head of a ws(s) RPC with an `eth_subscribe` subscription.
+
+    Subscribes either to `newHeads`, or to `logs` filtered on topics, and sets `new_blocks`
+    whenever a notification arrives, so that the blocks thread can process them right away
+    instead of waiting for the next poll. Reconnects after reconnect_delay seconds if the
+    connection drops; `connected` is False meanwhile, and callers should keep polling.
+    """
+
+    def __init__(
+        self, ws_url, subscription=SUBSCRIPTION_NEW_HEADS, topics=None, new_blocks=None
+    ):
+        if subscription not in [SUBSCRIPTION_NEW_HEADS, SUBSCRIPTION_LOGS]:
+            raise ValueError(f"Unsupported subscription {subscription}.")
+
+        self.ws_url = ws_url
+        self.subscription = subscription
+        self.topics = topics
+        self.reconnect_delay = 5
+        # can be shared by the followers of several chains
+        self.new_blocks = new_blocks if new_blocks else Event()
+        self.latest_block = None
+        self.connected = False
+        self._is_on = False
+        self._thread = None
+
+    def start(self):
+        self._is_on = True
+        self._thread = Thread(
+            target=lambda: asyncio.run(self._follow()),
+            daemon=True,
+            name="head-follower",
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._is_on = False
+
+    def wait(self, timeout):
+        """Waits until new blocks are notified or timeout seconds passed.
+        Returns True if new blocks were notified.
+        """
+        notified = self.new_blocks.wait(timeout)
+        self.new_blocks.clear()
+        return notified
+
+    def get_subscribe_request(self):
+        params = [self.subscription]
+        if self.subscription == SUBSCRIPTION_LOGS:
+            params.append({"topics": [self.topics]} if self.topics else {})
+
+        return {"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": params}
+
+    def handle_message(self, message):
+        """Handles a message received on the websocket, returns True for a subscription notification."""
+        data = json.loads(message)
+        if data.get("method") != "eth_subscription":
+            if "error" in data:
+                raise Exception(f"Subscription failed: {data['error']}")
+            return False
+
+        result = data.get("params", {}).get("result", {})
+        block = result.get("number") or result.get("blockNumber")
+        if block:
+            block = int(block, 16)
+            self.latest_block = max(block, self.latest_block or 0)
+        self.new_blocks.set()
+
+        return True
+
+    async def _follow(self):
+        while self._is_on:
+            try:
+                async with websockets.connect(self.ws_url) as ws:
+                    await ws.send(json.dumps(self.get_subscribe_request()))
+                    self.connected = True
+                    logger.info(
+                        f"Following {self.subscription} on {self.ws_url}, events are processed as soon as blocks land."
+                    )
+                    # wake the blocks thread, blocks may have landed while disconnected
+                    self.new_blocks.set()
+                    async for message in ws:
+                        if not self._is_on:
+                            break
+                        self.handle_message(message)
+            except Exception as e:
+                logger.warning(
+                    f"Head follower disconnected from {self.ws_url}, polling until reconnected: {e}"
+                )
+            finally:
+                self.connected = False
+
+            if self._is_on:
+                await asyncio.sleep(self.reconnect_delay)
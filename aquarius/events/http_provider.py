@@ -4,7 +4,13 @@
 #
 import os
 
+from eth_utils import to_bytes
+from requests.exceptions import HTTPError
 from web3 import HTTPProvider, WebsocketProvider
+from web3._utils.encoding import FriendlyJsonSerde, Web3JsonEncoder
+from web3._utils.method_formatters import get_result_formatters
+from web3.datastructures import AttributeDict
+from web3.manager import RequestManager
 
 from aquarius.events.request import make_post_request
 
@@ -21,11 +27,25 @@ SUPPORTED_NETWORK_NAMES = {
 }
 
 
+def get_rpc_batch_size():
+    """Returns the maximum number of calls in a JSON-RPC batch, 0 if batching is disabled."""
+    try:
+        return max(0, int(os.getenv("EVENTS_RPC_BATCH_SIZE", 0)))
+    except ValueError:
+        return 0
+
+
 class CustomHTTPProvider(HTTPProvider):
     """
     Override requests to control the connection pool to make it blocking.
+    Independent calls can also be sent as JSON-RPC batches, see `make_batch_request`.
     """
 
+    def __init__(self, endpoint_uri=None, request_kwargs=None, session=None):
+        super().__init__(endpoint_uri, request_kwargs, session)
+        self.batch_size = get_rpc_batch_size()
+        self.batch_supported = True
+
     def make_request(self, method, params):
         self.logger.debug(
             "Making request HTTP. URI: %s, Method: %s", self.endpoint_uri, method
@@ -43,6 +63,136 @@ class CustomHTTPProvider(HTTPProvider):
         )
         return response
 
+    def make_batch_request(self, calls, batch_size=None):
+        """Sends independent calls in as few HTTP requests as allowed by batch_size.
+        Falls back to one request per call if batching is disabled or rejected by the RPC.
+
+        Args:
+            calls: list of (method, params) tuples
+            batch_size: maximum number of calls in a batch, defaults to EVENTS_RPC_BATCH_SIZE
+        Returns:
+            list of RPC responses, in the same order as calls
+        """
+        batch_size = batch_size if batch_size is not None else self.batch_size
+        if not batch_size or not self.batch_supported or len(calls) < 2:
+            return [self.make_request(method, params) for method, params in calls]
+
+        responses = []
+        for i in range(0, len(calls), batch_size):
+            responses.extend(self._make_batch_request(calls[i : i + batch_size]))
+
+        return responses
+
+    def _make_batch_request(self, calls):
+        ids = [next(self.request_counter) for _ in calls]
+        rpc_list = [
+            {"jsonrpc": "2.0", "method": method, "params": params or [], "id": rpc_id}
+            for rpc_id, (method, params) in zip(ids, calls)
+        ]
+        request_data = to_bytes(
+            text=FriendlyJsonSerde().json_encode(rpc_list, Web3JsonEncoder)
+        )
+        self.logger.debug(
+            "Making batch request HTTP. URI: %s, Calls: %s",
+            self.endpoint_uri,
+            len(calls),
+        )
+        try:
+            raw_response = make_post_request(
+                self.endpoint_uri, request_data, **self.get_request_kwargs()
+            )
+            response = self.decode_rpc_response(raw_response)
+        except HTTPError as e:
+            if not is_batch_rejection(e):
+                # rate limited or unavailable: only this batch is sent as single calls
+                self.logger.warning(
+                    f"Batch request to {self.endpoint_uri} failed, using single calls: {e}"
+                )
+                response = []
+            else:
+                self.logger.warning(
+                    f"Batch request rejected by {self.endpoint_uri}, using single calls: {e}"
+                )
+                self.batch_supported = False
+                response = None
+        except Exception as e:
+            self.logger.warning(
+                f"Batch request to {self.endpoint_uri} failed, using single calls: {e}"
+            )
+            response = []
+
+        if response is not None and not isinstance(response, list):
+            # the RPC answered with a single error object, it does not support batches
+            self.logger.warning(
+                f"Batch requests not supported by {self.endpoint_uri}: {response}"
+            )
+            self.batch_supported = False
+            response = None
+
+        responses_by_id = {r.get("id"): r for r in response or []}
+        # missing responses are retried one by one
+        return [
+            responses_by_id[rpc_id]
+            if rpc_id in responses_by_id
+            else self.make_request(method, params)
+            for rpc_id, (method, params) in zip(ids, calls)
+        ]
+
+
+def is_batch_rejection(error):
+    """Returns True if an HTTPError means that the RPC does not accept batches (4xx),
+    False if the request may succeed later (eg: 429 Too Many Requests, 5xx).
+    """
+    status = getattr(error.response, "status_code", None)
+    return status is None or (400 <= status < 500 and status != 429)
+
+
+def is_batching_enabled(web3, batch_size=None):
+    """Returns True if calls made through `batch_request` are sent as JSON-RPC batches.
+
+    Args:
+        web3: Web3 instance
+        batch_size: batch size given to `batch_request`, defaults to EVENTS_RPC_BATCH_SIZE
+    """
+    provider = web3.provider
+    if not isinstance(provider, CustomHTTPProvider):
+        return False
+    batch_size = batch_size if batch_size is not None else provider.batch_size
+
+    return batch_size > 1 and provider.batch_supported
+
+
+def batch_request(web3, calls, batch_size=None):
+    """Runs independent RPC calls, batched if the provider supports it, and waits for all results.
+
+    Args:
+        web3: Web3 instance
+        calls: list of (method, params) tuples, with params already in RPC format (eg: hex block numbers)
+        batch_size: maximum number of calls in a batch, defaults to EVENTS_RPC_BATCH_SIZE
+    Returns:
+        list of formatted results, in the same order as calls. A call that failed has
+        the corresponding exception instead of a result.
+    """
+    provider = web3.provider
+    if isinstance(provider, CustomHTTPProvider):
+        responses = provider.make_batch_request(calls, batch_size)
+    else:
+        responses = [provider.make_request(method, params) for method, params in calls]
+
+    results = []
+    for (method, params), response in zip(calls, responses):
+        try:
+            result = RequestManager.formatted_response(response, params)
+            result = get_result_formatters(method, web3.eth)(result)
+            # same as web3's attrdict middleware
+            results.append(
+                AttributeDict.recursive(result) if isinstance(result, dict) else result
+            )
+        except Exception as e:
+            results.append(e)
+
+    return results
+
 
 def get_web3_connection_provider(network_url):
     if network_url.startswith("http"):
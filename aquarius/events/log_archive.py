@@ -0,0 +1,224 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from threading import Lock
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+
+from aquarius.app.util import get_bool_env_value
+
+logger = logging.getLogger(__name__)
+
+# from_block, to_block, offset and length of a record in the data file
+INDEX_ENTRY = struct.Struct(">QQQI")
+LOG_BYTES_FIELDS = ["blockHash", "transactionHash", "data"]
+RECEIPT_BYTES_FIELDS = ["blockHash", "transactionHash", "logsBloom"]
+
+
+def get_log_archive(chain_id):
+    """Returns the LogArchive of a chain if EVENTS_ARCHIVE_PATH is set, None otherwise."""
+    path = os.getenv("EVENTS_ARCHIVE_PATH")
+    if not path:
+        return None
+
+    try:
+        segment_blocks = int(os.getenv("EVENTS_ARCHIVE_SEGMENT_BLOCKS", 100000))
+    except ValueError:
+        segment_blocks = 100000
+
+    return LogArchive(
+        os.path.join(path, str(chain_id)),
+        segment_blocks,
+        replay=get_bool_env_value("EVENTS_ARCHIVE_REPLAY", 0),
+    )
+
+
+def load_log(data):
+    """Returns an archived log in the format returned by get_logs."""
+    data = dict(data)
+    for field in LOG_BYTES_FIELDS:
+        if data.get(field) is not None:
+            data[field] = HexBytes(data[field])
+    data["topics"] = [HexBytes(topic) for topic in data.get("topics", [])]
+
+    return AttributeDict(data)
+
+
+def load_receipt(data):
+    """Returns an archived receipt in the format returned by get_transaction_receipt."""
+    data = dict(data)
+    for field in RECEIPT_BYTES_FIELDS:
+        if data.get(field) is not None:
+            data[field] = HexBytes(data[field])
+    data["logs"] = [load_log(log) for log in data.get("logs", [])]
+
+    return AttributeDict(data)
+
+
+class LogArchive:
+    """Local, append-only archive of the logs and receipts of processed chunks.
+
+    Blocks are split in segments of segment_blocks blocks. Each segment has a data file, with
+    one zlib compressed json record per chunk, and an index file of fixed size entries
+    (from_block, to_block, offset, length), searched with a binary search on a memory map.
+
+    Records are only appended if they start after the last archived block of their segment,
+    so that the index stays sorted; reprocessed blocks (eg: retries) are not archived twice.
+    A crash can leave a record without index entry, which is then ignored.
+    """
+
+    def __init__(self, path, segment_blocks=100000, replay=False):
+        self.path = path
+        self.segment_blocks = max(1, segment_blocks)
+        self.replay = replay
+        self._lock = Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def get_segment_paths(self, segment):
+        name = os.path.join(self.path, f"{segment * self.segment_blocks:012d}")
+        return f"{name}.data", f"{name}.index"
+
+    def read_index(self, segment):
+        """Returns all index entries of a segment."""
+        _, index_path = self.get_segment_paths(segment)
+        return list(self._iter_index(index_path, 0))
+
+    def _iter_index(self, index_path, from_block):
+        """Yields the index entries of a segment, starting with the last one starting at or before from_block."""
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            count = size // INDEX_ENTRY.size
+            if not count:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+                low, high = 0, count
+                # first entry starting after from_block
+                while low < high:
+                    middle = (low + high) // 2
+                    if (
+                        INDEX_ENTRY.unpack_from(index, middle * INDEX_ENTRY.size)[0]
+                        <= from_block
+                    ):
+                        low = middle + 1
+                    else:
+                        high = middle
+                for i in range(max(0, low - 1), count):
+                    yield INDEX_ENTRY.unpack_from(index, i * INDEX_ENTRY.size)
+
+    def _last_block(self, index_path):
+        if not os.path.exists(index_path):
+            return None
+        size = os.path.getsize(index_path) // INDEX_ENTRY.size * INDEX_ENTRY.size
+        if not size:
+            return None
+        with open(index_path, "rb") as f:
+            f.seek(size - INDEX_ENTRY.size)
+            return INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))[1]
+
+    def append(self, from_block, to_block, logs, receipts):
+        """Archives the logs and receipts of a processed chunk.
+
+        Args:
+            from_block: first block in chunk
+            to_block: last block in chunk
+            logs: list of events in chunk
+            receipts: mapping of transaction hash -> receipt, for (some of) the transactions of the logs
+        """
+        with self._lock:
+            start = from_block
+            while start <= to_block:
+                segment = start // self.segment_blocks
+                end = min(to_block, (segment + 1) * self.segment_blocks - 1)
+                segment_logs = [log for log in logs if start <= log.blockNumber <= end]
+                tx_hashes = {
+                    HexBytes(log.transactionHash).hex() for log in segment_logs
+                }
+                self._append_record(
+                    segment,
+                    start,
+                    end,
+                    {
+                        "logs": segment_logs,
+                        "receipts": {
+                            tx: receipt
+                            for tx, receipt in receipts.items()
+                            if tx in tx_hashes
+                        },
+                    },
+                )
+                start = end + 1
+
+    def _append_record(self, segment, from_block, to_block, record):
+        data_path, index_path = self.get_segment_paths(segment)
+        last_block = self._last_block(index_path)
+        if last_block is not None and from_block <= last_block:
+            logger.debug(
+                f"Blocks {from_block}-{to_block} are already archived up to {last_block}."
+            )
+            return
+
+        data = zlib.compress(Web3.to_json(record).encode("utf-8"))
+        with open(data_path, "ab") as f:
+            offset = f.tell()
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(index_path, "ab") as f:
+            # drop a partial entry left by a crash
+            f.truncate(
+                os.path.getsize(index_path) // INDEX_ENTRY.size * INDEX_ENTRY.size
+            )
+            f.write(INDEX_ENTRY.pack(from_block, to_block, offset, len(data)))
+
+    def _read_record(self, segment, offset, length):
+        data_path, _ = self.get_segment_paths(segment)
+        with open(data_path, "rb") as f:
+            f.seek(offset)
+            return json.loads(zlib.decompress(f.read(length)))
+
+    def read(self, from_block, to_block):
+        """Returns (logs, receipts) of [from_block, to_block] if the archive covers all of its blocks,
+        None otherwise. receipts is a mapping of transaction hash -> receipt.
+        """
+        logs, receipts = [], {}
+        next_block = from_block
+        segment = from_block // self.segment_blocks
+        while next_block <= to_block:
+            _, index_path = self.get_segment_paths(segment)
+            for start, end, offset, length in self._iter_index(index_path, next_block):
+                if end < next_block:
+                    continue
+                if start > next_block:
+                    return None
+                record = self._read_record(segment, offset, length)
+                logs.extend(
+                    load_log(log)
+                    for log in record["logs"]
+                    if from_block <= log["blockNumber"] <= to_block
+                )
+                receipts.update(
+                    {
+                        tx: load_receipt(receipt)
+                        for tx, receipt in record["receipts"].items()
+                    }
+                )
+                next_block = end + 1
+                if next_block > to_block:
+                    break
+            if next_block <= to_block and next_block // self.segment_blocks == segment:
+                # a gap at the end of the segment
+                return None
+            segment += 1
+
+        return logs, receipts
@@ -0,0 +1,92 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+from queue import Empty, Full, Queue
+from threading import Thread
+
+logger = logging.getLogger(__name__)
+
+
+class LogPrefetcher:
+    """Fetches the logs of consecutive block chunks ahead of their processing.
+
+    A background thread walks the chunks in order and puts the outcome of each
+    fetch on a bounded queue, so the RPC works on the next chunks while the
+    consumer is still processing the current one.
+
+    Each queue item is a tuple (from_block, to_block, logs, error). If fetching
+    a chunk failed, logs is None and error holds the exception, leaving the
+    consumer to decide how to recover (e.g. by splitting the range).
+    """
+
+    POLL_INTERVAL = 1
+
+    def __init__(self, fetch_logs, chunks, depth):
+        self._fetch_logs = fetch_logs
+        self._chunks = chunks
+        self._depth = max(1, depth)
+        self._queue = Queue(maxsize=self._depth)
+        self._is_on = False
+        self._thread = Thread(target=self._run, daemon=True)
+
+    @property
+    def depth(self):
+        return self._depth
+
+    def queue_size(self):
+        """Returns the number of fetched chunks waiting to be processed."""
+        return self._queue.qsize()
+
+    def start(self):
+        self._is_on = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops fetching new chunks and drops the ones already fetched."""
+        self._is_on = False
+        while True:
+            try:
+                self._queue.get_nowait()
+            except Empty:
+                break
+
+    def _put(self, item):
+        while self._is_on:
+            try:
+                self._queue.put(item, timeout=self.POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _run(self):
+        for from_block, to_block in self._chunks:
+            if not self._is_on:
+                return
+            try:
+                item = (
+                    from_block,
+                    to_block,
+                    self._fetch_logs(from_block, to_block),
+                    None,
+                )
+            except Exception as e:
+                item = (from_block, to_block, None, e)
+            if not self._put(item):
+                return
+        # sentinel, no more chunks
+        self._put(None)
+
+    def __iter__(self):
+        while self._is_on:
+            try:
+                item = self._queue.get(timeout=self.POLL_INTERVAL)
+            except Empty:
+                if not self._thread.is_alive():
+                    return
+                continue
+            if item is None:
+                return
+            yield item
@@ -0,0 +1,179 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import logging
+import os
+import time
+from distutils.util import strtobool
+from threading import Event, Thread
+
+from aquarius.app.es_instance import ElasticsearchInstance
+from aquarius.events.events_monitor import EventsMonitor
+from aquarius.events.util import setup_web3
+from aquarius.events.worker_pool import PartitionedWorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+def get_events_rpcs():
+    """Returns a mapping of chain id -> RPC, from EVENTS_RPCS."""
+    try:
+        rpcs = json.loads(os.getenv("EVENTS_RPCS", "{}"))
+    except ValueError:
+        raise AssertionError(
+            "EVENTS_RPCS must be a json-dumped mapping of chain ids to RPCs."
+        )
+
+    return {int(chain_id): rpc for chain_id, rpc in rpcs.items()}
+
+
+class MultiChainEventsMonitor:
+    """Monitors several chains in a single process.
+
+    Each chain has its own EventsMonitor, with its own checkpoint, retry queue, NFT ownership
+    and lag metrics, while the ES client, contract registry and worker pool are shared.
+    A single thread processes blocks for all chains, taking turns: a turn processes at most
+    EVENTS_CHUNKS_PER_TURN chunks of one chain, so that a chain which is far behind does
+    not delay the others.
+    """
+
+    def __init__(self, rpcs):
+        """
+        Args:
+            rpcs: mapping of chain id -> RPC
+        """
+        self._es_instance = ElasticsearchInstance()
+        self._new_blocks = Event()
+        workers = self.get_timer_with_default("EVENTS_PROCESSING_WORKERS", 1)
+        self._worker_pool = PartitionedWorkerPool(workers) if workers > 1 else None
+        self.monitors = []
+        for chain_id, rpc in rpcs.items():
+            web3 = setup_web3(logger, rpc)
+            if web3.eth.chain_id != chain_id:
+                raise Exception(
+                    f"Mismatch of chain IDs in EVENTS_RPCS! Configured chain ID: {chain_id} and RPC chain ID: {web3.eth.chain_id}"
+                )
+            self.monitors.append(
+                EventsMonitor(
+                    web3,
+                    es_instance=self._es_instance,
+                    worker_pool=self._worker_pool,
+                    rpc=rpc,
+                    new_blocks=self._new_blocks,
+                )
+            )
+
+        self._chunks_per_turn = max(
+            1, self.get_timer_with_default("EVENTS_CHUNKS_PER_TURN", 1)
+        )
+        self._monitor_sleep_time = self.get_timer_with_default(
+            "EVENTS_MONITOR_SLEEP_TIME", 30
+        )
+        self._is_on = False
+        logger.info(
+            f"Monitoring chains {[monitor._chain_id for monitor in self.monitors]}, "
+            f"{self._chunks_per_turn} chunks per turn."
+        )
+
+    @staticmethod
+    def get_timer_with_default(env_name, default_value):
+        try:
+            return int(os.getenv(env_name, default_value))
+        except ValueError:
+            return default_value
+
+    def start_events_monitor(self):
+        """Starts one thread per task, each one handling all chains"""
+        self._is_on = True
+        for monitor in self.monitors:
+            monitor.start_head_follower()
+
+        self._start_thread(self.thread_process_blocks)
+        self._start_thread(
+            self._run_periodically,
+            "nft_ownership.update_lists",
+            [monitor.nft_ownership.update_lists for monitor in self.monitors],
+            self.get_timer_with_default("EVENTS_NFT_TRANSFER_SLEEP_TIME", 300),
+        )
+        if strtobool(os.getenv("PROCESS_RETRY_QUEUE", "0")):
+            self._start_thread(
+                self._run_periodically,
+                "retry_mechanism.process_queue",
+                [monitor.retry_mechanism.process_queue for monitor in self.monitors],
+                self.get_timer_with_default("EVENTS_PROCESS_QUEUE_SLEEP_TIME", 60),
+            )
+        # purgatory and veAllocate are not chain specific
+        first_monitor = self.monitors[0]
+        if first_monitor.ve_allocate:
+            self._start_thread(
+                self._run_periodically,
+                "ve_allocate.update_lists",
+                [first_monitor.ve_allocate.update_lists],
+                self.get_timer_with_default("EVENTS_VE_ALLOCATE_SLEEP_TIME", 300),
+            )
+        if first_monitor.purgatory:
+            self._start_thread(
+                self._run_periodically,
+                "purgatory.update_lists",
+                [first_monitor.purgatory.update_lists],
+                self.get_timer_with_default("EVENTS_PURGATORY_SLEEP_TIME", 300),
+            )
+
+    def stop_monitor(self):
+        """Stops all threads, and writes pending checkpoints of all chains"""
+        self._is_on = False
+        for monitor in self.monitors:
+            monitor.stop_monitor()
+
+    def _start_thread(self, target, *args):
+        t = Thread(target=target, args=args, daemon=True)
+        t.start()
+
+    def _run_periodically(self, name, tasks, sleep_time):
+        while self._is_on:
+            logger.info(f"Starting {name} ....")
+            for task in tasks:
+                try:
+                    task()
+                except (KeyError, Exception) as e:
+                    logger.error(f"Error in {name}: {str(e)}.")
+            time.sleep(sleep_time)
+
+    def thread_process_blocks(self):
+        while self._is_on:
+            if not self.process_turn():
+                logger.info(f"Lag per chain: {self.get_lag()}")
+                self.wait_for_new_blocks()
+
+    def process_turn(self):
+        """Gives every chain a turn to process its blocks.
+        Returns True if some chain is still behind after its turn.
+        """
+        behind = False
+        for monitor in self.monitors:
+            last_block = monitor.get_lag()["last_block"]
+            try:
+                monitor.process_current_blocks(self._chunks_per_turn)
+            except (KeyError, Exception) as e:
+                logger.error(f"Error processing chain {monitor._chain_id}: {str(e)}.")
+                continue
+            lag = monitor.get_lag()
+            # only count chains that made progress, not those failing to get blocks
+            behind = behind or bool(lag["lag"] and lag["last_block"] != last_block)
+
+        return behind
+
+    def wait_for_new_blocks(self):
+        """Waits EVENTS_MONITOR_SLEEP_TIME seconds, or less if a head follower is notified of new blocks."""
+        if any(monitor.is_following_head() for monitor in self.monitors):
+            self._new_blocks.wait(self._monitor_sleep_time)
+            self._new_blocks.clear()
+            return
+
+        time.sleep(self._monitor_sleep_time)
+
+    def get_lag(self):
+        """Returns the lag metrics of all chains."""
+        return [monitor.get_lag() for monitor in self.monitors]
@@ -0,0 +1,176 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import logging
+import os
+import weakref
+from threading import Lock
+
+from eth_utils.address import to_checksum_address
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+logger = logging.getLogger(__name__)
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    }
+]
+
+
+_MULTICALL_CONTRACTS = weakref.WeakKeyDictionary()
+_MULTICALL_CONTRACTS_LOCK = Lock()
+
+
+def get_multicall_address(chain_id):
+    """Returns the Multicall3 address configured for chain_id in MULTICALL_ADDRESSES, or None."""
+    try:
+        multicall_addresses = json.loads(os.getenv("MULTICALL_ADDRESSES", "{}"))
+    except ValueError:
+        logger.error("MULTICALL_ADDRESSES is not a valid JSON.")
+        return None
+
+    return multicall_addresses.get(str(chain_id))
+
+
+def get_max_multicall_calls():
+    try:
+        return max(1, int(os.getenv("MULTICALL_MAX_CALLS", 100)))
+    except ValueError:
+        return 100
+
+
+def get_contract_attribute(contract, attr_name, args=None):
+    """Calls a view function, returns "" if the call fails."""
+    data = ""
+    args = args if args else []
+    try:
+        data = getattr(contract.caller, attr_name)(*args)
+    except Exception as e:
+        logger.warn(f"Cannot get token {attr_name}: {e}")
+        pass
+    return data
+
+
+def get_multicall_contract(web3, address):
+    """Returns the Multicall3 contract at address, built once per web3 instance."""
+    address = to_checksum_address(address)
+    with _MULTICALL_CONTRACTS_LOCK:
+        contracts = _MULTICALL_CONTRACTS.setdefault(web3, {})
+        if address not in contracts:
+            contracts[address] = web3.eth.contract(address=address, abi=MULTICALL3_ABI)
+
+        return contracts[address]
+
+
+class Multicall:
+    """Collects contract reads and runs them with Multicall3 `aggregate3`.
+
+    Each read is allowed to fail on its own: like `get_contract_attribute`, a failed read
+    results in "". If no Multicall3 contract is configured for the chain, or if the
+    aggregated call itself fails, reads are made one by one.
+    """
+
+    def __init__(self, web3, chain_id, address=None, max_calls=None):
+        self._web3 = web3
+        self._calls = []
+        address = address if address else get_multicall_address(chain_id)
+        self._multicall = get_multicall_contract(web3, address) if address else None
+        self._max_calls = max_calls if max_calls else get_max_multicall_calls()
+
+    def add(self, contract, attr_name, args=None):
+        """Adds a read and returns its index in the results of `execute`."""
+        self._calls.append((contract, attr_name, args if args else []))
+        return len(self._calls) - 1
+
+    def execute(self):
+        """Runs all reads and returns their results, in the order they were added."""
+        if not self._multicall:
+            return [
+                get_contract_attribute(contract, attr_name, args)
+                for contract, attr_name, args in self._calls
+            ]
+
+        results = []
+        for i in range(0, len(self._calls), self._max_calls):
+            results.extend(self._aggregate(self._calls[i : i + self._max_calls]))
+
+        return results
+
+    def _aggregate(self, calls):
+        encoded = []
+        for contract, attr_name, args in calls:
+            try:
+                encoded.append(contract.encodeABI(fn_name=attr_name, args=args))
+            except Exception as e:
+                logger.warn(f"Cannot get token {attr_name}: {e}")
+                encoded.append(None)
+
+        requests = [
+            (contract.address, True, data)
+            for (contract, _, _), data in zip(calls, encoded)
+            if data is not None
+        ]
+        try:
+            responses = (
+                iter(self._multicall.functions.aggregate3(requests).call())
+                if requests
+                else iter([])
+            )
+        except Exception as e:
+            logger.warning(f"Multicall failed, using single calls: {e}")
+            return [
+                get_contract_attribute(contract, attr_name, args)
+                for contract, attr_name, args in calls
+            ]
+
+        return [
+            self._decode(contract, attr_name, *next(responses))
+            if data is not None
+            else ""
+            for (contract, attr_name, _), data in zip(calls, encoded)
+        ]
+
+    def _decode(self, contract, attr_name, success, return_data):
+        try:
+            if not success:
+                raise ValueError("call reverted")
+
+            output_types = get_abi_output_types(
+                contract.get_function_by_name(attr_name).abi
+            )
+            decoded = self._web3.codec.decode(output_types, return_data)
+            normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+        except Exception as e:
+            logger.warn(f"Cannot get token {attr_name}: {e}")
+            return ""
+
+        return normalized[0] if len(normalized) == 1 else normalized
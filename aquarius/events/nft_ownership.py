@@ -14,6 +14,7 @@ import requests
 from web3 import Web3
 
 
+from aquarius.events.checkpoint import Checkpoint
 from aquarius.events.util import get_defined_block, make_did
 from aquarius.graphql import get_nft_transfers
 from elasticsearch.exceptions import NotFoundError
@@ -29,6 +30,7 @@ class NftOwnership:
         self._chain_id = chain_id
         self._index_name = "nft_events_" + str(self._chain_id)
         self._events_monitor = events_monitor
+        self._checkpoint = Checkpoint(es_instance, db_index, self._index_name)
 
     def get_last_processed_block(self):
         """Get last processed_block, fallback to contract deployment block"""
@@ -44,9 +46,7 @@ class NftOwnership:
                 logging.error("Connection to ES failed. Trying to connect to back...")
                 time.sleep(5)
             # logging.info("Stable connection to ES.")
-            last_block_record = self._es_instance.es.get(
-                index=self._db_index, id=self._index_name
-            )["_source"]
+            last_block_record = self._checkpoint.load()
             block = (
                 last_block_record["last_block"]
                 if last_block_record["last_block"] >= 0
@@ -61,38 +61,38 @@ class NftOwnership:
                 logging.error(f"Cannot get last_block error={e}")
         return block
 
+    def get_cached_last_block(self):
+        """Returns the last processed block kept in memory, reading ES only if it is not known yet."""
+        block = self._checkpoint.block
+        if not isinstance(block, int) or block < 0:
+            return self.get_last_processed_block()
+
+        return block
+
     def store_last_processed_block(self, block):
-        """Stores last processed block
+        """Stores last processed block, see `Checkpoint`
 
         Args:
             block: last block that was processed
         """
         # make sure that we don't write a block < then needed
-        stored_block = self.get_last_processed_block()
-        logger.info(f"Storing last_processed_block {block}  (In Es: {stored_block})")
+        stored_block = self.get_cached_last_block()
+        logger.debug(f"Storing last_processed_block {block}  (Stored: {stored_block})")
         if block <= stored_block:
             return
-        record = {"last_block": block}
-        try:
-            self._es_instance.es.index(
-                index=self._db_index,
-                id=self._index_name,
-                body=record,
-                refresh="wait_for",
-            )["_id"]
+        self._checkpoint.update(block, {"last_block": block})
 
-        except elasticsearch.exceptions.RequestError:
-            logger.error(
-                f"store_last_processed_block: block={block} type={type(block)}, ES RequestError"
-            )
+    def flush_last_processed_block(self):
+        """Writes the last processed block to ES, if it was not written yet."""
+        self._checkpoint.flush()
 
     def update_lists(self):
         """
         Grab and process all nft transfership events from subgraph, starting from last known block
         """
-        start_block = self.get_last_processed_block()
+        start_block = self.get_cached_last_block()
         # never go past last indexed block, because we will not have the ddos
-        end_block = self._events_monitor.get_last_processed_block()
+        end_block = self._events_monitor.get_cached_last_block()
         if end_block <= start_block:
             # no data to ingest
             return
@@ -109,10 +109,9 @@ class NftOwnership:
         for transfer in nft_transfers_list:
             did = make_did(transfer["nft"]["id"], self._chain_id)
             try:
-                asset = self._es_instance.read(did)
-                asset["nft"]["owner"] = to_checksum_address(transfer["newOwner"]["id"])
-                self._es_instance.update(asset, did)
-                logger.debug(f"Updated {did}: new owner: {asset['nft']['owner']}")
+                owner = to_checksum_address(transfer["newOwner"]["id"])
+                self._es_instance.update_fields(did, {"nft.owner": owner})
+                logger.debug(f"Updated {did}: new owner: {owner}")
             except NotFoundError:
                 logger.debug(
                     f"Unable to update new owner {transfer['newOwner']['id']} for did {did}:  Not Found"
@@ -122,3 +121,4 @@ class NftOwnership:
                     f"Unable to update new owner {transfer['newOwner']['id']} for did {did}:  {e}"
                 )
             self.store_last_processed_block(transfer["block"])
+        self.flush_last_processed_block()
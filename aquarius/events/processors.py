@@ -8,23 +8,28 @@ import logging
 import os
 from abc import ABC
 from datetime import datetime
+from elasticsearch.exceptions import ConflictError
 from eth_utils.address import to_checksum_address
 
+from aquarius.app.es_instance import get_write_conditions
 from aquarius.ddo_checker.shacl_checker import validate_dict
+from aquarius.events.block_cache import get_block_cache
 from aquarius.events.constants import (
     AquariusCustomDDOFields,
     EventTypes,
     MetadataStates,
     SoftDeleteMetadataStates,
 )
+from aquarius.events.contract_registry import get_contract_registry
 from aquarius.events.decryptor import decrypt_ddo
+from aquarius.events.multicall import Multicall, get_contract_attribute
 from aquarius.events.proof_checker import check_metadata_proofs
+from aquarius.events.receipts import ReceiptCache
 from aquarius.events.util import (
     make_did,
     get_dt_factory,
     update_did_state,
     get_erc20_contract,
-    get_nft_contract,
 )
 from aquarius.graphql import get_number_orders_price
 from aquarius.rbac import RBAC
@@ -33,6 +38,16 @@ from web3.logs import DISCARD
 logger = logging.getLogger(__name__)
 
 
+def get_applied_block(ddo):
+    """Returns the block of the last event applied to a stored DDO:
+    its last MetadataCreated/Updated event, or a later MetadataState change.
+    """
+    return max(
+        int(ddo.get("event", {}).get("block", 0)),
+        int(ddo.get("nft", {}).get("stateBlock", 0)),
+    )
+
+
 class EventProcessor(ABC):
     def __init__(
         self,
@@ -50,6 +65,8 @@ class EventProcessor(ABC):
         self.dt_contract = dt_contract
         self.sender_address = sender_address
         self.block = event.blockNumber
+        # block of the NFT state set by this processor, see get_applied_block
+        self.state_block = self.block
         self.txid = self.event.transactionHash.hex()
 
         self._es_instance = es_instance
@@ -58,6 +75,13 @@ class EventProcessor(ABC):
         self.purgatory = purgatory
         self._chain_id = chain_id
         self.metadata_proofs = None
+        self.receipts = None
+
+    def get_receipt(self, tx_hash):
+        """Returns a transaction receipt, shared with other processors of the chunk if possible."""
+        if not self.receipts:
+            self.receipts = ReceiptCache(self._web3)
+        return self.receipts.get(tx_hash)
 
     def check_permission(self, publisher_address, tx_id, asset):
         if not os.getenv("RBAC_SERVER_URL") or not publisher_address or not tx_id:
@@ -74,7 +98,12 @@ class EventProcessor(ABC):
     def add_aqua_data(self, record):
         """Adds keys that are specific to Aquarius, on top of the DDO structure:
         event, nft, datatokens."""
-        block_info = self._web3.eth.get_block(self.event.blockNumber)
+        block_info = get_block_cache().get(
+            self._web3,
+            self._chain_id,
+            self.event.blockNumber,
+            self.event.get("blockHash"),
+        )
         block_time = datetime.fromtimestamp(block_info["timestamp"]).isoformat()
 
         record[AquariusCustomDDOFields.EVENT] = {
@@ -85,16 +114,26 @@ class EventProcessor(ABC):
             "datetime": block_time,
         }
 
-        record[AquariusCustomDDOFields.NFT] = {
-            "address": self.dt_contract.address,
-            "name": self._get_contract_attribute(self.dt_contract, "name"),
-            "symbol": self._get_contract_attribute(self.dt_contract, "symbol"),
-            "state": self._get_contract_attribute(self.dt_contract, "metaDataState"),
-            "tokenURI": self._get_contract_attribute(self.dt_contract, "tokenURI", [1]),
-            "owner": self.get_nft_owner(),
+        # all NFT and datatoken reads are made with a single multicall, if configured
+        multicall = Multicall(self._web3, self._chain_id)
+        nft_reads = {
+            "name": multicall.add(self.dt_contract, "name"),
+            "symbol": multicall.add(self.dt_contract, "symbol"),
+            "state": multicall.add(self.dt_contract, "metaDataState"),
+            "tokenURI": multicall.add(self.dt_contract, "tokenURI", [1]),
+            "owner": multicall.add(self.dt_contract, "ownerOf", [1]),
         }
+        datatokens = self.get_tokens_info(record, multicall)
+        results = multicall.execute()
+
+        record[AquariusCustomDDOFields.NFT] = {"address": self.dt_contract.address}
+        for key, index in nft_reads.items():
+            record[AquariusCustomDDOFields.NFT][key] = results[index]
 
-        record[AquariusCustomDDOFields.DATATOKENS] = self.get_tokens_info(record)
+        for datatoken in datatokens:
+            datatoken["name"] = results[datatoken["name"]]
+            datatoken["symbol"] = results[datatoken["symbol"]]
+        record[AquariusCustomDDOFields.DATATOKENS] = datatokens
 
         order_count, price = get_number_orders_price(
             self.dt_contract.address, self.block, self._chain_id
@@ -103,6 +142,8 @@ class EventProcessor(ABC):
             "allocated": 0,
             "orders": order_count,
             "price": price,
+            # block the stats were read at, see OrderStartedProcessor
+            "block": self.block,
         }
 
         return record, block_time
@@ -117,17 +158,25 @@ class EventProcessor(ABC):
                 for custom_field in AquariusCustomDDOFields.get_all_values()
             ]
         }
-        return self._es_instance.update(soft_deleted_asset, did)
+        return self._es_instance.update(
+            soft_deleted_asset, did, **get_write_conditions(old_asset)
+        )
 
     def update_aqua_nft_state_data(self, new_state: str, did: str):
         """Updates NFT state field from the aquarius custom fields data listed in AquariusCustomDDOFields for a given
         DID"""
-        asset_to_update = self._es_instance.read(did)
-        asset_to_update[AquariusCustomDDOFields.NFT]["state"] = new_state
-
-        return self._es_instance.update(asset_to_update, did)
+        return self._es_instance.update_fields(
+            did,
+            {
+                f"{AquariusCustomDDOFields.NFT}.state": new_state,
+                f"{AquariusCustomDDOFields.NFT}.stateBlock": self.state_block,
+            },
+        )
 
-    def get_tokens_info(self, record):
+    def get_tokens_info(self, record, multicall=None):
+        """Returns the datatokens info of record's services.
+        If multicall is given, name and symbol are the indexes of the reads added to it.
+        """
         datatokens = []
         for service in record.get("services", []):
             token_contract = get_erc20_contract(self._web3, service["datatokenAddress"])
@@ -135,8 +184,12 @@ class EventProcessor(ABC):
             datatokens.append(
                 {
                     "address": service["datatokenAddress"],
-                    "name": self._get_contract_attribute(token_contract, "name"),
-                    "symbol": self._get_contract_attribute(token_contract, "symbol"),
+                    "name": multicall.add(token_contract, "name")
+                    if multicall
+                    else self._get_contract_attribute(token_contract, "name"),
+                    "symbol": multicall.add(token_contract, "symbol")
+                    if multicall
+                    else self._get_contract_attribute(token_contract, "symbol"),
                     "serviceId": service["id"],
                 }
             )
@@ -144,23 +197,7 @@ class EventProcessor(ABC):
         return datatokens
 
     def _get_contract_attribute(self, contract, attr_name, args=None):
-        data = ""
-        args = args if args else []
-        try:
-            data = getattr(contract.caller, attr_name)(*args)
-        except Exception as e:
-            logger.warn(f"Cannot get token {attr_name}: {e}")
-            pass
-        return data
-
-    def get_nft_owner(self):
-        data = ""
-        try:
-            data = self.dt_contract.caller.ownerOf(1)
-        except Exception as e:
-            logger.warn(f"Cannot get NFT ownerOf: {e}")
-            pass
-        return data
+        return get_contract_attribute(contract, attr_name, args)
 
 
 class MetadataCreatedProcessor(EventProcessor):
@@ -185,7 +222,7 @@ class MetadataCreatedProcessor(EventProcessor):
             return False, msg
 
         valid_remote, errors = validate_dict(
-            _record, self._chain_id, self.dt_contract.address
+            _record, self._chain_id, self.dt_contract.address, self._es_instance
         )
 
         if not valid_remote:
@@ -203,8 +240,9 @@ class MetadataCreatedProcessor(EventProcessor):
 
     def restore_nft_state(self, ddo, state):
         ddo["nft"]["state"] = state
+        ddo["nft"]["stateBlock"] = self.state_block
         record_str = json.dumps(ddo)
-        self._es_instance.update(record_str, self.did)
+        self._es_instance.update(record_str, self.did, **get_write_conditions(ddo))
         _record = json.loads(record_str)
         name = _record["metadata"]["name"]
         sender_address = _record["nft"]["owner"]
@@ -295,8 +333,17 @@ class MetadataCreatedProcessor(EventProcessor):
                 if ddo["nft"]["state"] == MetadataStates.ACTIVE:
                     logger.warning(f"{did} is already registered on this chainId")
                     return
+                # eg: shards of a backfill processed a later state change first
+                if self.state_block < get_applied_block(ddo):
+                    logger.warning(
+                        f"{did} was changed after block {self.state_block}, not restoring its state"
+                    )
+                    return
                 self.restore_nft_state(ddo, asset["nft"]["state"])
                 return True
+        except ConflictError:
+            # the event is retried, with the new version of the ddo
+            raise
         except Exception:
             pass
 
@@ -364,6 +411,8 @@ class MetadataUpdatedProcessor(EventProcessor):
         _record = copy.deepcopy(data)
         _record, _ = self.add_aqua_data(_record)
         _record["nft"]["created"] = old_asset["nft"]["created"]
+        if "stateBlock" in old_asset["nft"]:
+            _record["nft"]["stateBlock"] = old_asset["nft"]["stateBlock"]
 
         version = _record.get("version")
         if not version:
@@ -372,7 +421,7 @@ class MetadataUpdatedProcessor(EventProcessor):
             return False, msg
 
         valid_remote, errors = validate_dict(
-            _record, self._chain_id, self.dt_contract.address
+            _record, self._chain_id, self.dt_contract.address, self._es_instance
         )
         if not valid_remote:
             msg = (
@@ -476,6 +525,7 @@ class MetadataUpdatedProcessor(EventProcessor):
                 self.purgatory,
                 self._chain_id,
             )
+            event_processor.receipts = self.receipts
 
             return event_processor.process()
 
@@ -486,7 +536,9 @@ class MetadataUpdatedProcessor(EventProcessor):
         _record, error_msg = self.make_record(asset, old_asset)
         if _record:
             try:
-                self._es_instance.update(json.dumps(_record), did)
+                self._es_instance.update(
+                    json.dumps(_record), did, **get_write_conditions(old_asset)
+                )
                 logger.info(f"updated DDO did={did}")
                 update_did_state(
                     self._es_instance,
@@ -497,6 +549,9 @@ class MetadataUpdatedProcessor(EventProcessor):
                     None,
                 )
                 return True
+            except ConflictError:
+                # the event is retried, with the new version of the ddo
+                raise
             except (KeyError, Exception) as err:
                 error = f"encountered an error while updating the asset data to ES: {str(err)}"
                 logger.error(error)
@@ -549,51 +604,68 @@ class OrderStartedProcessor:
         self.last_sync_block = last_sync_block
 
         try:
-            self.asset = self.es_instance.read(self.did)
+            self.asset = self.es_instance.read(self.did, fields=["stats"])
         except Exception:
             logger.debug(f"Asset {self.did} is missing from ES.")
             self.asset = None
 
     def process(self):
-        if not self.asset:
+        if self.asset is None:
             return
         logger.debug(f"Retrieving number of orders for {self.token_address}.")
         number_orders, price = get_number_orders_price(
             self.token_address, self.last_sync_block, self.chain_id
         )
+        self.asset.setdefault("stats", {})
         self.asset["stats"]["orders"] = number_orders
         self.asset["stats"]["price"] = price
+        self.asset["stats"]["block"] = self.last_sync_block
 
         logger.debug(f"Updating number of orders to {number_orders} for {self.did}.")
-        self.es_instance.update(self.asset, self.did)
+        # stats read at an older block (eg: by a backfill shard) are not applied
+        self.es_instance.update_fields(
+            self.did,
+            {"stats.orders": number_orders, "stats.price": price},
+            block_field="stats.block",
+            block=self.last_sync_block,
+        )
 
         return self.asset
 
 
 class TokenURIUpdatedProcessor:
-    def __init__(self, event, web3, es_instance, chain_id):
+    def __init__(self, event, web3, es_instance, chain_id, receipts=None):
         self.did = make_did(event.address, chain_id)
         self.es_instance = es_instance
         self.event = event
         self.web3 = web3
+        self.receipts = receipts if receipts else ReceiptCache(web3)
 
         try:
-            self.asset = self.es_instance.read(self.did)
+            self.asset = self.es_instance.read(self.did, fields=["nft"])
         except Exception:
             self.asset = None
 
     def process(self):
-        if not self.asset:
+        if self.asset is None:
             return
-        erc721_contract = get_nft_contract(self.web3, self.event.address)
-
-        receipt = self.web3.eth.get_transaction_receipt(self.event.transactionHash)
-        event_decoded = erc721_contract.events.TokenURIUpdate().process_receipt(
-            receipt, errors=DISCARD
-        )[0]
+        receipt = self.receipts.get(self.event.transactionHash)
+        event_decoded = (
+            get_contract_registry()
+            .get_event(self.web3, "ERC721Template", "TokenURIUpdate")
+            .process_receipt(receipt, errors=DISCARD)[0]
+        )
 
+        self.asset.setdefault("nft", {})
         self.asset["nft"]["tokenURI"] = event_decoded.args.tokenURI
-        self.es_instance.update(self.asset, self.did)
+        self.asset["nft"]["tokenURIBlock"] = self.event.blockNumber
+        # events of a DID can be processed out of block order by the shards of a backfill
+        self.es_instance.update_fields(
+            self.did,
+            {"nft.tokenURI": event_decoded.args.tokenURI},
+            block_field="nft.tokenURIBlock",
+            block=self.event.blockNumber,
+        )
 
         return self.asset
 
@@ -602,16 +674,15 @@ class MetadataStateProcessor(EventProcessor):
     def restore_ddo(self):
         soft_deleted_ddo = self._es_instance.read(self.did)
 
-        receipt = self._web3.eth.get_transaction_receipt(
-            soft_deleted_ddo["event"]["tx"]
-        )
+        receipt = self.get_receipt(soft_deleted_ddo["event"]["tx"])
 
-        create_events = self.dt_contract.events[
-            EventTypes.EVENT_METADATA_CREATED
-        ]().process_receipt(receipt, errors=DISCARD)
-        update_events = self.dt_contract.events[
-            EventTypes.EVENT_METADATA_UPDATED
-        ]().process_receipt(receipt, errors=DISCARD)
+        registry = get_contract_registry()
+        create_events = registry.get_event(
+            self._web3, "ERC721Template", EventTypes.EVENT_METADATA_CREATED
+        ).process_receipt(receipt, errors=DISCARD)
+        update_events = registry.get_event(
+            self._web3, "ERC721Template", EventTypes.EVENT_METADATA_UPDATED
+        ).process_receipt(receipt, errors=DISCARD)
 
         if not create_events and not update_events:
             logger.error("create/update ddo event not found")
@@ -629,6 +700,8 @@ class MetadataStateProcessor(EventProcessor):
             self.purgatory,
             self._chain_id,
         )
+        event_processor.receipts = self.receipts
+        event_processor.state_block = self.block
 
         return event_processor.process()
 
@@ -642,6 +715,12 @@ class MetadataStateProcessor(EventProcessor):
                 f"Detected MetadataState changed for {self.did}, but it does not exists."
             )
             return
+        # events of a DID can be processed out of block order by the shards of a backfill
+        if self.block < get_applied_block(ddo):
+            logger.warning(
+                f"{self.did} was changed after block {self.block}, ignoring MetadataState {self.event.args.state}"
+            )
+            return
         # if asset was already in soft state, let's check if we need to bring it back
         if (
             self.event.args.state == MetadataStates.ACTIVE
@@ -0,0 +1,294 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+import os
+import time
+from collections import deque
+from threading import BoundedSemaphore, Lock
+
+import lru
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def _close_client(url, client):
+    client.close()
+
+
+def get_env_float(env_name, default):
+    try:
+        return max(0, float(os.getenv(env_name, default)))
+    except ValueError:
+        return default
+
+
+# decryptorUrl are read from the chain, only keep the clients of the last providers
+_clients = lru.LRU(
+    max(1, int(get_env_float("PROVIDER_CLIENTS_CACHE_SIZE", 100))),
+    callback=_close_client,
+)
+_clients_lock = Lock()
+
+
+class ProviderUnavailable(Exception):
+    """Raised without calling a provider while its circuit breaker is open."""
+
+    def __init__(self, url, retry_at):
+        """
+        Args:
+            url: provider URL
+            retry_at: timestamp at which the provider will be called again
+        """
+        super().__init__(
+            f"Provider {url} is unavailable, not calling it before {int(retry_at)}."
+        )
+        self.url = url
+        self.retry_at = retry_at
+
+
+def get_provider_client_settings():
+    """Returns (max_concurrency, rate_limit) from PROVIDER_MAX_CONCURRENCY (default 10)
+    and PROVIDER_RATE_LIMIT (requests per second, default 0: unlimited).
+    """
+    return (
+        max(1, int(get_env_float("PROVIDER_MAX_CONCURRENCY", 10))),
+        get_env_float("PROVIDER_RATE_LIMIT", 0),
+    )
+
+
+def get_provider_client(provider_url):
+    """Returns the ProviderClient of a provider, shared by all threads.
+
+    The clients of the PROVIDER_CLIENTS_CACHE_SIZE (default 100) last used providers are
+    kept, the session of the others is closed.
+    """
+    provider_url = provider_url.rstrip("/")
+    with _clients_lock:
+        if provider_url not in _clients:
+            _clients[provider_url] = ProviderClient(provider_url)
+        return _clients[provider_url]
+
+
+def get_providers_stats():
+    """Returns the stats of all providers called so far, by provider URL."""
+    with _clients_lock:
+        clients = list(_clients.values())
+
+    return {client.url: client.get_stats() for client in clients}
+
+
+class CircuitBreaker:
+    """Stops calling a provider that keeps failing.
+
+    Closed: requests are sent. After failure_threshold consecutive failures, the breaker opens:
+    requests fail fast with ProviderUnavailable for reset_timeout seconds. Then it is half open:
+    a single request is sent as a probe, closing the breaker if it succeeds, opening it again
+    otherwise.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, url, failure_threshold=None, reset_timeout=None):
+        self.url = url
+        self.failure_threshold = (
+            failure_threshold
+            if failure_threshold
+            else max(1, int(get_env_float("PROVIDER_BREAKER_FAILURES", 5)))
+        )
+        self.reset_timeout = (
+            reset_timeout
+            if reset_timeout is not None
+            else get_env_float("PROVIDER_BREAKER_RESET_TIME", 60)
+        )
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = Lock()
+
+    @property
+    def retry_at(self):
+        """Timestamp at which an open breaker lets a probe through."""
+        return (self.opened_at or time.time()) + self.reset_timeout
+
+    def before_request(self):
+        """Raises ProviderUnavailable if the request must not be sent."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.time() >= self.retry_at:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if not self._probing:
+                    self._probing = True
+                    return
+                # the probe is in flight, its outcome is known by reset_timeout at most
+                raise ProviderUnavailable(self.url, time.time() + self.reset_timeout)
+
+            raise ProviderUnavailable(self.url, self.retry_at)
+
+    def on_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(
+                    f"Provider {self.url} is back, closing its circuit breaker."
+                )
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def on_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.time()
+                logger.warning(
+                    f"Provider {self.url} failed {self.failures} times, not calling it for {self.reset_timeout}s."
+                )
+
+
+class ProviderClient:
+    """HTTP client of one provider (decryptorUrl).
+
+    Requests go through a pooled session, so connections are kept alive and reused instead
+    of opening a new TCP/TLS connection per DDO. At most max_concurrency requests are sent
+    to the provider at once, others wait for a free slot, and if rate_limit is set, at
+    most rate_limit requests are started per second. The latency of the last requests
+    is kept, see get_stats. Failed requests count for the latency too: those that timed
+    out at their timeout, others at their elapsed time.
+
+    Requests fail fast with ProviderUnavailable while the provider circuit breaker is
+    open. Unless given, the timeout adapts to the provider: twice the p99 latency of the
+    last requests, between PROVIDER_MIN_TIMEOUT and PROVIDER_MAX_TIMEOUT seconds.
+    """
+
+    LATENCY_WINDOW = 200
+    # latencies needed before adapting the timeout
+    MIN_LATENCY_SAMPLES = 20
+
+    def __init__(self, url, max_concurrency=None, rate_limit=None):
+        env_concurrency, env_rate_limit = get_provider_client_settings()
+        self.url = url
+        self.max_concurrency = max_concurrency if max_concurrency else env_concurrency
+        self.rate_limit = rate_limit if rate_limit is not None else env_rate_limit
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._semaphore = BoundedSemaphore(self.max_concurrency)
+        self._lock = Lock()
+        self._next_request_at = 0
+        self._latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.breaker = CircuitBreaker(url)
+        self.min_timeout = get_env_float("PROVIDER_MIN_TIMEOUT", 1)
+        self.max_timeout = max(
+            self.min_timeout, get_env_float("PROVIDER_MAX_TIMEOUT", 4)
+        )
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+
+    def _wait_for_rate_limit(self):
+        if not self.rate_limit:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + (
+                1 / self.rate_limit
+            )
+        if wait > 0:
+            time.sleep(wait)
+
+    def get_timeout(self):
+        """Returns twice the p99 latency, between min_timeout and max_timeout."""
+        with self._lock:
+            samples = len(self._latencies)
+        if samples < self.MIN_LATENCY_SAMPLES:
+            return self.max_timeout
+
+        return min(
+            self.max_timeout,
+            max(self.min_timeout, 2 * self.get_latency_percentile(99)),
+        )
+
+    def post(self, path, timeout=None, **kwargs):
+        """Posts to a path of the provider, waiting for a free slot and for the rate limit.
+        Raises ProviderUnavailable if the provider circuit breaker is open.
+
+        Args:
+            path: path of the endpoint, eg: /api/services/decrypt
+            timeout: seconds to wait for the provider once the request is sent, adaptive if None
+            kwargs: passed to requests, eg: json
+        """
+        self.breaker.before_request()
+        with self._semaphore:
+            self._wait_for_rate_limit()
+            with self._lock:
+                self.in_flight += 1
+            timeout = timeout if timeout else self.get_timeout()
+            start = time.monotonic()
+            failed = True
+            timed_out = False
+            try:
+                response = self._session.post(
+                    self.url + path, timeout=timeout, **kwargs
+                )
+                # the provider answered, but could not handle the request
+                failed = response.status_code >= 500
+                return response
+            except requests.exceptions.Timeout:
+                timed_out = True
+                raise
+            finally:
+                latency = time.monotonic() - start
+                if timed_out:
+                    latency = max(latency, timeout)
+                with self._lock:
+                    self.in_flight -= 1
+                    self.requests += 1
+                    self.errors += 1 if failed else 0
+                    self._latencies.append(latency)
+                if failed:
+                    self.breaker.on_failure()
+                else:
+                    self.breaker.on_success()
+
+    def close(self):
+        """Closes the pooled connections of the provider."""
+        self._session.close()
+
+    def get_latency_percentile(self, percentile):
+        """Returns a percentile (0-100) of the latency of the last requests, in seconds, None if there are none."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
+
+    def get_stats(self):
+        with self._lock:
+            stats = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "breaker": self.breaker.state,
+            }
+        stats["p50"] = self.get_latency_percentile(50)
+        stats["p99"] = self.get_latency_percentile(99)
+        stats["timeout"] = self.get_timeout()
+
+        return stats
@@ -2,7 +2,6 @@
 # Copyright 2023 Ocean Protocol Foundation
 # SPDX-License-Identifier: Apache-2.0
 #
-import json
 import logging
 import os
 from datetime import datetime
@@ -59,7 +58,9 @@ class Purgatory:
         asset["purgatory"]["reason"] = reason
         logger.info(f"PURGATORY: updating asset {did} with value {purgatory}.")
         try:
-            self._es_instance.update(json.dumps(asset), did)
+            self._es_instance.update_fields(
+                did, {"purgatory.state": purgatory, "purgatory.reason": reason}
+            )
         except Exception as e:
             logger.warning(f"updating ddo {did} purgatory attribute failed: {e}")
 
@@ -127,7 +128,7 @@ class Purgatory:
 
         for did, reason in new_ids_for_purgatory:
             try:
-                asset = self._es_instance.read(did)
+                asset = self._es_instance.read(did, fields=["id"])
                 self.update_asset_purgatory_status(asset, reason=reason)
                 self.reference_asset_list.add((did, reason))
             except elasticsearch.exceptions.NotFoundError:
@@ -135,7 +136,7 @@ class Purgatory:
 
         for did, reason in new_ids_forgiven:
             try:
-                asset = self._es_instance.read(did)
+                asset = self._es_instance.read(did, fields=["id"])
                 self.update_asset_purgatory_status(asset, False, reason)
                 self.reference_asset_list.remove((did, reason))
             except elasticsearch.exceptions.NotFoundError:
@@ -0,0 +1,98 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+from collections import OrderedDict
+from threading import Lock
+
+from hexbytes import HexBytes
+
+from aquarius.events.http_provider import batch_request, is_batching_enabled
+
+logger = logging.getLogger(__name__)
+
+
+def group_logs_by_tx(logs):
+    """Groups logs by transaction hash, keeping their order.
+
+    Args:
+        logs: list of events, as returned by get_logs
+    """
+    grouped = OrderedDict()
+    for log in logs:
+        grouped.setdefault(HexBytes(log.transactionHash).hex(), []).append(log)
+
+    return grouped
+
+
+class ReceiptCache:
+    """Transaction receipts for the logs of one chunk.
+
+    A single transaction usually emits several of the events we index (eg: MetadataCreated,
+    MetadataValidated, OrderStarted and ExchangeCreated on publish), and each processor needs
+    the receipt to decode its own event. Receipts are fetched once per transaction and shared
+    between processors, including those running in different worker threads.
+    """
+
+    def __init__(self, web3, logs=None, receipts=None):
+        """
+        Args:
+            web3: Web3 instance
+            logs: logs of the chunk, whose receipts can be prefetched
+            receipts: receipts already known, by transaction hash (eg: from the log archive)
+        """
+        self._web3 = web3
+        self._receipts = dict(receipts) if receipts else {}
+        self._lock = Lock()
+        self._tx_locks = {}
+        self.tx_logs = group_logs_by_tx(logs) if logs else OrderedDict()
+        self.fetched = 0
+        self.saved = 0
+
+    def prefetch(self):
+        """Fetches the receipts of all transactions in the chunk with JSON-RPC batches.
+        Does nothing if the provider does not batch calls, receipts are then fetched on first use.
+        """
+        with self._lock:
+            missing = [tx for tx in self.tx_logs if tx not in self._receipts]
+        if len(missing) < 2 or not is_batching_enabled(self._web3):
+            return
+
+        results = batch_request(
+            self._web3, [("eth_getTransactionReceipt", [tx]) for tx in missing]
+        )
+        with self._lock:
+            for tx_hash, receipt in zip(missing, results):
+                if receipt is None or isinstance(receipt, Exception):
+                    # fetched again on first use
+                    continue
+                self._receipts[tx_hash] = receipt
+                self.fetched += 1
+
+    def get(self, tx_hash):
+        """Returns the receipt of a transaction, fetching it only on first use."""
+        tx_hash = HexBytes(tx_hash).hex()
+        with self._lock:
+            tx_lock = self._tx_locks.setdefault(tx_hash, Lock())
+
+        with tx_lock:
+            if tx_hash in self._receipts:
+                with self._lock:
+                    self.saved += 1
+                return self._receipts[tx_hash]
+
+            receipt = self._web3.eth.get_transaction_receipt(tx_hash)
+            with self._lock:
+                self._receipts[tx_hash] = receipt
+                self.fetched += 1
+
+        return receipt
+
+    def get_receipts(self):
+        """Returns the receipts fetched so far, by transaction hash."""
+        with self._lock:
+            return dict(self._receipts)
+
+    def get_stats(self):
+        return {"fetched": self.fetched, "saved": self.saved}
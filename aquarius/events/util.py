@@ -4,9 +4,7 @@
 #
 from eth_utils import remove_0x_prefix
 from eth_utils.address import to_checksum_address, is_address
-import artifacts
 import hashlib
-import json
 import logging
 import os
 import time
@@ -16,6 +14,8 @@ from web3 import Web3
 from web3.exceptions import ExtraDataLengthError
 
 import addresses
+from aquarius.events.address_book import get_address_book
+from aquarius.events.contract_registry import get_contract_registry
 from aquarius.events.http_provider import get_web3_connection_provider
 from web3.logs import DISCARD
 
@@ -49,14 +49,7 @@ def get_network_name():
 
 def get_start_block_by_chain_id(chain_id: int) -> str:
     """Return the contract address with the given name and chain id"""
-    with open(get_address_file(), "r") as address_json:
-        addresses = json.load(address_json)
-
-    return next(
-        network_values["startBlock"]
-        for network_values in addresses.values()
-        if network_values["chainId"] == chain_id
-    )
+    return get_address_book(get_address_file()).get_start_block(chain_id)
 
 
 def get_defined_block(chain_id: int):
@@ -124,39 +117,21 @@ def deploy_datatoken(w3, account, name, symbol):
 
 def get_address_of_type(web3, chain_id=None, address_type=None):
     chain_id = chain_id if chain_id else web3.eth.chain_id
-    address_file = get_address_file()
-
-    with open(address_file) as f:
-        address_json = json.load(f)
+    address = get_address_book(get_address_file()).get_address(chain_id, address_type)
 
-    correspondence = {
-        elem["chainId"]: elem[address_type]
-        for elem in address_json.values()
-        if "chainId" in elem and address_type in elem
-    }
-
-    if chain_id not in correspondence:
+    if address is None:
         raise Exception(b"No {address_type} factory configured for chain id")
 
-    return correspondence[chain_id]
+    return address
 
 
 def get_contract(web3, contract_name, address):
-    abi = get_contract_definition(contract_name)["abi"]
-
-    return web3.eth.contract(address=to_checksum_address(address), abi=abi)
+    return get_contract_registry().get_contract(web3, contract_name, address)
 
 
 def get_contract_definition(contract_name: str):
     """Returns the abi JSON for a contract name."""
-    path = os.path.join(artifacts.__file__, "..", f"{contract_name}.json")
-    path = Path(path).expanduser().resolve()
-
-    if not path.exists():
-        raise TypeError("Contract name does not exist in artifacts.")
-
-    with open(path) as f:
-        return json.load(f)
+    return get_contract_registry().get_definition(contract_name)
 
 
 def get_dt_factory(web3, chain_id=None):
@@ -243,29 +218,36 @@ def get_config_chain_id():
     return web3.eth.chain_id
 
 
-def get_metadata_start_block():
-    """Returns the block number to use as start"""
+def get_metadata_start_block(chain_id=None):
+    """Returns the block number to use as start.
+    If chain_id is given (eg: when monitoring multiple chains), the network is found by chain id instead of name.
+    """
     block_number = int(os.getenv("METADATA_CONTRACT_BLOCK", 0))
-    if not block_number:
-        address_file = get_address_file()
-        with open(address_file) as f:
-            address_json = json.load(f)
-        network = get_network_name()
-        block_number = (
-            address_json[network]["startBlock"]
-            if "startBlock" in address_json[network]
-            else 0
-        )
+    if not block_number and chain_id:
+        try:
+            block_number = get_start_block_by_chain_id(chain_id)
+        except KeyError:
+            block_number = 0
+    elif not block_number:
+        network = get_address_book(get_address_file()).get_network(get_network_name())
+        block_number = network["startBlock"] if "startBlock" in network else 0
 
     return block_number
 
 
-def setup_web3(_logger=None):
+def setup_web3(_logger=None, network_rpc=None):
     """
     :param _logger: Logger instance
+    :param network_rpc: RPC to connect to, defaults to EVENTS_RPC. The chain id of an
+        explicit RPC is not checked against PUBLIC_RPC.
     :return: web3 instance
     """
-    network_rpc = os.environ.get("EVENTS_RPC", "http:127.0.0.1:8545")
+    check_config_chain_id = not network_rpc
+    network_rpc = (
+        network_rpc
+        if network_rpc
+        else os.environ.get("EVENTS_RPC", "http:127.0.0.1:8545")
+    )
     if _logger:
         _logger.info(
             f"EventsMonitor: starting with the following values: rpc={network_rpc}"
@@ -281,7 +263,7 @@ def setup_web3(_logger=None):
 
         web3.middleware_onion.inject(geth_poa_middleware, layer=0)
 
-    if "PUBLIC_RPC" in os.environ:
+    if check_config_chain_id and "PUBLIC_RPC" in os.environ:
         config_chain_id = get_config_chain_id()
 
         if config_chain_id != web3.eth.chain_id:
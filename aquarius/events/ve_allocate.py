@@ -2,7 +2,6 @@
 # Copyright 2023 Ocean Protocol Foundation
 # SPDX-License-Identifier: Apache-2.0
 #
-import json
 import logging
 import os
 from datetime import datetime
@@ -11,6 +10,7 @@ import elasticsearch
 import requests
 from web3 import Web3
 
+from aquarius.app.es_instance import get_write_conditions, retry_on_conflict
 from aquarius.events.util import make_did
 
 logger = logging.getLogger(__name__)
@@ -44,6 +44,7 @@ class VeAllocate:
     def update_asset(self, asset, ve_allocated_realtime):
         """
         Updates the field `state.allocated`  in `asset` object.
+        Raises ConflictError if the asset changed since it was read.
         """
         did = asset["id"]
         if "stats" not in asset:
@@ -56,8 +57,18 @@ class VeAllocate:
                 f"veAllocate: updating asset {did} with state.allocated={ve_allocated_realtime}."
             )
             try:
-                self._es_instance.update(json.dumps(asset), did)
-            except Exception as e:
+                self._es_instance.update_fields(
+                    did,
+                    {"stats.allocated": ve_allocated_realtime},
+                    **get_write_conditions(asset),
+                )
+            except elasticsearch.exceptions.ConflictError:
+                # retried by read_and_update_asset's caller, with a fresh read
+                raise
+            except (
+                elasticsearch.exceptions.ApiError,
+                elasticsearch.exceptions.TransportError,
+            ) as e:
                 logger.warning(
                     f"updating ddo {did} stats.allocated attribute failed: {e}"
                 )
@@ -66,6 +77,13 @@ class VeAllocate:
                 f"veAllocate: asset {did} has unchanged state.allocated ({ve_allocated_realtime})."
             )
 
+    def read_and_update_asset(self, did, ve_allocated_realtime):
+        """
+        Reads the asset of `did` and updates its `state.allocated`, see `update_asset`.
+        """
+        asset = self._es_instance.read(did, fields=["id", "stats"])
+        self.update_asset(asset, ve_allocated_realtime)
+
     def update_lists(self):
         """
         :return: None
@@ -86,8 +104,18 @@ class VeAllocate:
         for nft, ve_allocated_realtime, chain_id in ve_list:
             did = make_did(nft, chain_id)
             try:
-                asset = self._es_instance.read(did)
-                self.update_asset(asset, ve_allocated_realtime)
+                retry_on_conflict(
+                    self.read_and_update_asset, did, ve_allocated_realtime
+                )
             except elasticsearch.exceptions.NotFoundError:
                 logger.debug(f"Cannot find asset {did} for veAllocate update")
                 continue
+            except (
+                elasticsearch.exceptions.ConflictError,
+                elasticsearch.exceptions.ApiError,
+                elasticsearch.exceptions.TransportError,
+            ) as e:
+                # the other assets are still updated
+                logger.warning(
+                    f"updating ddo {did} stats.allocated attribute failed: {e}"
+                )
@@ -0,0 +1,73 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+def get_event_key(event):
+    """Returns (transaction hash, log index), identifying an event of a chain."""
+    return event.transactionHash, event.logIndex
+
+
+def partition_events(events, key=None):
+    """Groups events by partition key, keeping their original order inside each group.
+
+    Args:
+        events: list of events, in block/log order
+        key: function returning the partition key of an event, defaults to the lowercase event address
+    """
+    key = key if key else lambda event: event.address.lower()
+    partitions = OrderedDict()
+    for event in events:
+        partitions.setdefault(key(event), []).append(event)
+
+    return partitions
+
+
+class PartitionedWorkerPool:
+    """Runs partitions of events concurrently on a pool of threads.
+
+    Events in the same partition are handled one after another, in order, by a
+    single worker, while different partitions are handled in parallel.
+    """
+
+    def __init__(self, max_workers):
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="events-worker"
+        )
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    @staticmethod
+    def _run_partition(events, handler):
+        for event in events:
+            handler(event)
+
+    def run(self, partitions, handler):
+        """Handles all partitions and returns once every one of them has drained.
+
+        Args:
+            partitions: mapping of partition key -> ordered list of events
+            handler: function called for each event
+        """
+        futures = {
+            self._executor.submit(self._run_partition, events, handler): partition
+            for partition, events in partitions.items()
+        }
+        wait(futures)
+        for future, partition in futures.items():
+            if future.exception():
+                logger.error(
+                    f"Failed to process events of partition {partition}: {future.exception()}"
+                )
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
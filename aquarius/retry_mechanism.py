@@ -46,12 +46,13 @@ class RetryMechanism:
         purgatory,
         chain_id,
         event_monitor_instance,
+        web3=None,
     ):
         self._es_instance = es_instance
         self._retries_db_index = retries_db_index
         self._purgatory = purgatory
         self._chain_id = chain_id
-        self._web3 = setup_web3()
+        self._web3 = web3 if web3 else setup_web3()
         self.retry_interval = timedelta(minutes=5)
         self._event_monitor_instance = event_monitor_instance
         try:
@@ -170,11 +171,14 @@ class RetryMechanism:
         self.add_element_to_retry_queue(element)
         return id
 
-    def add_event_to_retry_queue(self, event, nft_address: None, error: None):
+    def add_event_to_retry_queue(
+        self, event, nft_address: None, error: None, next_retry=None
+    ):
         """Add event to retry queue
 
         Args:
             event
+            next_retry: timestamp of the next retry, defaults to a backoff on the number of retries
         """
 
         did = make_did(nft_address, self._chain_id) if nft_address else None
@@ -191,14 +195,15 @@ class RetryMechanism:
         }
         id = self.create_id(element)
         element["id"] = id
-        self.add_element_to_retry_queue(element)
+        self.add_element_to_retry_queue(element, next_retry)
         return id
 
-    def add_element_to_retry_queue(self, element):
+    def add_element_to_retry_queue(self, element, next_retry=None):
         """Adds element to retry queue. If element exists, updates number_retries & next_retry
 
         Args:
             element
+            next_retry: timestamp of the next retry, defaults to a backoff on the number of retries
         """
         id = element.get("id", None)
         if not id:
@@ -211,7 +216,9 @@ class RetryMechanism:
             pass
 
         element["next_retry"] = int(
-            (
+            next_retry
+            if next_retry
+            else (
                 datetime.now(timezone.utc)
                 + (element["number_retries"] + 1) * self.retry_interval
             ).timestamp()
@@ -21,6 +21,10 @@ from aquarius.app.es_instance import ElasticsearchInstance
 from aquarius.app.util import get_bool_env_value
 from aquarius.config import get_version
 from aquarius.constants import BaseURLs, Metadata
+from aquarius.ddo_checker.shacl_checker import (
+    get_ddo_validation_pool,
+    preload_shapes_graphs,
+)
 from aquarius.events.events_monitor import EventsMonitor
 from aquarius.events.util import setup_web3
 from aquarius.myapp import app
@@ -28,6 +32,9 @@ from aquarius.rbac import RBAC
 
 aquarius_url = os.getenv("AQUARIUS_URL")
 es_instance = ElasticsearchInstance()
+# parse the SHACL shapes and start the validation workers when the worker starts, not on the first validation
+preload_shapes_graphs()
+get_ddo_validation_pool()
 
 
 @app.before_request
@@ -98,7 +105,7 @@ app.register_blueprint(validation, url_prefix=BaseURLs.VALIDATION_URL)
 def force_set_block(chain_id, block_number):
     index_name = "events_last_block_" + str(chain_id)
     other_db_index = f"{es_instance.db_index}_plus"
-    record = {"last_block": block_number}
+    record = {"last_block": int(block_number)}
 
     es_instance.es.index(
         index=other_db_index,
@@ -110,6 +117,19 @@ def force_set_block(chain_id, block_number):
     print("OK")
 
 
+@app.cli.command("backfill")
+@click.argument("shards", type=int)
+@click.option("--to-block", type=int, default=None)
+def backfill(shards, to_block):
+    """Processes the blocks of EVENTS_RPC, from the last processed block to the current block
+    (or TO_BLOCK), with SHARDS concurrent workers. Resumes an interrupted backfill."""
+    monitor = EventsMonitor(setup_web3())
+    monitor.backfill(shards, to_block)
+    monitor.stop_monitor()
+
+    print("OK")
+
+
 def get_status():
     db_url = (
         os.getenv("DB_HOSTNAME", "https://localhost")
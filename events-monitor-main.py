@@ -5,10 +5,17 @@
 import http.server
 import logging
 import os
+import signal
 import socketserver
+import sys
 import time
 
+from aquarius.ddo_checker.shacl_checker import (
+    get_ddo_validation_pool,
+    preload_shapes_graphs,
+)
 from aquarius.events.events_monitor import EventsMonitor
+from aquarius.events.multi_chain_monitor import MultiChainEventsMonitor, get_events_rpcs
 from aquarius.events.util import setup_web3
 from aquarius.log import setup_logging
 
@@ -26,17 +33,30 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 def run_events_monitor():
     setup_logging()
     logger.info("EventsMonitor: preparing")
-    required_env_vars = ["EVENTS_RPC"]
-    for envvar in required_env_vars:
-        if not os.getenv(envvar):
-            raise AssertionError(
-                f"env var {envvar} is missing, make sure to set the following "
-                f"environment variables before starting the events monitor: {required_env_vars}"
-            )
-
-    monitor = EventsMonitor(setup_web3(logger))
+    # EVENTS_RPCS monitors several chains in this process, EVENTS_RPC a single one
+    if not os.getenv("EVENTS_RPC") and not os.getenv("EVENTS_RPCS"):
+        raise AssertionError(
+            "env var EVENTS_RPC is missing, make sure to set EVENTS_RPC or EVENTS_RPCS "
+            "before starting the events monitor"
+        )
+
+    preload_shapes_graphs()
+    get_ddo_validation_pool()
+    if os.getenv("EVENTS_RPCS"):
+        monitor = MultiChainEventsMonitor(get_events_rpcs())
+    else:
+        monitor = EventsMonitor(setup_web3(logger))
     monitor.start_events_monitor()
 
+    def shutdown(signum, frame):
+        # stops the threads and writes pending checkpoints
+        logger.info("EventsMonitor: stopping")
+        monitor.stop_monitor()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
     logger.info("EventsMonitor: started")
     if os.getenv("EVENTS_HTTP", None):
         logger.info("Events HTTP probing started on port 5001..")
@@ -36,6 +36,7 @@ install_requirements = [
     "pyshacl==0.22.2",
     "gql==3.4.1",
     "aiohttp==3.9.0",
+    "lru-dict>=1.1.6",
 ]
 
 setup_requirements = ["pytest-runner==6.0.0"]
@@ -0,0 +1,57 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+"""
+Measures DDO validations per second: with pyshacl, parsing the SHACL shapes on every
+validation (as before the shapes graphs were cached) and with the cached shapes graphs,
+then with the native validators compiled from the shapes.
+
+Usage: python -m tests.benchmark_validation [iterations]
+"""
+import os
+import sys
+import time
+from unittest.mock import patch
+
+from aquarius.ddo_checker import shacl_checker
+from aquarius.ddo_checker.shacl_checker import get_schema, validate_dict
+from tests.ddos.ddo_sample1_v4 import json_dict
+from tests.ddos.ddo_sample_algorithm_v4 import algorithm_ddo_sample
+
+
+def run(iterations):
+    ddos = [json_dict, algorithm_ddo_sample]
+    start = time.perf_counter()
+    for i in range(iterations):
+        ddo = ddos[i % len(ddos)]
+        valid, errors = validate_dict(ddo, ddo["chainId"], ddo["nftAddress"])
+        assert valid, errors
+
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    # the same DDOs are validated again and again
+    os.environ["VALIDATION_CACHE_SIZE"] = "0"
+    os.environ["DDO_VALIDATOR"] = "shacl"
+    # pyshacl parses the schema text passed as shacl_graph
+    with patch.object(shacl_checker, "get_shapes_graph", get_schema):
+        uncached = run(iterations)
+
+    shacl_checker.preload_shapes_graphs()
+    cached = run(iterations)
+
+    os.environ["DDO_VALIDATOR"] = "native"
+    native = run(iterations)
+
+    print(f"shapes parsed per validation: {uncached:.1f} validations/sec")
+    print(f"cached shapes graph:          {cached:.1f} validations/sec")
+    print(f"native validator:             {native:.1f} validations/sec")
+    print(f"speedup: {cached / uncached:.2f}x cached, {native / uncached:.2f}x native")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from aquarius.events.address_book import AddressBook
+
+NETWORKS = {
+    "development": {"chainId": 8996, "startBlock": 0, "Router": "0x1"},
+    "polygon": {"chainId": 137, "startBlock": 100, "Router": "0x2"},
+    "polygon-old": {"chainId": 137, "startBlock": 50, "Dispenser": "0x3"},
+}
+
+
+def write_address_file(path, networks, mtime):
+    with open(path, "w") as f:
+        json.dump(networks, f)
+    os.utime(path, (mtime, mtime))
+
+
+def test_address_book(tmp_path):
+    path = tmp_path / "address.json"
+    write_address_file(path, NETWORKS, 1000)
+    book = AddressBook(path)
+
+    assert book.get_network("polygon")["Router"] == "0x2"
+    assert book.get_address(137, "Router") == "0x2"
+    assert book.get_address(137, "Dispenser") == "0x3"
+    assert book.get_address(137, "FixedPrice") is None
+    assert book.get_address(1, "Router") is None
+    assert book.get_start_block(137) == 100
+    with pytest.raises(KeyError):
+        book.get_start_block(1)
+
+
+def test_address_book_reloads_on_mtime_change(tmp_path):
+    path = tmp_path / "address.json"
+    write_address_file(path, NETWORKS, 1000)
+    book = AddressBook(path)
+
+    with patch("aquarius.events.address_book.json.load", wraps=json.load) as load:
+        assert book.get_address(8996, "Router") == "0x1"
+        assert book.get_address(8996, "Router") == "0x1"
+        assert load.call_count == 1
+
+        networks = dict(NETWORKS)
+        networks["development"] = {"chainId": 8996, "Router": "0x4"}
+        write_address_file(path, networks, 2000)
+        assert book.get_address(8996, "Router") == "0x4"
+        assert load.call_count == 2
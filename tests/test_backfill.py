@@ -0,0 +1,228 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from unittest.mock import Mock, patch
+
+import elasticsearch
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from aquarius.events.backfill import Backfill, split_block_range
+from aquarius.events.chunk_sizer import AdaptiveChunkSizer
+from aquarius.events.processors import (
+    MetadataStateProcessor,
+    TokenURIUpdatedProcessor,
+    get_applied_block,
+)
+
+
+class FakeMonitor:
+    def __init__(self, last_block, head, docs=None):
+        self.docs = docs if docs is not None else {}
+        self._es_instance = Mock()
+        self._es_instance.es.get.side_effect = self.get_doc
+        self._es_instance.es.index.side_effect = self.index_doc
+        self._es_instance.es.delete.side_effect = self.delete_doc
+        self._other_db_index = "aquarius_plus"
+        self._chain_id = 8996
+        self._web3 = Mock()
+        self._web3.eth.block_number = head
+        self._checkpoint = Mock()
+        self._chunk_sizer = AdaptiveChunkSizer(10)
+        self.last_block = last_block
+        self.processed = []
+        self.chunk_sizers = []
+
+    def get_doc(self, index, id):
+        if id not in self.docs:
+            raise elasticsearch.NotFoundError(
+                "Not found", meta=Mock(status=404), body={}
+            )
+        return {"_source": self.docs[id], "_seq_no": 1, "_primary_term": 1}
+
+    def index_doc(self, index, id, body, **kwargs):
+        self.docs[id] = body
+        return {"_seq_no": 1, "_primary_term": 1}
+
+    def delete_doc(self, index, id):
+        self.docs.pop(id)
+
+    def get_cached_last_block(self):
+        return self.last_block
+
+    def store_last_processed_block(self, block):
+        self.last_block = max(self.last_block, block)
+
+    def process_block_range(
+        self, from_block, to_block, store_last_processed_block, chunk_sizer
+    ):
+        self.chunk_sizers.append(chunk_sizer)
+        chunk_sizer.on_failure(chunk_sizer.size)
+        for start in range(from_block, to_block + 1, 10):
+            end = min(start + 9, to_block)
+            self.processed.append((start, end))
+            store_last_processed_block(end)
+
+
+def test_split_block_range():
+    assert split_block_range(1, 10, 3) == [(1, 4), (5, 7), (8, 10)]
+    assert split_block_range(1, 2, 4) == [(1, 1), (2, 2)]
+    assert split_block_range(5, 4, 4) == []
+
+
+def test_backfill():
+    monitor = FakeMonitor(last_block=99, head=399)
+    backfill = Backfill(monitor, 3)
+    assert [(s.from_block, s.to_block) for s in backfill.shards] == [
+        (100, 199),
+        (200, 299),
+        (300, 399),
+    ]
+    assert monitor.docs["events_backfill_8996"]["shards"] == [
+        (100, 199),
+        (200, 299),
+        (300, 399),
+    ]
+
+    backfill.run()
+    assert monitor.last_block == 399
+    assert sorted(monitor.processed) == [
+        (start, start + 9) for start in range(100, 400, 10)
+    ]
+    # cursors and manifest are deleted once merged
+    assert monitor.docs == {}
+
+    # every shard adapts its own chunk size, the one of the monitor is left alone
+    assert len({id(sizer) for sizer in monitor.chunk_sizers}) == 3
+    assert monitor._chunk_sizer not in monitor.chunk_sizers
+    assert monitor._chunk_sizer.size == 10
+
+
+def test_backfill_merges_shards_that_met():
+    monitor = FakeMonitor(last_block=99, head=399)
+    backfill = Backfill(monitor, 3)
+    first, second, third = backfill.shards
+
+    second.store_last_processed_block(299)
+    third.store_last_processed_block(350)
+    assert backfill.merge() == 99
+
+    first.store_last_processed_block(150)
+    assert backfill.merge() == 150
+
+    first.store_last_processed_block(199)
+    # the first shard met the second one, which is done, and the third one
+    assert backfill.merge() == 350
+    assert monitor.last_block == 350
+
+
+def test_backfill_resumes():
+    monitor = FakeMonitor(last_block=149, head=399)
+    monitor.docs["events_backfill_8996"] = {"shards": [(100, 199), (200, 299)]}
+    monitor.docs["events_backfill_8996_0"] = {"last_block": 149}
+    monitor.docs["events_backfill_8996_1"] = {"last_block": 299}
+
+    backfill = Backfill(monitor, 4)
+    assert len(backfill.shards) == 2
+    backfill.run()
+
+    assert monitor.processed == [
+        (150, 159),
+        (160, 169),
+        (170, 179),
+        (180, 189),
+        (190, 199),
+    ]
+    assert monitor.last_block == 299
+
+
+def test_state_change_applied_if_newer():
+    ddo = {
+        "event": {"block": 100},
+        "nft": {"state": 0, "stateBlock": 200},
+    }
+    assert get_applied_block(ddo) == 200
+    assert get_applied_block({"event": {"block": 100}, "nft": {}}) == 100
+
+    es_instance = Mock()
+    es_instance.read.return_value = ddo
+    event = AttributeDict(
+        {
+            "args": AttributeDict({"state": 1}),
+            "transactionHash": HexBytes("0x01"),
+            "address": "0x2cd82B786608998a331FF1aaE67B4b38d804635b",
+            "blockNumber": 150,
+        }
+    )
+    processor = MetadataStateProcessor(
+        event, None, None, es_instance, None, None, None, 8996
+    )
+    processor.process()
+    es_instance.update_fields.assert_not_called()
+
+    processor = MetadataStateProcessor(
+        AttributeDict(dict(event, blockNumber=250)),
+        None,
+        None,
+        es_instance,
+        None,
+        None,
+        None,
+        8996,
+    )
+    processor.process()
+    es_instance.update_fields.assert_called_once_with(
+        processor.did, {"nft.state": 1, "nft.stateBlock": 250}
+    )
+
+
+class FakeDdoStore:
+    """In memory ElasticsearchInstance.read/update_fields, with the block check of
+    UPDATE_FIELDS_SCRIPT."""
+
+    def __init__(self, ddo):
+        self.ddo = ddo
+
+    def read(self, did, fields=None):
+        return {field: dict(self.ddo[field]) for field in fields or self.ddo}
+
+    def update_fields(self, did, fields, block_field=None, block=None):
+        path = block_field.split(".")
+        stored = self.ddo.get(path[0], {}).get(path[1])
+        if stored is not None and stored > block:
+            return did
+        for key, value in dict(fields, **{block_field: block}).items():
+            section, name = key.split(".")
+            self.ddo.setdefault(section, {})[name] = value
+        return did
+
+
+def test_token_uri_applied_if_newer():
+    store = FakeDdoStore({"id": "did", "nft": {"tokenURI": "uri0"}})
+    address = "0x2cd82B786608998a331FF1aaE67B4b38d804635b"
+    events = [
+        AttributeDict(
+            {
+                "address": address,
+                "transactionHash": HexBytes(f"0x0{i}"),
+                "blockNumber": block,
+                "uri": f"uri{i}",
+            }
+        )
+        for i, block in [(1, 100), (2, 200)]
+    ]
+
+    # a later shard applies the newest event first
+    for event in reversed(events):
+        registry = Mock()
+        registry.get_event.return_value.process_receipt.return_value = [
+            AttributeDict({"args": AttributeDict({"tokenURI": event.uri})})
+        ]
+        with patch(
+            "aquarius.events.processors.get_contract_registry",
+            return_value=registry,
+        ):
+            TokenURIUpdatedProcessor(event, None, store, 8996, Mock()).process()
+
+    assert store.ddo["nft"] == {"tokenURI": "uri2", "tokenURIBlock": 200}
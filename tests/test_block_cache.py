@@ -0,0 +1,85 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from unittest.mock import Mock, patch
+
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from aquarius.events.block_cache import BlockHeaderCache
+
+HASH_1 = HexBytes("0x" + "11" * 32)
+HASH_2 = HexBytes("0x" + "22" * 32)
+
+
+def make_block(number, block_hash=HASH_1):
+    return AttributeDict(
+        {
+            "number": number,
+            "hash": block_hash,
+            "parentHash": HexBytes("0x" + "00" * 32),
+            "timestamp": 1000 + number,
+            "transactions": [],
+        }
+    )
+
+
+def test_final_headers_served_from_cache():
+    web3 = Mock()
+    web3.eth.get_block.side_effect = lambda number: make_block(number)
+    cache = BlockHeaderCache(size=10, confirmations=5)
+    cache.set_head(8996, 100)
+
+    assert cache.get(web3, 8996, 10).timestamp == 1010
+    assert cache.get(web3, 8996, 10).timestamp == 1010
+    # other chain, other key
+    assert cache.get(web3, 137, 10).timestamp == 1010
+
+    assert web3.eth.get_block.call_count == 2
+    assert cache.get_stats() == {"hits": 1, "misses": 2, "size": 2}
+
+
+def test_recent_headers_validated_by_hash():
+    web3 = Mock()
+    web3.eth.get_block.side_effect = lambda number: make_block(number, HASH_2)
+    cache = BlockHeaderCache(size=10, confirmations=5)
+    cache.set_head(8996, 100)
+
+    header = cache.get(web3, 8996, 99, HASH_1)
+    assert header.hash == HASH_2
+    assert web3.eth.get_block.call_count == 1
+
+    assert cache.get(web3, 8996, 99, HASH_2) == header
+    assert web3.eth.get_block.call_count == 1
+
+    # reorged block: the hash does not match, fetch it again
+    cache.get(web3, 8996, 99, HASH_1)
+    # no hash to compare with
+    cache.get(web3, 8996, 99)
+    assert web3.eth.get_block.call_count == 3
+
+
+def test_prefill():
+    web3 = Mock()
+    cache = BlockHeaderCache(size=10, confirmations=5)
+    cache.set_head(8996, 100)
+
+    with patch(
+        "aquarius.events.block_cache.is_batching_enabled", return_value=True
+    ), patch(
+        "aquarius.events.block_cache.batch_request",
+        return_value=[make_block(10), Exception("failed")],
+    ) as batch_request:
+        cache.prefill(web3, 8996, [11, 10, 10])
+
+    batch_request.assert_called_once_with(
+        web3,
+        [
+            ("eth_getBlockByNumber", ["0xa", False]),
+            ("eth_getBlockByNumber", ["0xb", False]),
+        ],
+        100,
+    )
+    assert cache.get(web3, 8996, 10).timestamp == 1010
+    assert web3.eth.get_block.call_count == 0
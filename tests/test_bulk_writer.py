@@ -0,0 +1,207 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from threading import Thread
+from unittest.mock import Mock, patch
+
+from aquarius.app.es_instance import ElasticsearchInstance
+from aquarius.events.bulk_writer import (
+    BulkWriter,
+    get_bulk_writer,
+    get_bulk_writer_settings,
+)
+
+
+def get_es(failed_ids=()):
+    def bulk(operations):
+        items = []
+        for operation in operations:
+            # skips the documents following index and update actions
+            op_type, meta = next(iter(operation.items()), (None, None))
+            if not isinstance(meta, dict) or "_index" not in meta:
+                continue
+            status = 400 if meta["_id"] in failed_ids else 200
+            items.append({op_type: {"_id": meta["_id"], "status": status}})
+        return {"errors": bool(failed_ids), "items": items}
+
+    es = Mock()
+    es.bulk.side_effect = bulk
+    es.index.return_value = {"_id": "did"}
+    return es
+
+
+def get_es_instance(es):
+    with patch.object(ElasticsearchInstance, "__init__", return_value=None):
+        es_instance = ElasticsearchInstance()
+    es_instance._es = es
+    es_instance._index = "oceandb"
+    es_instance._did_states_index = "oceandb_did_states"
+    return es_instance
+
+
+def test_get_bulk_writer_settings(monkeypatch):
+    assert get_bulk_writer_settings() == (500, 5)
+
+    monkeypatch.setenv("EVENTS_BULK_MAX_ACTIONS", "0")
+    monkeypatch.setenv("EVENTS_BULK_FLUSH_INTERVAL", "not a number")
+    assert get_bulk_writer_settings() == (0, 5)
+
+
+def test_writes_are_buffered_until_commit():
+    es = get_es()
+    es_instance = get_es_instance(es)
+    writer = BulkWriter(es, max_actions=10, flush_interval=60)
+
+    with writer.source("event"):
+        assert get_bulk_writer() is writer
+        assert get_bulk_writer(Mock()) is None
+        assert es_instance.update({"id": "did1"}, "did1") == "did1"
+        es_instance.update_did_state(
+            "0x0000000000000000000000000000000000000001", 8996, "0x01", True, ""
+        )
+    assert get_bulk_writer() is None
+
+    # writes outside of a source are not buffered
+    es_instance.update({"id": "did2"}, "did2")
+    assert es.index.call_count == 1
+    assert es.bulk.call_count == 0
+
+    assert writer.commit() == []
+    operations = es.bulk.call_args.kwargs["operations"]
+    assert operations[:2] == [
+        {"index": {"_index": "oceandb", "_id": "did1"}},
+        {"id": "did1"},
+    ]
+    assert operations[2]["index"]["_index"] == "oceandb_did_states"
+    es.indices.refresh.assert_called_once_with(index="oceandb,oceandb_did_states")
+
+    # nothing written since the last commit
+    writer.commit()
+    assert es.bulk.call_count == 1
+    assert es.indices.refresh.call_count == 1
+
+
+def test_flush_by_size_and_time():
+    es = get_es()
+    writer = BulkWriter(es, max_actions=2, flush_interval=60)
+    writer.index("index", "a", {})
+    assert es.bulk.call_count == 0
+    writer.index("index", "b", {})
+    assert es.bulk.call_count == 1
+
+    writer = BulkWriter(es, max_actions=100, flush_interval=1)
+    with patch("time.monotonic", return_value=10):
+        writer.update("index", "a", '{"stats": {"orders": 1}}')
+    with patch("time.monotonic", return_value=11):
+        writer.delete("index", "b")
+    assert es.bulk.call_count == 2
+    assert es.bulk.call_args.kwargs["operations"] == [
+        {"update": {"_index": "index", "_id": "a"}},
+        {"doc": {"stats": {"orders": 1}}},
+        {"delete": {"_index": "index", "_id": "b"}},
+    ]
+    assert writer.stats == {"actions": 2, "requests": 1, "failed": 0}
+
+
+def test_write_creates():
+    es = get_es()
+    es.exists.return_value = False
+    es_instance = get_es_instance(es)
+    writer = BulkWriter(es, max_actions=10, flush_interval=60)
+
+    with writer.source("event"):
+        assert es_instance.write({"id": "did1"}, "did1") == "did1"
+    writer.commit()
+    assert es.bulk.call_args.kwargs["operations"] == [
+        {"create": {"_index": "oceandb", "_id": "did1"}},
+        {"id": "did1"},
+    ]
+
+
+def test_reads_see_pending_writes():
+    es = get_es()
+    es.get.return_value = {"_source": {"id": "did1"}}
+    es_instance = get_es_instance(es)
+    writer = BulkWriter(es, max_actions=10, flush_interval=60)
+
+    with writer.source("event"):
+        es_instance.update({"id": "did1"}, "did1")
+        es_instance.read("did2")
+        assert es.bulk.call_count == 0
+
+        es_instance.read("did1")
+        assert es.bulk.call_count == 1
+
+        # the document was sent, no need to flush again
+        es_instance.read("did1")
+        assert es.bulk.call_count == 1
+
+
+def test_failures_are_reported_by_event():
+    es = get_es(failed_ids=["did1", "did2"])
+    on_failure = Mock()
+    writer = BulkWriter(es, max_actions=10, flush_interval=60, on_failure=on_failure)
+
+    with writer.source("event1"):
+        writer.index("index", "did1", {})
+        writer.index("index", "ok", {})
+        writer.index("index", "did1", {})
+    with writer.source("event2", "0x01"):
+        writer.index("index", "did2", {})
+
+    failures = writer.commit()
+    assert [event for event, _ in failures] == ["event1", "event2"]
+    assert on_failure.call_count == 2
+    assert on_failure.call_args_list[0].args[:2] == ("event1", None)
+    assert on_failure.call_args_list[1].args[:2] == ("event2", "0x01")
+    assert "did2" in on_failure.call_args_list[1].args[2]
+    assert writer.stats["failed"] == 3
+
+    # the whole request fails
+    es.bulk.side_effect = Exception("Connection refused")
+    with writer.source("event3"):
+        writer.index("index", "did3", {})
+    assert [event for event, _ in writer.commit()] == ["event3"]
+
+
+def test_sources_are_per_thread():
+    es = get_es()
+    writer = BulkWriter(es, max_actions=10, flush_interval=60)
+    results = []
+
+    with writer.source("event"):
+        thread = Thread(target=lambda: results.append(get_bulk_writer()))
+        thread.start()
+        thread.join()
+
+    assert results == [None]
+
+
+def test_update_fields():
+    es = get_es()
+    es.update.return_value = {"_id": "did1"}
+    es_instance = get_es_instance(es)
+    writer = BulkWriter(es, max_actions=10, flush_interval=60)
+
+    assert es_instance.update_fields("did1", {"nft.owner": "0x01"}) == "did1"
+    kwargs = es.update.call_args.kwargs
+    assert kwargs["id"] == "did1"
+    assert kwargs["script"]["params"] == {"fields": {"nft.owner": "0x01"}}
+    assert kwargs["if_seq_no"] is None
+
+    with writer.source("event"):
+        es_instance.update_fields(
+            "did1", {"stats.orders": 2}, if_seq_no=5, if_primary_term=1
+        )
+    writer.commit()
+    action, body = es.bulk.call_args.kwargs["operations"]
+    assert action == {
+        "update": {
+            "_index": "oceandb",
+            "_id": "did1",
+            "if_seq_no": 5,
+            "if_primary_term": 1,
+        }
+    }
+    assert body["script"]["params"] == {"fields": {"stats.orders": 2}}
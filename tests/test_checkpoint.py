@@ -0,0 +1,98 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from unittest.mock import Mock
+
+import elasticsearch
+import pytest
+
+from aquarius.events.checkpoint import Checkpoint
+
+
+def get_es_instance(last_block=None):
+    es_instance = Mock()
+    if last_block is None:
+        es_instance.es.get.side_effect = elasticsearch.NotFoundError(
+            "Not found", meta=Mock(status=404), body={}
+        )
+    else:
+        es_instance.es.get.return_value = {
+            "_source": {"last_block": last_block},
+            "_seq_no": 1,
+            "_primary_term": 1,
+        }
+    es_instance.es.index.return_value = {"_seq_no": 2, "_primary_term": 1}
+
+    return es_instance
+
+
+def test_checkpoint_write_through():
+    es_instance = get_es_instance(10)
+    checkpoint = Checkpoint(es_instance, "index", "doc", 0, 0)
+
+    assert checkpoint.load() == {"last_block": 10}
+    assert checkpoint.block == 10
+
+    checkpoint.update(20, {"last_block": 20})
+    es_instance.es.index.assert_called_once_with(
+        index="index",
+        id="doc",
+        body={"last_block": 20},
+        if_seq_no=1,
+        if_primary_term=1,
+    )
+    # nothing pending
+    checkpoint.flush()
+    assert es_instance.es.index.call_count == 1
+    assert es_instance.es.get.call_count == 1
+
+
+def test_checkpoint_create():
+    es_instance = get_es_instance()
+    checkpoint = Checkpoint(es_instance, "index", "doc", 0, 0)
+
+    with pytest.raises(elasticsearch.NotFoundError):
+        checkpoint.load()
+
+    checkpoint.update(20, {"last_block": 20})
+    assert es_instance.es.index.call_args.kwargs["op_type"] == "create"
+
+
+def test_checkpoint_coalesced_writes():
+    es_instance = get_es_instance(10)
+    checkpoint = Checkpoint(es_instance, "index", "doc", 0, 100)
+    checkpoint.load()
+
+    for block in range(11, 110):
+        checkpoint.update(block, {"last_block": block})
+    assert es_instance.es.index.call_count == 0
+    assert checkpoint.block == 109
+
+    checkpoint.update(110, {"last_block": 110})
+    assert es_instance.es.index.call_count == 1
+
+    checkpoint.update(111, {"last_block": 111})
+    checkpoint.flush()
+    assert es_instance.es.index.call_count == 2
+    assert es_instance.es.index.call_args.kwargs["body"] == {"last_block": 111}
+
+
+def test_checkpoint_conflict():
+    es_instance = get_es_instance(10)
+    checkpoint = Checkpoint(es_instance, "index", "doc", 0, 0)
+    checkpoint.load()
+
+    # eg: force_set_block was used
+    es_instance.es.index.side_effect = elasticsearch.ConflictError(
+        "Conflict", meta=Mock(status=409), body={}
+    )
+    es_instance.es.get.return_value = {
+        "_source": {"last_block": 5},
+        "_seq_no": 3,
+        "_primary_term": 1,
+    }
+    checkpoint.update(20, {"last_block": 20})
+
+    assert checkpoint.block == 5
+    assert es_instance.es.get.call_count == 2
@@ -0,0 +1,59 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from aquarius.events.chunk_sizer import AdaptiveChunkSizer
+
+
+def test_chunk_size_shrinks_on_failure():
+    sizer = AdaptiveChunkSizer(1000)
+    assert sizer.size == 1000
+
+    sizer.on_failure(1000)
+    assert sizer.size == 500
+    # failed on a shorter chunk
+    sizer.on_failure(100)
+    assert sizer.size == 50
+
+    for _ in range(20):
+        sizer.on_failure(sizer.size)
+    assert sizer.size == 1
+
+
+def test_chunk_size_grows_on_success():
+    sizer = AdaptiveChunkSizer(100, max_size=1000, max_logs=5000)
+    assert sizer.step == 50
+
+    sizer.on_success(100, 10)
+    assert sizer.size == 150
+    # short chunk (eg: close to the chain head), no information about bigger chunks
+    sizer.on_success(20, 10)
+    assert sizer.size == 150
+
+    for _ in range(100):
+        sizer.on_success(sizer.size, 0)
+    assert sizer.size == 1000
+
+
+def test_chunk_size_follows_log_density():
+    sizer = AdaptiveChunkSizer(1000, max_logs=5000)
+
+    # 10 logs per block
+    sizer.on_success(1000, 10000)
+    assert sizer.size == 500
+    # do not grow past the expected max_logs
+    sizer.on_success(500, 5000)
+    assert sizer.size == 500
+    sizer.on_success(500, 1000)
+    assert sizer.size == 550
+
+
+def test_copy_is_independent():
+    sizer = AdaptiveChunkSizer(1000, max_size=2000, max_logs=100)
+    sizer.on_failure(1000)
+    copy = sizer.copy()
+    assert (copy.size, copy.max_size, copy.max_logs) == (500, 2000, 100)
+
+    copy.on_failure(500)
+    assert copy.size == 250
+    assert sizer.size == 500
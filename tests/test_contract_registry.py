@@ -0,0 +1,60 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import pytest
+from web3 import Web3
+
+from aquarius.events.constants import EventTypes
+from aquarius.events.contract_registry import ContractRegistry
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+
+
+def test_definition_and_factory_cached():
+    registry = ContractRegistry()
+    web3 = Web3()
+
+    definition = registry.get_definition("ERC721Template")
+    assert "abi" in definition
+    assert registry.get_definition("ERC721Template") is definition
+
+    factory = registry.get_factory(web3, "ERC721Template")
+    assert registry.get_factory(web3, "ERC721Template") is factory
+    # factories are per web3 instance
+    assert registry.get_factory(Web3(), "ERC721Template") is not factory
+
+    with pytest.raises(TypeError):
+        registry.get_definition("NotAContract")
+
+
+def test_bound_contracts():
+    registry = ContractRegistry(bound_contracts_size=1)
+    web3 = Web3()
+
+    contract = registry.get_contract(web3, "ERC20Template", ADDRESS)
+    assert contract.address == Web3.to_checksum_address(ADDRESS)
+    assert registry.get_contract(web3, "ERC20Template", ADDRESS) is contract
+
+    other = registry.get_contract(web3, "ERC20Template", ADDRESS[:-1] + "2")
+    assert other.address != contract.address
+    # evicted, bound again
+    assert registry.get_contract(web3, "ERC20Template", ADDRESS) is not contract
+
+
+def test_event_decoders():
+    registry = ContractRegistry()
+    web3 = Web3()
+
+    decoders = registry.get_event_decoders(web3, "ERC721Template")
+    event = registry.get_event(web3, "ERC721Template", "MetadataCreated")
+    topic = next(
+        topic
+        for topic, value in EventTypes.hashes.items()
+        if value["type"] == EventTypes.EVENT_METADATA_CREATED
+    )
+    assert decoders[topic] is event
+    assert registry.get_event(web3, "ERC721Template", "MetadataCreated") is event
+
+    with pytest.raises(KeyError):
+        registry.get_event(web3, "ERC721Template", "NotAnEvent")
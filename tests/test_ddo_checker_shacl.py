@@ -7,6 +7,7 @@ import json
 import logging
 from pathlib import Path
 import pkg_resources
+from unittest.mock import patch
 
 from pyshacl import validate
 import pytest
@@ -14,7 +15,12 @@ import rdflib
 
 from aquarius.ddo_checker.shacl_checker import (
     validate_dict,
+    get_shapes_graph,
     parse_report_to_errors,
+    preload_shapes_graphs,
+    validate_native,
+    validate_shacl,
+    ALLOWED_VERSIONS,
     CURRENT_VERSION,
 )
 from tests.ddos.ddo_sample1_v4 import json_dict
@@ -222,3 +228,97 @@ def test_remote_ddo_without_service():
         _copy["nftAddress"],
     )
     assert valid
+
+
+def test_shapes_graph_is_cached():
+    preload_shapes_graphs()
+    for version in ALLOWED_VERSIONS:
+        assert get_shapes_graph(version) is get_shapes_graph(version)
+        assert len(get_shapes_graph(version)) > 0
+
+    # the same graph is used by all validations, and is not changed by them
+    shapes_graph = get_shapes_graph(CURRENT_VERSION)
+    triples = len(shapes_graph)
+    _copy = copy.deepcopy(json_dict)
+    _copy["metadata"].pop("name")
+    valid, errors = validate_dict(_copy, json_dict["chainId"], json_dict["nftAddress"])
+    assert not valid
+    assert "metadata" in errors
+    valid, _ = validate_dict(json_dict, json_dict["chainId"], json_dict["nftAddress"])
+    assert valid
+    assert len(get_shapes_graph(CURRENT_VERSION)) == triples
+
+
+def get_mutations(ddo):
+    """Yields copies of a DDO with one value replaced or removed."""
+    values = [None, 0, 3.5, True, "", "a\nbcdefghijk", "a" * 300, [], ["x", "y"], {}]
+
+    def get_paths(value, path=()):
+        items = value.items() if isinstance(value, dict) else enumerate(value)
+        for key, item in items:
+            yield path + (key,)
+            if isinstance(item, (dict, list)):
+                yield from get_paths(item, path + (key,))
+
+    for path in get_paths(ddo):
+        if path == ("version",):
+            continue
+        for value in ["removed"] + values:
+            _copy = copy.deepcopy(ddo)
+            parent = _copy
+            for key in path[:-1]:
+                parent = parent[key]
+            if value == "removed":
+                parent.pop(path[-1])
+            else:
+                parent[path[-1]] = value
+            yield _copy
+
+
+@pytest.mark.parametrize("version", ALLOWED_VERSIONS)
+@pytest.mark.parametrize("ddo", [json_dict, algorithm_ddo_sample])
+def test_native_validator_matches_shacl(ddo, version):
+    # differential check: both validators must agree on conformance and error keys
+    for mutation in get_mutations(ddo):
+        native_result = validate_native(mutation, version)
+        if native_result is None:
+            continue
+        conforms, errors = validate_shacl(mutation, version)
+        assert native_result[0] == conforms, mutation
+        assert set(native_result[1]) == set(errors), mutation
+
+
+def test_native_validator_unsupported_ddo():
+    _copy = copy.deepcopy(json_dict)
+    _copy["metadata"]["additionalInformation"] = {"@type": "Service"}
+    assert validate_native(_copy, CURRENT_VERSION) is None
+
+    # pyshacl validates the node as a Service
+    valid, errors = validate_dict(_copy, json_dict["chainId"], json_dict["nftAddress"])
+    assert not valid
+    assert "serviceEndpoint" in errors
+
+
+def test_differential_validator(monkeypatch, caplog):
+    monkeypatch.setenv("VALIDATION_CACHE_SIZE", "0")
+    monkeypatch.setenv("DDO_VALIDATOR", "differential")
+    with patch(
+        "aquarius.ddo_checker.shacl_checker.validate_native",
+        return_value=(False, {"id": "wrong"}),
+    ):
+        valid, errors = validate_dict(
+            json_dict, json_dict["chainId"], json_dict["nftAddress"]
+        )
+
+    # the pyshacl result is returned, and the mismatch is logged
+    assert valid
+    assert not errors
+    assert "Native and SHACL validation differ" in caplog.text
+
+    monkeypatch.setenv("DDO_VALIDATOR", "shacl")
+    with patch("aquarius.ddo_checker.shacl_checker.validate_native") as mock:
+        valid, _ = validate_dict(
+            json_dict, json_dict["chainId"], json_dict["nftAddress"]
+        )
+    assert valid
+    assert mock.call_count == 0
@@ -0,0 +1,115 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+from hashlib import sha256
+from unittest.mock import Mock, patch
+
+import elasticsearch
+from requests.models import Response
+
+from aquarius.events.decrypted_ddo_cache import (
+    DecryptedDdoCache,
+    get_decrypted_ddo_cache,
+)
+from aquarius.events.decryptor import decrypt_ddo
+
+
+def get_es_instance():
+    docs = {}
+    es_instance = Mock()
+    es_instance.db_index = "aquarius"
+
+    def get(index, id):
+        if id not in docs:
+            raise elasticsearch.NotFoundError(
+                "Not found", meta=Mock(status=404), body={}
+            )
+        return {"_source": docs[id]}
+
+    def index(index, id, body):
+        docs[id] = dict(body)
+
+    def update(index, id, doc):
+        docs[id].update(doc)
+
+    def delete(index, id):
+        docs.pop(id)
+
+    def search(index, size, sort, source):
+        ids = sorted(docs, key=lambda doc_id: docs[doc_id]["last_used"])[:size]
+        return {"hits": {"hits": [{"_id": doc_id} for doc_id in ids]}}
+
+    def delete_by_query(index, query):
+        for doc_id in query["ids"]["values"]:
+            docs.pop(doc_id)
+
+    es_instance.es.get.side_effect = get
+    es_instance.es.index.side_effect = index
+    es_instance.es.update.side_effect = update
+    es_instance.es.delete.side_effect = delete
+    es_instance.es.count.side_effect = lambda index: {"count": len(docs)}
+    es_instance.es.search.side_effect = search
+    es_instance.es.delete_by_query.side_effect = delete_by_query
+
+    return es_instance, docs
+
+
+def test_get_and_put():
+    es_instance, docs = get_es_instance()
+    cache = DecryptedDdoCache(es_instance, 10)
+    content = json.dumps({"id": "did:op:123"})
+    content_hash = sha256(content.encode("utf-8")).hexdigest()
+
+    assert cache.get(content_hash) is None
+    cache.put(content_hash, content)
+    assert cache.get(content_hash) == content
+    assert cache.get_stats() == {"hits": 1, "misses": 1}
+
+    # entries not matching their hash are dropped
+    docs[content_hash]["content"] = json.dumps({"id": "did:op:456"})
+    assert cache.get(content_hash) is None
+    assert content_hash not in docs
+
+
+def test_eviction():
+    es_instance, docs = get_es_instance()
+    cache = DecryptedDdoCache(es_instance, 3)
+    cache.EVICTION_INTERVAL = 1
+    for i in range(5):
+        content = json.dumps({"id": i})
+        content_hash = sha256(content.encode("utf-8")).hexdigest()
+        with patch("time.time", return_value=i):
+            cache.put(content_hash, content)
+
+    assert len(docs) == 3
+    assert sorted(doc["last_used"] for doc in docs.values()) == [2, 3, 4]
+
+
+def test_get_decrypted_ddo_cache(monkeypatch):
+    es_instance, _ = get_es_instance()
+    assert get_decrypted_ddo_cache(None) is None
+    assert get_decrypted_ddo_cache(es_instance) is get_decrypted_ddo_cache(es_instance)
+
+    monkeypatch.setenv("DECRYPTED_DDO_CACHE_SIZE", "0")
+    assert get_decrypted_ddo_cache(es_instance) is None
+
+
+def test_decrypt_ddo_uses_cache():
+    es_instance, docs = get_es_instance()
+    content = json.dumps({"id": "did:op:123"}).encode("utf-8")
+    metadata_hash = sha256(content).digest()
+
+    with patch("requests.Session.post") as mock, patch(
+        "aquarius.events.decryptor.get_aquarius_wallet"
+    ), patch("aquarius.events.decryptor.get_signature_bytes"):
+        the_response = Mock(spec=Response)
+        the_response.status_code = 201
+        the_response.content = content
+        mock.return_value = the_response
+
+        args = [None, "provider_url", None, 8996, "0x01", metadata_hash, es_instance]
+        assert decrypt_ddo(*args) == {"id": "did:op:123"}
+        assert decrypt_ddo(*args) == {"id": "did:op:123"}
+        assert mock.call_count == 1
@@ -2,11 +2,16 @@
 # Copyright 2023 Ocean Protocol Foundation
 # SPDX-License-Identifier: Apache-2.0
 #
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
+from elasticsearch.exceptions import ConflictError, NotFoundError
 
-from aquarius.app.es_instance import ElasticsearchInstance
+from aquarius.app.es_instance import (
+    ElasticsearchInstance,
+    get_write_conditions,
+    retry_on_conflict,
+)
 from aquarius.myapp import app
 
 es_instance = ElasticsearchInstance()
@@ -25,6 +30,17 @@ def test_write_duplicate():
             mock.return_value = True
             es_instance.write({}, "not_none")
 
+    # created by another writer after the exists check
+    with patch("elasticsearch.Elasticsearch.exists", return_value=False), patch(
+        "elasticsearch.Elasticsearch.index"
+    ) as mock:
+        mock.side_effect = ConflictError(
+            "version_conflict_engine_exception", meta=Mock(status=409), body={}
+        )
+        with pytest.raises(ValueError):
+            es_instance.write({}, "not_none")
+        assert mock.call_args.kwargs["op_type"] == "create"
+
 
 def test_delete():
     with patch("elasticsearch.Elasticsearch.delete_by_query") as mock:
@@ -77,3 +93,82 @@ def test_is_listed():
 
     mock_asset = {"status": {"isListed": False}}
     assert es_instance.is_listed(mock_asset) is False
+
+
+def test_update_fields():
+    did = "did:op:test_update_fields"
+    es_instance.update(
+        {
+            "id": did,
+            "nft": {"owner": "0x01", "state": 0},
+            "stats": {"orders": 1, "price": {"value": 1, "tokenAddress": "0x02"}},
+        },
+        did,
+    )
+    try:
+        es_instance.update_fields(
+            did,
+            {"nft.owner": "0x03", "stats.price": {"value": 2}, "purgatory.state": True},
+        )
+        asset = es_instance.read(did)
+        assert asset["nft"] == {"owner": "0x03", "state": 0}
+        assert asset["stats"] == {"orders": 1, "price": {"value": 2}}
+        assert asset["purgatory"] == {"state": True}
+        assert es_instance.read(did, fields=["nft"]) == {"nft": asset["nft"]}
+    finally:
+        es_instance.delete(did)
+
+    with pytest.raises(NotFoundError):
+        es_instance.update_fields(did, {"nft.owner": "0x03"})
+
+
+def test_update_fields_if_newer():
+    did = "did:op:test_update_fields_if_newer"
+    es_instance.update({"id": did, "nft": {"tokenURI": "uri0"}}, did)
+    try:
+        for uri, block in [("uri2", 200), ("uri1", 100)]:
+            es_instance.update_fields(
+                did,
+                {"nft.tokenURI": uri},
+                block_field="nft.tokenURIBlock",
+                block=block,
+            )
+        # the older event, applied last, is ignored
+        assert es_instance.read(did)["nft"] == {
+            "tokenURI": "uri2",
+            "tokenURIBlock": 200,
+        }
+    finally:
+        es_instance.delete(did)
+
+
+def test_read_returns_version():
+    with patch("elasticsearch.Elasticsearch.get") as mock:
+        mock.return_value = {
+            "_source": {"id": "did1"},
+            "_seq_no": 7,
+            "_primary_term": 2,
+        }
+        document = es_instance.read("did1")
+
+    assert document == {"id": "did1"}
+    assert get_write_conditions(document) == {"if_seq_no": 7, "if_primary_term": 2}
+    assert get_write_conditions({"id": "did1"}) == {}
+
+    with patch("elasticsearch.Elasticsearch.index") as mock:
+        es_instance.update(document, "did1", **get_write_conditions(document))
+        assert mock.call_args.kwargs["if_seq_no"] == 7
+        assert mock.call_args.kwargs["if_primary_term"] == 2
+
+
+def test_retry_on_conflict():
+    conflict = ConflictError("Conflict", meta=Mock(status=409), body={})
+    fn = Mock(side_effect=[conflict, conflict, "did1"])
+    assert retry_on_conflict(fn, "arg", key="value") == "did1"
+    assert fn.call_count == 3
+    fn.assert_called_with("arg", key="value")
+
+    fn = Mock(side_effect=conflict)
+    with pytest.raises(ConflictError):
+        retry_on_conflict(fn, retries=1)
+    assert fn.call_count == 2
@@ -8,7 +8,7 @@ import os
 import threading
 import time
 from datetime import timedelta
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from eth_utils.address import to_checksum_address
 
 import elasticsearch
@@ -20,6 +20,7 @@ from web3.main import Web3
 
 from aquarius.app.util import get_aquarius_wallet, get_did_state
 from aquarius.config import get_version
+from aquarius.events.chunk_sizer import AdaptiveChunkSizer
 from aquarius.events.constants import AquariusCustomDDOFields, MetadataStates
 from aquarius.events.events_monitor import EventsMonitor
 from aquarius.events.util import (
@@ -170,6 +171,25 @@ def test_events_monitor_object(monkeypatch):
         mock.assert_called_once()
 
 
+def test_events_monitor_clean_start(monkeypatch):
+    monkeypatch.setenv("EVENTS_CLEAN_START", "1")
+    monkeypatch.setenv("METADATA_CONTRACT_BLOCK", "100")
+    es_instance = Mock(db_index="aquarius")
+    es_instance.es.get.side_effect = elasticsearch.NotFoundError(
+        "Not found", meta=Mock(status=404), body={}
+    )
+    es_instance.es.index.return_value = {"_id": "id", "_seq_no": 1, "_primary_term": 1}
+    es_instance.es.search.return_value = {"hits": {"total": {"value": 0}, "hits": []}}
+    web3 = Mock()
+    web3.eth.chain_id = 8996
+
+    # the stored block is before the start block, the chain is reset to the start block
+    with patch.object(EventsMonitor, "get_last_processed_block", return_value=5):
+        monitor = EventsMonitor(web3, es_instance=es_instance, rpc="http://rpc")
+
+    assert monitor.get_cached_last_block() == 100
+
+
 def test_start_stop_events_monitor():
     monitor = EventsMonitor(setup_web3())
 
@@ -213,6 +233,26 @@ def test_process_block_range(client, base_ddo_url, events_object):
         assert events_object.process_current_blocks() is None
 
 
+def test_process_block_range_adapts_chunk_size(events_object):
+    def get_logs(from_block, to_block):
+        if to_block - from_block + 1 > 10:
+            raise Exception("query returned more than 10000 results")
+        return []
+
+    events_object._chunk_sizer = AdaptiveChunkSizer(100)
+    with patch.object(events_object, "get_logs", side_effect=get_logs), patch.object(
+        events_object, "process_logs_and_store_block"
+    ) as mock:
+        events_object.process_block_range(1, 100)
+
+    processed = [call.args[1:3] for call in mock.call_args_list]
+    assert processed[0][0] == 1 and processed[-1][1] == 100
+    for (_, previous_end), (start, _) in zip(processed, processed[1:]):
+        assert start == previous_end + 1
+    # stays close to what the RPC accepts, instead of starting again from 100
+    assert events_object._chunk_sizer.size < 20
+
+
 def test_elasticsearch_connection(events_object, caplog):
     with patch("elasticsearch.Elasticsearch.ping") as es_mock:
         es_mock.return_value = True
@@ -0,0 +1,87 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import asyncio
+import json
+import threading
+
+import pytest
+import websockets
+
+from aquarius.events.head_follower import HeadFollower
+
+
+def test_subscribe_request():
+    follower = HeadFollower("ws://localhost", "logs", ["0x01"])
+    assert follower.get_subscribe_request()["params"] == [
+        "logs",
+        {"topics": [["0x01"]]},
+    ]
+    assert HeadFollower("ws://localhost").get_subscribe_request()["params"] == [
+        "newHeads"
+    ]
+
+    with pytest.raises(ValueError):
+        HeadFollower("ws://localhost", "pendingTransactions")
+
+
+def test_handle_message():
+    follower = HeadFollower("ws://localhost")
+    assert not follower.handle_message(json.dumps({"id": 1, "result": "0xabc"}))
+    assert not follower.new_blocks.is_set()
+
+    notification = {
+        "jsonrpc": "2.0",
+        "method": "eth_subscription",
+        "params": {"subscription": "0xabc", "result": {"number": "0x10"}},
+    }
+    assert follower.handle_message(json.dumps(notification))
+    assert follower.latest_block == 16
+    assert follower.wait(0)
+    assert not follower.wait(0)
+
+    with pytest.raises(Exception):
+        follower.handle_message(json.dumps({"id": 1, "error": {"message": "no"}}))
+
+
+def test_follow_new_heads():
+    subscribed = []
+    ready = threading.Event()
+    server_info = {}
+
+    async def handler(ws, *args):
+        subscribed.append(json.loads(await ws.recv()))
+        await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "result": "0xabc"}))
+        await ws.send(
+            json.dumps(
+                {
+                    "jsonrpc": "2.0",
+                    "method": "eth_subscription",
+                    "params": {"subscription": "0xabc", "result": {"number": "0x2a"}},
+                }
+            )
+        )
+        await asyncio.sleep(2)
+
+    async def serve():
+        async with websockets.serve(handler, "localhost", 0) as server:
+            server_info["port"] = list(server.sockets)[0].getsockname()[1]
+            ready.set()
+            await asyncio.sleep(3)
+
+    server_thread = threading.Thread(target=lambda: asyncio.run(serve()), daemon=True)
+    server_thread.start()
+    assert ready.wait(5)
+
+    follower = HeadFollower(f"ws://localhost:{server_info['port']}")
+    follower.start()
+    try:
+        for _ in range(3):
+            follower.wait(1)
+            if follower.latest_block:
+                break
+        assert follower.latest_block == 42
+        assert subscribed[0]["method"] == "eth_subscribe"
+    finally:
+        follower.stop()
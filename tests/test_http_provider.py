@@ -0,0 +1,107 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import json
+from unittest.mock import Mock, patch
+
+from requests.exceptions import HTTPError
+from web3 import Web3
+
+from aquarius.events.http_provider import (
+    CustomHTTPProvider,
+    batch_request,
+    is_batching_enabled,
+)
+
+
+def rpc_server(batch_supported=True, status=405):
+    """Returns a fake make_post_request answering eth_blockNumber calls and recording requests.
+    If batches are not supported, they are answered with an HTTP error status."""
+    requests = []
+
+    def answer(payload):
+        return {"jsonrpc": "2.0", "id": payload["id"], "result": hex(payload["id"])}
+
+    def post(endpoint_uri, data, *args, **kwargs):
+        payload = json.loads(data)
+        requests.append(payload)
+        if isinstance(payload, list):
+            if not batch_supported:
+                raise HTTPError(f"{status} Error", response=Mock(status_code=status))
+            # answer in reverse order, responses are matched by id
+            return json.dumps([answer(p) for p in reversed(payload)]).encode()
+        return json.dumps(answer(payload)).encode()
+
+    return post, requests
+
+
+def test_batch_request(monkeypatch):
+    monkeypatch.setenv("EVENTS_RPC_BATCH_SIZE", "2")
+    web3 = Web3(CustomHTTPProvider("http://rpc"))
+    post, requests = rpc_server()
+    with patch("aquarius.events.http_provider.make_post_request", side_effect=post):
+        results = batch_request(web3, [("eth_blockNumber", [])] * 3)
+
+    # 3 calls with batch size 2 need 2 http requests
+    assert len(requests) == 2
+    assert isinstance(requests[0], list) and len(requests[0]) == 2
+    ids = [p["id"] for p in requests[0]] + [requests[1][0]["id"]]
+    assert results == ids
+
+
+def test_batch_request_fallback(monkeypatch):
+    monkeypatch.setenv("EVENTS_RPC_BATCH_SIZE", "10")
+    provider = CustomHTTPProvider("http://rpc")
+    web3 = Web3(provider)
+    post, requests = rpc_server(batch_supported=False)
+    with patch("aquarius.events.http_provider.make_post_request", side_effect=post):
+        results = batch_request(web3, [("eth_blockNumber", [])] * 3)
+        assert provider.batch_supported is False
+        assert len(results) == 3
+        assert len(requests) == 4
+
+        # once rejected, calls are sent one by one
+        batch_request(web3, [("eth_blockNumber", [])] * 2)
+        assert len(requests) == 6
+
+
+def test_batch_request_transient_error(monkeypatch):
+    monkeypatch.setenv("EVENTS_RPC_BATCH_SIZE", "10")
+    provider = CustomHTTPProvider("http://rpc")
+    web3 = Web3(provider)
+    for status in [429, 503]:
+        post, requests = rpc_server(batch_supported=False, status=status)
+        with patch("aquarius.events.http_provider.make_post_request", side_effect=post):
+            results = batch_request(web3, [("eth_blockNumber", [])] * 3)
+
+        # the failed batch is sent as single calls, later ones are still batched
+        assert len(results) == 3
+        assert len(requests) == 4
+        assert provider.batch_supported is True
+
+
+def test_batch_request_disabled(monkeypatch):
+    monkeypatch.delenv("EVENTS_RPC_BATCH_SIZE", raising=False)
+    web3 = Web3(CustomHTTPProvider("http://rpc"))
+    post, requests = rpc_server()
+    with patch("aquarius.events.http_provider.make_post_request", side_effect=post):
+        results = batch_request(web3, [("eth_blockNumber", [])] * 2)
+
+    assert len(requests) == 2
+    assert all(isinstance(r, int) for r in results)
+
+
+def test_batch_request_with_own_batch_size(monkeypatch):
+    monkeypatch.delenv("EVENTS_RPC_BATCH_SIZE", raising=False)
+    web3 = Web3(CustomHTTPProvider("http://rpc"))
+    assert not is_batching_enabled(web3)
+    assert is_batching_enabled(web3, 10)
+
+    post, requests = rpc_server()
+    with patch("aquarius.events.http_provider.make_post_request", side_effect=post):
+        results = batch_request(web3, [("eth_blockNumber", [])] * 3, 10)
+
+    # batched even if EVENTS_RPC_BATCH_SIZE is 0
+    assert len(requests) == 1
+    assert len(results) == 3
@@ -0,0 +1,103 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import os
+
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from aquarius.events.log_archive import INDEX_ENTRY, LogArchive, get_log_archive
+
+
+def get_log(block, tx):
+    return AttributeDict(
+        {
+            "address": "0x2cd82B786608998a331FF1aaE67B4b38d804635b",
+            "blockHash": HexBytes(block.to_bytes(32, "big")),
+            "blockNumber": block,
+            "data": HexBytes("0x1234"),
+            "logIndex": 0,
+            "topics": [HexBytes(b"\x01" * 32), HexBytes(b"\x02" * 32)],
+            "transactionHash": HexBytes(tx.to_bytes(32, "big")),
+            "transactionIndex": 0,
+        }
+    )
+
+
+def get_receipt(log):
+    return AttributeDict(
+        {
+            "transactionHash": log.transactionHash,
+            "blockNumber": log.blockNumber,
+            "from": "0xe2DD09d719Da89e5a3D0F2549c7E24566e947260",
+            "status": 1,
+            "logs": [log],
+        }
+    )
+
+
+def test_append_and_read(tmp_path):
+    archive = LogArchive(str(tmp_path), segment_blocks=100)
+    logs = [get_log(10, 1), get_log(15, 2), get_log(120, 3)]
+    receipts = {log.transactionHash.hex(): get_receipt(log) for log in logs[:2]}
+
+    # crosses a segment boundary
+    archive.append(1, 150, logs, receipts)
+    assert archive.read_index(0)[0][:2] == (1, 99)
+    assert archive.read_index(1)[0][:2] == (100, 150)
+
+    read_logs, read_receipts = archive.read(1, 150)
+    assert read_logs == logs
+    assert read_receipts == receipts
+
+    read_logs, read_receipts = archive.read(12, 130)
+    assert read_logs == logs[1:]
+    tx = logs[1].transactionHash.hex()
+    assert read_receipts[tx]["logs"][0].topics == logs[1].topics
+    assert read_receipts[tx]["from"] == receipts[tx]["from"]
+
+
+def test_read_needs_all_blocks(tmp_path):
+    archive = LogArchive(str(tmp_path), segment_blocks=100)
+    archive.append(1, 20, [get_log(10, 1)], {})
+    archive.append(31, 40, [], {})
+
+    assert archive.read(5, 20)[0] == [get_log(10, 1)]
+    assert archive.read(5, 35) is None
+    assert archive.read(15, 25) is None
+    assert archive.read(150, 160) is None
+
+    # append only, gaps are not filled afterwards
+    archive.append(21, 30, [get_log(25, 2)], {})
+    assert archive.read(21, 30) is None
+    assert archive.read(31, 40) == ([], {})
+
+
+def test_append_skips_archived_blocks(tmp_path):
+    archive = LogArchive(str(tmp_path), segment_blocks=100)
+    archive.append(1, 20, [get_log(10, 1)], {})
+    archive.append(11, 30, [get_log(12, 2)], {})
+    archive.append(1, 20, [get_log(10, 1)], {})
+    assert [entry[:2] for entry in archive.read_index(0)] == [(1, 20)]
+
+    # partial index entry, eg: after a crash
+    _, index_path = archive.get_segment_paths(0)
+    with open(index_path, "ab") as f:
+        f.write(b"\x00" * (INDEX_ENTRY.size // 2))
+    assert archive.read(1, 20)[0] == [get_log(10, 1)]
+
+    archive.append(21, 30, [], {})
+    assert os.path.getsize(index_path) == 2 * INDEX_ENTRY.size
+    assert archive.read(1, 30) is not None
+
+
+def test_get_log_archive(tmp_path, monkeypatch):
+    monkeypatch.delenv("EVENTS_ARCHIVE_PATH", raising=False)
+    assert get_log_archive(8996) is None
+
+    monkeypatch.setenv("EVENTS_ARCHIVE_PATH", str(tmp_path))
+    monkeypatch.setenv("EVENTS_ARCHIVE_REPLAY", "1")
+    archive = get_log_archive(8996)
+    assert archive.path == os.path.join(str(tmp_path), "8996")
+    assert archive.replay
@@ -0,0 +1,34 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from aquarius.events.log_prefetcher import LogPrefetcher
+
+
+def test_prefetcher_keeps_chunks_order():
+    def fetch_logs(from_block, to_block):
+        if from_block == 20:
+            raise Exception("Boom!")
+        return [from_block, to_block]
+
+    chunks = [(0, 9), (10, 19), (20, 29), (30, 39)]
+    prefetcher = LogPrefetcher(fetch_logs, chunks, 2)
+    prefetcher.start()
+    results = list(prefetcher)
+    prefetcher.stop()
+
+    assert [(r[0], r[1]) for r in results] == chunks
+    assert results[0][2] == [0, 9]
+    assert results[2][2] is None
+    assert str(results[2][3]) == "Boom!"
+    assert prefetcher.queue_size() == 0
+
+
+def test_prefetcher_stop():
+    prefetcher = LogPrefetcher(lambda f, t: [], [(i, i) for i in range(100)], 1)
+    prefetcher.start()
+    for item in prefetcher:
+        prefetcher.stop()
+        break
+
+    assert list(prefetcher) == []
@@ -0,0 +1,84 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from threading import Event
+from unittest.mock import Mock
+
+import pytest
+
+from aquarius.events.multi_chain_monitor import MultiChainEventsMonitor, get_events_rpcs
+
+
+class FakeMonitor:
+    def __init__(self, chain_id, head, last_block, chunk_size=10):
+        self._chain_id = chain_id
+        self.head = head
+        self.last_block = last_block
+        self.chunk_size = chunk_size
+        self.turns = []
+
+    def process_current_blocks(self, max_chunks=None):
+        self.turns.append(max_chunks)
+        self.last_block = min(self.head, self.last_block + max_chunks * self.chunk_size)
+
+    def get_lag(self):
+        return {
+            "chain_id": self._chain_id,
+            "last_block": self.last_block,
+            "lag": self.head - self.last_block,
+        }
+
+
+def get_multi_chain_monitor(monitors, chunks_per_turn=1):
+    multi_monitor = MultiChainEventsMonitor.__new__(MultiChainEventsMonitor)
+    multi_monitor.monitors = monitors
+    multi_monitor._chunks_per_turn = chunks_per_turn
+    multi_monitor._new_blocks = Event()
+    multi_monitor._monitor_sleep_time = 0
+
+    return multi_monitor
+
+
+def test_get_events_rpcs(monkeypatch):
+    monkeypatch.setenv("EVENTS_RPCS", '{"1": "http://a", "137": "http://b"}')
+    assert get_events_rpcs() == {1: "http://a", 137: "http://b"}
+
+    monkeypatch.setenv("EVENTS_RPCS", "http://a")
+    with pytest.raises(AssertionError):
+        get_events_rpcs()
+
+
+def test_round_robin_turns():
+    far_behind = FakeMonitor(1, head=1000, last_block=0)
+    up_to_date = FakeMonitor(137, head=100, last_block=90)
+    multi_monitor = get_multi_chain_monitor([far_behind, up_to_date], 2)
+
+    assert multi_monitor.process_turn()
+    assert far_behind.last_block == 20
+    assert up_to_date.last_block == 100
+    # every chain gets a turn, at most 2 chunks each
+    assert far_behind.turns == [2]
+    assert up_to_date.turns == [2]
+
+    while multi_monitor.process_turn():
+        pass
+    assert far_behind.last_block == 1000
+    assert len(up_to_date.turns) == len(far_behind.turns) == 50
+    assert [lag["lag"] for lag in multi_monitor.get_lag()] == [0, 0]
+
+
+def test_failing_chain_does_not_block_others():
+    failing = FakeMonitor(1, head=1000, last_block=0)
+    failing.process_current_blocks = Mock(side_effect=Exception("RPC down"))
+    # no progress, eg: the RPC does not return blocks
+    stuck = FakeMonitor(5, head=1000, last_block=0, chunk_size=0)
+    other = FakeMonitor(137, head=30, last_block=0)
+    multi_monitor = get_multi_chain_monitor([failing, stuck, other])
+
+    assert multi_monitor.process_turn()
+    assert other.last_block == 10
+    multi_monitor.process_turn()
+    # behind chains that do not make progress are not retried without waiting
+    assert not multi_monitor.process_turn()
+    assert other.last_block == 30
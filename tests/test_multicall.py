@@ -0,0 +1,70 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from unittest.mock import Mock, patch
+
+from web3 import Web3
+
+from aquarius.events.multicall import Multicall, get_multicall_address
+from aquarius.events.util import get_nft_contract
+
+NFT_ADDRESS = "0x0000000000000000000000000000000000000001"
+OWNER = "0x00000000000000000000000000000000000000aa"
+
+
+def test_get_multicall_address(monkeypatch):
+    monkeypatch.setenv("MULTICALL_ADDRESSES", '{"8996": "0x1"}')
+    assert get_multicall_address(8996) == "0x1"
+    assert get_multicall_address(137) is None
+
+    monkeypatch.setenv("MULTICALL_ADDRESSES", "not a json")
+    assert get_multicall_address(8996) is None
+
+
+def test_multicall_aggregate():
+    web3 = Web3()
+    nft = get_nft_contract(web3, NFT_ADDRESS)
+    multicall_contract = Mock()
+    multicall_contract.functions.aggregate3.return_value.call.return_value = [
+        (True, web3.codec.encode(["string"], ["NFT name"])),
+        (False, b""),
+        (True, web3.codec.encode(["address"], [OWNER])),
+        (True, b""),
+    ]
+
+    with patch(
+        "aquarius.events.multicall.get_multicall_contract",
+        return_value=multicall_contract,
+    ):
+        multicall = Multicall(web3, 8996, address=NFT_ADDRESS, max_calls=10)
+
+    assert multicall.add(nft, "name") == 0
+    multicall.add(nft, "symbol")
+    multicall.add(nft, "non_existent")
+    multicall.add(nft, "ownerOf", [1])
+    multicall.add(nft, "tokenURI", [1])
+
+    assert multicall.execute() == [
+        "NFT name",
+        "",
+        "",
+        Web3.to_checksum_address(OWNER),
+        "",
+    ]
+    # the read that cannot be encoded is not sent
+    requests = multicall_contract.functions.aggregate3.call_args[0][0]
+    assert len(requests) == 4
+    assert requests[0][0] == nft.address and requests[0][1] is True
+
+
+def test_multicall_fallback():
+    contract = Mock()
+    contract.caller.name.return_value = "Name"
+    contract.caller.symbol.side_effect = Exception("reverted")
+
+    multicall = Multicall(Mock(), 8996)
+    multicall.add(contract, "name")
+    multicall.add(contract, "symbol")
+
+    assert multicall.execute() == ["Name", ""]
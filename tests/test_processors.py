@@ -235,8 +235,7 @@ def test_order_started_processor():
     dt_address = deploy_datatoken(web3, test_account1, "TT1", "TT1Symbol")
 
     es_instance = Mock()
-    es_instance.read.return_value = {"sample_asset": "mock", "stats": {"orders": 0}}
-    es_instance.update.return_value = None
+    es_instance.read.return_value = {"stats": {"orders": 0, "allocated": 0}}
 
     price_json = {"value": 12.4, "tokenAddress": "test", "tokenSymbol": "test2"}
 
@@ -245,7 +244,13 @@ def test_order_started_processor():
         no_mock.return_value = 3, price_json
         updated_asset = processor.process()
 
-    assert es_instance.update.called_once()
+    es_instance.read.assert_called_once_with(processor.did, fields=["stats"])
+    es_instance.update_fields.assert_called_once_with(
+        processor.did,
+        {"stats.orders": 3, "stats.price": price_json},
+        block_field="stats.block",
+        block=0,
+    )
     assert updated_asset["stats"]["orders"] == 3
     assert updated_asset["stats"]["price"] == price_json
 
@@ -262,5 +267,5 @@ def test_order_started_processor_no_asset():
     processor = OrderStartedProcessor(dt_address, es_instance, 0, 0)
     updated_asset = processor.process()
 
-    assert not es_instance.update.called
+    assert not es_instance.update_fields.called
     assert updated_asset is None
@@ -0,0 +1,161 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from aquarius.events import provider_client
+from aquarius.events.provider_client import (
+    CircuitBreaker,
+    ProviderClient,
+    ProviderUnavailable,
+    get_provider_client,
+    get_providers_stats,
+)
+
+
+def test_get_provider_client():
+    client = get_provider_client("http://provider-test/")
+    assert client is get_provider_client("http://provider-test")
+    assert client.url == "http://provider-test"
+    assert "http://provider-test" in get_providers_stats()
+
+
+def test_provider_clients_are_bounded(monkeypatch):
+    monkeypatch.setattr(
+        provider_client,
+        "_clients",
+        provider_client.lru.LRU(2, callback=provider_client._close_client),
+    )
+    first = get_provider_client("http://provider-1")
+    get_provider_client("http://provider-2")
+    with patch.object(ProviderClient, "close") as close:
+        get_provider_client("http://provider-3")
+
+    close.assert_called_once_with()
+    assert set(get_providers_stats()) == {"http://provider-2", "http://provider-3"}
+    assert get_provider_client("http://provider-1") is not first
+
+
+def test_concurrency_limit():
+    client = ProviderClient("http://provider", max_concurrency=2)
+    lock = Lock()
+    running = {"now": 0, "max": 0}
+
+    def post(url, timeout, **kwargs):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+        return Mock(status_code=201, url=url)
+
+    with patch("requests.Session.post", side_effect=post):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(
+                executor.map(
+                    lambda _: client.post("/api/services/decrypt", timeout=4),
+                    range(8),
+                )
+            )
+
+    assert running["max"] == 2
+    assert responses[0].url == "http://provider/api/services/decrypt"
+    stats = client.get_stats()
+    assert stats["requests"] == 8
+    assert stats["errors"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["p50"] >= 0.05
+
+
+def test_rate_limit():
+    client = ProviderClient("http://provider", rate_limit=20)
+    with patch("requests.Session.post", return_value=Mock(status_code=201)):
+        start = time.monotonic()
+        for _ in range(5):
+            client.post("/", timeout=4)
+
+    # 5 requests at 20 per second, the first one is not delayed
+    assert time.monotonic() - start >= 0.19
+
+
+def test_errors_are_counted():
+    client = ProviderClient("http://provider")
+    with patch("requests.Session.post", side_effect=Exception("Boom!")):
+        with pytest.raises(Exception):
+            client.post("/", timeout=4)
+
+    assert client.get_stats()["errors"] == 1
+    # failed requests count for the latency at their elapsed time
+    assert client.get_latency_percentile(99) < 1
+
+    with patch("requests.Session.post", side_effect=requests.exceptions.ReadTimeout()):
+        with pytest.raises(requests.exceptions.Timeout):
+            client.post("/", timeout=4)
+
+    # timed out requests count at their timeout
+    assert client.get_stats()["errors"] == 2
+    assert client.get_latency_percentile(99) == 4
+
+
+def test_circuit_breaker():
+    client = ProviderClient("http://provider")
+    client.breaker = CircuitBreaker(client.url, failure_threshold=3, reset_timeout=60)
+
+    with patch("requests.Session.post", return_value=Mock(status_code=503)) as mock:
+        for _ in range(3):
+            client.post("/", timeout=4)
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        # fails fast, without calling the provider
+        with pytest.raises(ProviderUnavailable) as e:
+            client.post("/", timeout=4)
+        assert mock.call_count == 3
+        assert e.value.retry_at == pytest.approx(time.time() + 60, abs=1)
+
+    # half open: a single probe is sent
+    client.breaker.opened_at -= 60
+    with patch("requests.Session.post", return_value=Mock(status_code=503)):
+        client.post("/", timeout=4)
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    client.breaker.opened_at -= 60
+    client.breaker.before_request()
+    with pytest.raises(ProviderUnavailable) as e:
+        # the probe is still in flight
+        client.breaker.before_request()
+    # not a retry time in the past
+    assert e.value.retry_at == pytest.approx(time.time() + 60, abs=1)
+    client.breaker.on_success()
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+    # 4xx responses are not provider failures
+    with patch("requests.Session.post", return_value=Mock(status_code=403)):
+        for _ in range(5):
+            client.post("/", timeout=4)
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_adaptive_timeout(monkeypatch):
+    monkeypatch.setenv("PROVIDER_MIN_TIMEOUT", "0.5")
+    monkeypatch.setenv("PROVIDER_MAX_TIMEOUT", "4")
+    client = ProviderClient("http://provider")
+    assert client.get_timeout() == 4
+
+    with patch("requests.Session.post", return_value=Mock(status_code=201)) as mock:
+        for _ in range(ProviderClient.MIN_LATENCY_SAMPLES):
+            client.post("/")
+        assert mock.call_args.kwargs["timeout"] == 4
+        client.post("/")
+        # fast provider
+        assert mock.call_args.kwargs["timeout"] == 0.5
+
+    client._latencies.extend([3] * 10)
+    assert client.get_timeout() == 4
@@ -155,7 +155,7 @@ def test_purgatory_retrieve_account_list(events_object, monkeypatch):
 
 def test_failures(events_object):
     purgatory = Purgatory(events_object._es_instance)
-    with patch("aquarius.app.es_instance.ElasticsearchInstance.update") as mock:
+    with patch("aquarius.app.es_instance.ElasticsearchInstance.update_fields") as mock:
         mock.side_effect = Exception("Boom!")
         purgatory.update_asset_purgatory_status({"id": "id", "stats": {}})
 
@@ -0,0 +1,38 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+from unittest.mock import Mock
+
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from aquarius.events.receipts import ReceiptCache, group_logs_by_tx
+
+TX_1 = "0x89b2570f115111d7be90da06adb76e594509f41a305ee415d5fc5e0eccabd2da"
+TX_2 = "0x2c658f33d5fbd53689834831e1c2aedf04b649bca397a3c46d5c283e735dc019"
+
+
+def test_group_logs_by_tx():
+    logs = [
+        AttributeDict({"transactionHash": HexBytes(TX_1), "logIndex": 0}),
+        AttributeDict({"transactionHash": HexBytes(TX_2), "logIndex": 1}),
+        AttributeDict({"transactionHash": HexBytes(TX_1), "logIndex": 2}),
+    ]
+    grouped = group_logs_by_tx(logs)
+
+    assert list(grouped.keys()) == [TX_1, TX_2]
+    assert [log.logIndex for log in grouped[TX_1]] == [0, 2]
+
+
+def test_receipt_fetched_once():
+    web3 = Mock()
+    web3.eth.get_transaction_receipt.side_effect = lambda tx: {"tx": tx}
+    receipts = ReceiptCache(web3)
+
+    assert receipts.get(HexBytes(TX_1)) == {"tx": TX_1}
+    assert receipts.get(TX_1) == {"tx": TX_1}
+    assert receipts.get(TX_2) == {"tx": TX_2}
+
+    assert web3.eth.get_transaction_receipt.call_count == 2
+    assert receipts.get_stats() == {"fetched": 2, "saved": 1}
@@ -160,3 +160,24 @@ def test_retry_tx(client, base_ddo_url, events_object, monkeypatch):
     queue = events_object.retry_mechanism.get_all()
     # make sure that our tx is not in queue anymore
     assert len(queue) == 0
+
+
+def test_retry_at_given_time(events_object):
+    retry_mechanism = events_object.retry_mechanism
+    retry_mechanism.clear_all()
+    element = {
+        "type": "block",
+        "chain_id": retry_mechanism._chain_id,
+        "number_retries": 0,
+        "next_retry": 0,
+        "data": {"block": "1"},
+        "create_timestamp": int(datetime.now().timestamp()),
+    }
+    element["id"] = retry_mechanism.create_id(element)
+    # eg: when the provider circuit breaker lets requests through again
+    next_retry = int(time.time()) + 120
+    retry_mechanism.add_element_to_retry_queue(element, next_retry)
+
+    assert retry_mechanism.get_by_id(element["id"])["next_retry"] == next_retry
+    assert retry_mechanism.get_from_retry_queue() == []
+    retry_mechanism.clear_all()
@@ -20,6 +20,7 @@ from aquarius.app.util import (
     sanitize_query_result,
     get_aquarius_wallet,
     AquariusPrivateKeyException,
+    get_batch_items,
     get_signature_vrs,
 )
 from aquarius.block_utils import BlockProcessingClass
@@ -252,6 +253,32 @@ def test_wallet_missing(monkeypatch):
     }
 
 
+def test_wallet_is_loaded_once():
+    with patch("aquarius.app.util.Account.from_key", wraps=Account.from_key) as mock:
+        wallet = get_aquarius_wallet()
+        get_signature_vrs(b"{}")
+        get_signature_vrs(b"{}")
+        assert get_aquarius_wallet() is wallet
+    assert mock.call_count <= 1
+    assert wallet.address == Account.from_key(os.getenv("PRIVATE_KEY")).address
+
+
+def test_get_batch_items():
+    assert get_batch_items(b' [{"a": 1}, \n{"b": [1, 2]} ] ', "application/json") == [
+        b'{"a": 1}',
+        b'{"b": [1, 2]}',
+    ]
+    assert get_batch_items(b"[]", "application/json") == []
+    assert get_batch_items(b'{"a": 1}\r\n\n{"b": 2}\n', "application/x-ndjson") == [
+        b'{"a": 1}',
+        b'{"b": 2}',
+    ]
+
+    for payload in [b"", b"{}", b"[1 2]", b"[1,]", b"[1", b"[1] 2"]:
+        with pytest.raises(ValueError):
+            get_batch_items(payload, "application/json")
+
+
 def test_deploy_datatoken_fails():
     web3 = setup_web3()
     test_account1 = Account.from_key(os.environ.get("EVENTS_TESTS_PRIVATE_KEY", None))
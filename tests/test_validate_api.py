@@ -2,11 +2,14 @@
 # Copyright 2023 Ocean Protocol Foundation
 # SPDX-License-Identifier: Apache-2.0
 #
+import copy
 import json
 from requests.models import Response
 from unittest.mock import patch, Mock
 
+from aquarius.app.util import get_signature_vrs
 from aquarius.ddo_checker.shacl_checker import CURRENT_VERSION
+from aquarius.ddo_checker.validation_pool import ValidationPoolBusy
 from tests.ddos.ddo_sample1_v4 import json_dict
 from tests.helpers import run_request_octet, run_request
 
@@ -80,6 +83,22 @@ def test_validate_error(client, base_ddo_url, monkeypatch):
         assert data["error"] == "Encountered error when validating asset: Boom!."
 
 
+def test_validate_busy(client, base_ddo_url):
+    with patch("aquarius.app.assets.validate_dict") as mock:
+        mock.side_effect = ValidationPoolBusy("More than 65 validations are pending.")
+        rv = run_request_octet(
+            client.post,
+            base_ddo_url + "/validate",
+            data=json.dumps(
+                {"service": [], "test": "test", "version": CURRENT_VERSION}
+            ),
+        )
+        assert rv.status_code == 503
+        assert (
+            rv.get_json()["error"] == "Too many pending validations, try again later."
+        )
+
+
 def test_validate_error_remote(client, base_ddo_url, monkeypatch):
     rv = run_request_octet(
         client.post,
@@ -127,3 +146,66 @@ def test_validate_through_rbac(client, base_ddo_url, monkeypatch):
         data = rv.get_json()
         assert rv.status_code == 400
         assert data["error"] == "DDO marked invalid by the RBAC server."
+
+
+def test_validate_batch(client, base_ddo_url):
+    invalid_ddo = copy.deepcopy(json_dict)
+    invalid_ddo.pop("metadata")
+    items = [json.dumps(json_dict), "not a dict", json.dumps(invalid_ddo), "{}"]
+
+    rv = client.post(
+        base_ddo_url + "/validate/batch",
+        data="\n".join(items),
+        content_type="application/x-ndjson",
+    )
+    assert rv.status_code == 200
+    assert rv.mimetype == "application/x-ndjson"
+    results = [json.loads(line) for line in rv.data.decode("utf-8").splitlines()]
+
+    # results are in the order of the DDOs, valid ones are signed like in /validate
+    assert len(results) == 4
+    assert results[0]["valid"]
+    assert results[0]["hash"] == get_signature_vrs(items[0].encode("utf-8"))["hash"]
+    assert not results[1]["valid"]
+    assert results[1]["hash"] == ""
+    assert not results[2]["valid"]
+    assert results[2]["errors"]["metadata"] == "Metadata is missing or invalid."
+    assert results[3]["errors"]["version"] == "no version provided for DDO."
+
+    rv = client.post(
+        base_ddo_url + "/validate/batch",
+        data=json.dumps([json_dict, invalid_ddo]),
+        content_type="application/json",
+    )
+    results = [json.loads(line) for line in rv.data.decode("utf-8").splitlines()]
+    assert [result["valid"] for result in results] == [True, False]
+    assert (
+        results[0]["hash"] == get_signature_vrs(json.dumps(json_dict).encode())["hash"]
+    )
+
+
+def test_validate_batch_invalid(client, base_ddo_url, monkeypatch):
+    rv = run_request_octet(client.post, base_ddo_url + "/validate/batch", data="[]")
+    assert rv.status_code == 400
+
+    rv = client.post(
+        base_ddo_url + "/validate/batch", data="{}", content_type="application/json"
+    )
+    assert rv.status_code == 400
+    assert rv.get_json()["error"] == "Invalid payload: Payload is not a json array."
+
+    monkeypatch.setenv("VALIDATE_BATCH_MAX_ITEMS", "1")
+    rv = client.post(
+        base_ddo_url + "/validate/batch",
+        data=json.dumps([{}, {}]),
+        content_type="application/json",
+    )
+    assert rv.status_code == 413
+
+    monkeypatch.setenv("VALIDATE_BATCH_MAX_BYTES", "10")
+    rv = client.post(
+        base_ddo_url + "/validate/batch",
+        data=json.dumps([json_dict]),
+        content_type="application/json",
+    )
+    assert rv.status_code == 413
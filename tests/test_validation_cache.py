@@ -0,0 +1,157 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import copy
+from unittest.mock import Mock, patch
+
+import elasticsearch
+
+from aquarius.ddo_checker import validation_cache
+from aquarius.ddo_checker.shacl_checker import validate_dict, validate_dict_inline
+from aquarius.ddo_checker.validation_cache import (
+    SharedValidationCache,
+    ValidationCache,
+    get_shared_validation_cache,
+    get_validation_cache,
+    get_validation_cache_key,
+)
+from tests.ddos.ddo_sample1_v4 import json_dict
+
+
+def get_es_instance():
+    docs = {}
+    es_instance = Mock()
+    es_instance.db_index = "aquarius"
+
+    def get(index, id):
+        if id not in docs:
+            raise elasticsearch.NotFoundError(
+                "Not found", meta=Mock(status=404), body={}
+            )
+        return {"_source": docs[id]}
+
+    def index(index, id, body):
+        docs[id] = dict(body)
+
+    def delete_by_query(index, query):
+        expired = query["range"]["expires"]["lte"]
+        for doc_id in [k for k, doc in docs.items() if doc["expires"] <= expired]:
+            docs.pop(doc_id)
+
+    es_instance.es.get.side_effect = get
+    es_instance.es.index.side_effect = index
+    es_instance.es.delete_by_query.side_effect = delete_by_query
+
+    return es_instance, docs
+
+
+def test_get_validation_cache_key():
+    key = get_validation_cache_key(json_dict, 8996, json_dict["nftAddress"])
+    assert key[1:] == (json_dict["version"], "8996", json_dict["nftAddress"])
+
+    # same content, other key order and fields added by Aquarius
+    record = {k: json_dict[k] for k in reversed(list(json_dict))}
+    record["nft"] = {"address": json_dict["nftAddress"], "state": 0}
+    record["event"] = {"tx": "0x01", "block": 12}
+    assert get_validation_cache_key(record, "8996", json_dict["nftAddress"]) == key
+
+    _copy = copy.deepcopy(json_dict)
+    _copy["metadata"]["name"] = "Another name"
+    assert get_validation_cache_key(_copy, 8996, json_dict["nftAddress"]) != key
+    assert get_validation_cache_key(json_dict, 1, json_dict["nftAddress"]) != key
+
+    assert get_validation_cache_key({"a": float("nan")}, 8996, "0x01") is None
+
+
+def test_lru_and_ttl():
+    cache = ValidationCache(max_size=2, ttl=10)
+    cache.put("a", (True, {}))
+    cache.put("b", (False, {"id": "error"}))
+    assert cache.get("a") == (True, {})
+    cache.put("c", (True, {}))
+
+    # b was the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == (True, {})
+
+    # results are copied, callers can not change the cached ones
+    cache.get("a")[1]["id"] = "changed"
+    assert cache.get("a") == (True, {})
+
+    with patch("time.monotonic", return_value=10**9):
+        assert cache.get("a") is None
+    assert cache.get_stats() == {"hits": 4, "misses": 2, "size": 1}
+
+
+def test_get_validation_cache(monkeypatch):
+    assert get_validation_cache() is get_validation_cache()
+
+    monkeypatch.setenv("VALIDATION_CACHE_SIZE", "0")
+    assert get_validation_cache() is None
+
+
+def test_validate_dict_uses_cache(monkeypatch):
+    monkeypatch.setattr(validation_cache, "_cache", None)
+    args = (json_dict, json_dict["chainId"], json_dict["nftAddress"])
+
+    with patch(
+        "aquarius.ddo_checker.shacl_checker.validate_dict_inline",
+        wraps=validate_dict_inline,
+    ) as mock:
+        result = validate_dict(*args)
+        assert validate_dict(*args) == result
+        record = dict(json_dict, nft={"address": json_dict["nftAddress"]})
+        assert validate_dict(record, *args[1:]) == result
+        assert mock.call_count == 1
+
+        validate_dict(json_dict, 1234, json_dict["nftAddress"])
+        assert mock.call_count == 2
+
+
+def test_shared_cache():
+    es_instance, docs = get_es_instance()
+    cache = SharedValidationCache(es_instance, ttl=10)
+    assert es_instance.es.indices.create.call_args.kwargs["index"] == (
+        "aquarius_validations"
+    )
+    key = ("hash", "4.1.0", "8996", "0x01")
+
+    assert cache.get(key) is None
+    cache.put(key, (False, {"id": "error"}))
+    assert cache.get(key) == (False, {"id": "error"})
+
+    # another process, sharing the same index
+    other = SharedValidationCache(es_instance, ttl=10)
+    assert other.get(key) == (False, {"id": "error"})
+
+    with patch("time.time", return_value=10**10):
+        assert cache.get(key) is None
+        cache.evict()
+    assert docs == {}
+    assert cache.get_stats() == {"hits": 1, "misses": 2}
+
+
+def test_get_shared_validation_cache(monkeypatch):
+    es_instance, _ = get_es_instance()
+    assert get_shared_validation_cache(None) is None
+    cache = get_shared_validation_cache(es_instance)
+    assert cache is get_shared_validation_cache(es_instance)
+
+    monkeypatch.setenv("VALIDATION_CACHE_SHARED", "0")
+    assert get_shared_validation_cache(es_instance) is None
+
+
+def test_validate_dict_uses_shared_cache(monkeypatch):
+    monkeypatch.setenv("VALIDATION_CACHE_SIZE", "0")
+    es_instance, docs = get_es_instance()
+    args = (json_dict, json_dict["chainId"], json_dict["nftAddress"])
+
+    with patch(
+        "aquarius.ddo_checker.shacl_checker.validate_dict_inline",
+        wraps=validate_dict_inline,
+    ) as mock:
+        result = validate_dict(*args, es_instance)
+        assert len(docs) == 1
+        assert validate_dict(*args, es_instance) == result
+        assert mock.call_count == 1
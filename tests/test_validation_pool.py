@@ -0,0 +1,67 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from aquarius.ddo_checker import validation_pool
+from aquarius.ddo_checker.shacl_checker import validate_dict, validate_dict_inline
+from aquarius.ddo_checker.validation_pool import (
+    ValidationPool,
+    ValidationPoolBusy,
+    get_validation_pool,
+    get_validation_pool_settings,
+)
+from tests.ddos.ddo_sample1_v4 import json_dict
+
+
+def test_get_validation_pool_settings(monkeypatch):
+    assert get_validation_pool_settings() == (0, 64, 30)
+    assert get_validation_pool() is None
+
+    monkeypatch.setenv("VALIDATION_POOL_SIZE", "4")
+    monkeypatch.setenv("VALIDATION_QUEUE_SIZE", "not a number")
+    monkeypatch.setenv("VALIDATION_TIMEOUT", "2.5")
+    assert get_validation_pool_settings() == (4, 64, 2.5)
+
+
+def test_validate_dict_in_pool(monkeypatch):
+    monkeypatch.setenv("VALIDATION_POOL_SIZE", "1")
+    monkeypatch.setenv("VALIDATION_CACHE_SIZE", "0")
+    monkeypatch.setattr(validation_pool, "_pool", None)
+    pool = get_validation_pool()
+    try:
+        assert get_validation_pool() is pool
+
+        args = (json_dict, json_dict["chainId"], json_dict["nftAddress"])
+        assert validate_dict(*args) == validate_dict_inline(*args)
+        valid, errors = validate_dict(json_dict, 1234, json_dict["nftAddress"])
+        assert not valid
+        assert errors["id"] == "did is not valid for chain Id and nft address"
+
+        # exceptions are raised to the caller
+        with pytest.raises(AssertionError):
+            validate_dict(dict(json_dict, version="1.0.0"), *args[1:])
+    finally:
+        pool.shutdown()
+
+
+def test_queue_limit_and_timeout():
+    pool = ValidationPool(size=1, queue_size=0, timeout=0.5)
+    try:
+        assert pool.run(abs, -1) == 1
+
+        with pytest.raises(TimeoutError):
+            pool.run(time.sleep, 1.5)
+
+        # the worker still runs the timed out call, and no call can wait for it
+        with pytest.raises(ValidationPoolBusy):
+            pool.run(abs, -1)
+
+        time.sleep(0.6)
+        assert pool.run(abs, -1) == 1
+    finally:
+        pool.shutdown()
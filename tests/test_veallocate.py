@@ -5,9 +5,12 @@
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 
+import elasticsearch
 from freezegun import freeze_time
 from requests.models import Response
 
+from aquarius.app.es_instance import Document
+from aquarius.events.util import make_did
 from aquarius.events.ve_allocate import VeAllocate
 from tests.helpers import get_ddo, publish_ddo
 
@@ -37,3 +40,27 @@ def test_ve_allocate_with_assets(client, base_ddo_url, events_object, monkeypatc
     veAllocate.update_lists()
     published_ddo = get_ddo(client, base_ddo_url, did)
     assert published_ddo["stats"]["allocated"] == 100
+
+
+def test_ve_allocate_continues_after_es_error(monkeypatch):
+    monkeypatch.setenv("VEALLOCATE_URL", "http://veallocate")
+    failing_did = make_did("0x01", 8996)
+    es_instance = Mock()
+    es_instance.read.side_effect = lambda did, fields: Document(
+        {"id": did, "stats": {"allocated": 0}}, 1, 1
+    )
+
+    def update_fields(did, fields, **kwargs):
+        if did == failing_did:
+            raise elasticsearch.ApiError(
+                "Service unavailable", meta=Mock(status=503), body={}
+            )
+        return did
+
+    es_instance.update_fields.side_effect = update_fields
+    veAllocate = VeAllocateForTesting(es_instance)
+    veAllocate.current_test_asset_list = [("0x01", 100, 8996), ("0x02", 200, 8996)]
+    veAllocate.update_lists()
+
+    updated = [call.args[0] for call in es_instance.update_fields.call_args_list]
+    assert updated == [failing_did, make_did("0x02", 8996)]
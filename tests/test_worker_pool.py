@@ -0,0 +1,134 @@
+#
+# Copyright 2023 Ocean Protocol Foundation
+# SPDX-License-Identifier: Apache-2.0
+#
+import threading
+import time
+from collections import Counter
+from unittest.mock import Mock, patch
+
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from aquarius.events.constants import EventTypes
+from aquarius.events.events_monitor import EventsMonitor
+from aquarius.events.worker_pool import PartitionedWorkerPool, partition_events
+
+
+def test_partition_events():
+    events = [
+        AttributeDict({"address": "0xA", "logIndex": 0}),
+        AttributeDict({"address": "0xb", "logIndex": 1}),
+        AttributeDict({"address": "0xa", "logIndex": 2}),
+    ]
+    partitions = partition_events(events)
+
+    assert list(partitions.keys()) == ["0xa", "0xb"]
+    assert [e.logIndex for e in partitions["0xa"]] == [0, 2]
+    assert [e.logIndex for e in partitions["0xb"]] == [1]
+
+
+def test_worker_pool_keeps_partition_order():
+    pool = PartitionedWorkerPool(4)
+    partitions = {key: list(range(10)) for key in ["a", "b", "c"]}
+    handled = {key: [] for key in partitions}
+    threads = set()
+
+    def handler_for(key):
+        def handler(item):
+            threads.add(threading.get_ident())
+            time.sleep(0.001)
+            handled[key].append(item)
+
+        return handler
+
+    pool.run(
+        {key: [(key, i) for i in items] for key, items in partitions.items()},
+        lambda item: handler_for(item[0])(item[1]),
+    )
+    pool.shutdown()
+
+    for key in partitions:
+        assert handled[key] == list(range(10))
+    assert len(threads) > 1
+
+
+def test_worker_pool_survives_failing_partition():
+    pool = PartitionedWorkerPool(2)
+    handled = []
+
+    def handler(item):
+        if item == "boom":
+            raise Exception("Boom!")
+        handled.append(item)
+
+    pool.run({"a": ["boom", "skipped"], "b": ["ok"]}, handler)
+    pool.shutdown()
+
+    assert handled == ["ok"]
+
+
+class RecordingWorkerPool(PartitionedWorkerPool):
+    def __init__(self, max_workers):
+        super().__init__(max_workers)
+        self.runs = []
+
+    def run(self, partitions, handler):
+        self.runs.append(partitions)
+        super().run(partitions, handler)
+
+
+def test_price_events_are_partitioned_by_nft():
+    order_started = next(
+        topic
+        for topic, match in EventTypes.hashes.items()
+        if match["type"] == EventTypes.EVENT_ORDER_STARTED
+    )
+    # two datatokens of the same NFT, and one of another NFT
+    nfts = {"0xdt1": "0xNFT1", "0xdt2": "0xNFT1", "0xdt3": "0xNFT2"}
+    events = [
+        AttributeDict(
+            {
+                "address": address,
+                "topics": [HexBytes(order_started)],
+                "transactionHash": HexBytes("0x01"),
+                "logIndex": i,
+                "blockNumber": 1,
+            }
+        )
+        for i, address in enumerate(["0xdt1", "0xdt2", "0xdt3", "0xdt1"])
+    ]
+
+    monitor = EventsMonitor.__new__(EventsMonitor)
+    monitor._es_instance = Mock()
+    monitor._web3 = Mock()
+    monitor._allowed_publishers = set()
+    monitor.purgatory = None
+    monitor._chain_id = 8996
+    monitor._bulk_max_actions = 0
+    monitor._receipt_stats = Counter()
+    monitor._worker_pool = RecordingWorkerPool(4)
+    processed = []
+
+    def get_nft_address(event_name, event, receipts):
+        return nfts[event.address]
+
+    def get_processor(nft_address, *args):
+        processed.append(nft_address)
+        return Mock()
+
+    with patch.object(
+        monitor, "get_price_event_nft_address", side_effect=get_nft_address
+    ) as resolve, patch(
+        "aquarius.events.events_monitor.OrderStartedProcessor",
+        side_effect=get_processor,
+    ):
+        monitor.process_logs(events, 1, receipts=Mock(get_stats=dict))
+    monitor._worker_pool.shutdown()
+
+    # every event is resolved once
+    assert resolve.call_count == 4
+    partitions = monitor._worker_pool.runs[-1]
+    assert list(partitions.keys()) == ["0xnft1", "0xnft2"]
+    assert [e.logIndex for e in partitions["0xnft1"]] == [0, 1, 3]
+    assert sorted(processed) == ["0xNFT1", "0xNFT1", "0xNFT1", "0xNFT2"]